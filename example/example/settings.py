@@ -78,6 +78,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
 
     'newsletter',
 
@@ -228,3 +229,6 @@ BOOTSTRAP4 = {
 LOGIN_URL = "/login"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
+
+# Scheme and domain of the links of the mailed posts
+NEWSLETTER_BASE_URL = "http://localhost:8000"
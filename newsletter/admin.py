@@ -1,15 +1,128 @@
 # -*- coding: utf-8
 """Administrative representation of the `newsletter` models."""
 
+# Standard library
+import hashlib
+
 # Django
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import F, Max, Min
 
 # Current django project
-from newsletter.models import Comment, Post
+from newsletter.cache import get_version
+from newsletter.models import Comment, Delivery, Post, PostStats, Subscriber
+from newsletter.pagination import CachedCountPaginator, get_count_version_name
+
+
+class CachedDatesQuerySetMixin(object):
+    """Cache the ``dates()`` and ``aggregate()`` queries run by the date hierarchy of the admin.
+
+    The dates of creation of the rows only change when a row is created or deleted, so the results are cached with
+    the version of the counts of the model (see `newsletter.signals`). Only the queries on the field of the date
+    hierarchy, ``date_field``, are cached: the dates of the drilldown and the range of the dates, every other query
+    goes to the database.
+    """
+
+    date_field = None
+
+    def get_cache_key(self, query, *args):
+        """Return the cache key of the query and of the arguments of its method, None if it cannot be cached."""
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return None
+        return 'newsletter:admin:dates:{}:{}:{}'.format(
+            self.db,
+            get_version(get_count_version_name(self.model)),
+            hashlib.md5('{}:{!r}'.format(sql, args).encode('utf-8')).hexdigest(),
+        )
+
+    def cached(self, key, compute):
+        """Return the cached result, computing and caching it if needed."""
+        if key is None:
+            return compute()
+        result = cache.get(key)
+        if result is None:
+            result = compute()
+            cache.set(key, result, getattr(settings, 'NEWSLETTER_COUNT_CACHE_TIMEOUT', 3600))
+        return result
+
+    def is_date_range(self, args, kwargs):
+        """Return True if the aggregates are the range of the dates queried by the date hierarchy."""
+        if args or set(kwargs) != {'first', 'last'}:
+            return False
+        first, last = kwargs['first'], kwargs['last']
+        return (
+            type(first) is Min and type(last) is Max
+            and all(not expression.filter and expression.get_source_expressions() == [F(self.date_field)]
+                    for expression in (first, last))
+        )
+
+    def dates(self, field_name, kind, order='ASC'):
+        """Return the list of the dates, from the cache if they are the ones of the date hierarchy."""
+        queryset = super().dates(field_name, kind, order=order)
+        if field_name != self.date_field:
+            return queryset
+        return self.cached(self.get_cache_key(queryset.query), lambda: list(queryset))
+
+    def aggregate(self, *args, **kwargs):
+        """Return the aggregates, from the cache if they are the range of the dates of the date hierarchy."""
+        if not self.is_date_range(args, kwargs):
+            return super().aggregate(*args, **kwargs)
+        key = self.get_cache_key(self.query, args, sorted(kwargs.items()))
+        return self.cached(key, lambda: super(CachedDatesQuerySetMixin, self).aggregate(*args, **kwargs))
+
+
+_cached_dates_classes = {}
+
+
+def with_cached_dates(queryset, date_field):
+    """Return a copy of the queryset whose date hierarchy queries on the field are cached."""
+    cls = type(queryset)
+    if (cls, date_field) not in _cached_dates_classes:
+        _cached_dates_classes[cls, date_field] = type(
+            'CachedDates' + cls.__name__, (CachedDatesQuerySetMixin, cls), {'date_field': date_field},
+        )
+    queryset = queryset._chain()
+    queryset.__class__ = _cached_dates_classes[cls, date_field]
+    return queryset
+
+
+class CachedDateHierarchyChangeList(ChangeList):
+    """Change list whose date hierarchy drilldown is cached and which does not load the ``list_defer`` fields."""
+
+    def get_queryset(self, request):
+        """Return the queryset of the change list with the cached dates."""
+        queryset = super().get_queryset(request)
+        if self.model_admin.list_defer:
+            queryset = queryset.defer(*self.model_admin.list_defer)
+        if self.date_hierarchy:
+            queryset = with_cached_dates(queryset, self.date_hierarchy)
+        return queryset
+
+
+class NewsletterModelAdmin(admin.ModelAdmin):
+    """Admin of the models which may have millions of rows.
+
+    The counts, the date hierarchy and the related objects cost a few queries per page whatever the number of rows.
+    """
+
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    # Fields, of the model or of the `list_select_related` ones, which are not shown in the change list
+    list_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        """Return the change list with the cached date hierarchy."""
+        return CachedDateHierarchyChangeList
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(NewsletterModelAdmin):
     """Post admin object."""
 
     list_display = (
@@ -17,11 +130,14 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'created'
     )
+    list_select_related = ('author',)
+    list_defer = ('text', 'text_html', 'excerpt_html')
+    raw_id_fields = ('author',)
     date_hierarchy = 'created'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(NewsletterModelAdmin):
     """Comment admin object."""
 
     list_display = (
@@ -30,4 +146,54 @@ class CommentAdmin(admin.ModelAdmin):
         'created',
         'modified'
     )
+    # The representation of a comment shows the title of its post
+    list_select_related = ('post', 'author')
+    list_defer = ('post__text', 'post__text_html', 'post__excerpt_html')
+    raw_id_fields = ('post', 'author')
+    date_hierarchy = 'created'
+
+
+@admin.register(Subscriber)
+class SubscriberAdmin(NewsletterModelAdmin):
+    """Subscriber admin object."""
+
+    list_display = (
+        'email',
+        'name',
+        'is_active',
+        'created'
+    )
+    list_filter = ('is_active',)
+    search_fields = ('email', 'name')
     date_hierarchy = 'created'
+
+
+@admin.register(Delivery)
+class DeliveryAdmin(NewsletterModelAdmin):
+    """Delivery admin object."""
+
+    list_display = (
+        'post',
+        'subscriber',
+        'status'
+    )
+    list_filter = ('status',)
+    list_select_related = ('post', 'subscriber')
+    list_defer = ('post__text', 'post__text_html', 'post__excerpt_html')
+    raw_id_fields = ('post', 'subscriber')
+
+
+@admin.register(PostStats)
+class PostStatsAdmin(admin.ModelAdmin):
+    """Post statistics admin object."""
+
+    list_display = (
+        'post',
+        'mailed',
+        'opens',
+        'unique_opens',
+        'clicks',
+        'unique_clicks'
+    )
+    list_select_related = ('post',)
+    raw_id_fields = ('post',)
@@ -0,0 +1,218 @@
+# coding=utf-8
+
+"""Read-only JSON API of the posts and comments.
+
+The rows are read with ``values()`` and serialized as they come, without building the model instances, and only the
+columns asked for with ``?fields=`` (comma-separated) are selected. The lists are paginated with the ``?cursor=``
+tokens of `newsletter.pagination.CursorPaginator`. Every response is cached under the version of the data it shows
+(see `newsletter.cache`) and carries an ETag, so that a client polling an unchanged page gets a 304 without any query.
+The following settings can be used:
+
+* ``NEWSLETTER_API_PAGE_SIZE``: number of rows of a page of a list (default: 20).
+* ``NEWSLETTER_API_CACHE_TIMEOUT``: timeout in seconds of the cached responses (default: one hour).
+"""
+
+# Standard library
+import hashlib
+import json
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+from django.utils.translation import ugettext as _
+from django.views.generic import View
+
+# Current django project
+from newsletter.cache import LIST_HEAD_VERSION, LIST_VERSION, get_post_version_name, get_versions
+from newsletter.models import Comment, Post
+from newsletter.pagination import CursorPaginator, InvalidCursorError
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'author': 'author__username',
+    'text': 'text',
+    'text_html': 'text_html',
+    'excerpt_html': 'excerpt_html',
+    'word_count': 'word_count',
+    'comment_count': 'comment_count',
+    'created': 'created',
+    'modified': 'modified',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+    'modified': 'modified',
+}
+
+
+class InvalidFieldsError(Exception):
+    """The ``fields`` parameter names an unknown field."""
+
+    pass
+
+
+class JsonView(View):
+    """View returning the JSON of a projection of some rows, cached under the versions of the data.
+
+    The subclasses give the fields that can be selected, by name in the JSON and lookup in ``values()``, and the
+    names of the cache versions of the data.
+    """
+
+    fields = {}
+    default_fields = ()
+
+    def get_version_names(self):
+        """Return the names of the cache versions of the data."""
+        raise NotImplementedError("Subclasses of JsonView must provide get_version_names().")
+
+    def get_data(self, fields):
+        """Return the data to serialize, with only the given fields of the rows."""
+        raise NotImplementedError("Subclasses of JsonView must provide get_data().")
+
+    def get_fields(self):
+        """Return the names of the selected fields, the default ones if there is no ``fields`` parameter."""
+        if 'fields' not in self.request.GET:
+            return list(self.default_fields)
+        fields = [name.strip() for name in self.request.GET['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown or not fields:
+            raise InvalidFieldsError(', '.join(unknown))
+        # Keep the order of the parameter but not its duplicates
+        return list(dict.fromkeys(fields))
+
+    def get_cache_key(self, fields):
+        """Return the part of the cache key specific to the response, whatever the order of the parameters."""
+        return '{}:{}:{}:{}'.format(type(self).__name__, self.request.path, ','.join(fields),
+                                    self.request.GET.get('cursor', ''))
+
+    def project(self, rows, fields):
+        """Return the rows of ``values()`` with only the selected fields, under their name in the JSON."""
+        return [{name: row[self.fields[name]] for name in fields} for row in rows]
+
+    def get(self, request, *args, **kwargs):
+        """Return the JSON from the cache, or a 304 if the client already has it."""
+        try:
+            fields = self.get_fields()
+        except InvalidFieldsError as e:
+            return JsonResponse({'error': _("Unknown fields: {}.").format(e)}, status=400)
+
+        version = ':'.join(get_versions(*self.get_version_names()))
+        key = 'newsletter:api:{}:{}'.format(
+            hashlib.md5(self.get_cache_key(fields).encode('utf-8')).hexdigest(),
+            version,
+        )
+        etag = quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+
+        content = cache.get(key)
+        if content is None:
+            content = json.dumps(self.get_data(fields), cls=DjangoJSONEncoder).encode('utf-8')
+            cache.set(key, content, getattr(settings, 'NEWSLETTER_API_CACHE_TIMEOUT', 3600))
+        response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+
+class JsonListView(JsonView):
+    """JSON view of a list of rows, paginated with cursors.
+
+    The page is an object with the ``results``, and the ``next`` and ``previous`` URLs, null on the edges.
+    """
+
+    ordering = ('-created', '-id')
+
+    def get_queryset(self):
+        """Return the queryset of the rows."""
+        raise NotImplementedError("Subclasses of JsonListView must provide get_queryset().")
+
+    def get_paginate_by(self):
+        """Return the number of rows of a page."""
+        return getattr(settings, 'NEWSLETTER_API_PAGE_SIZE', 20)
+
+    def get_page_url(self, cursor, fields):
+        """Return the URL of the page of the cursor, with the same fields."""
+        params = {'cursor': cursor}
+        if 'fields' in self.request.GET:
+            params['fields'] = ','.join(fields)
+        return '{}?{}'.format(self.request.path, urlencode(params))
+
+    def get_data(self, fields):
+        """Return the page designated by the cursor."""
+        # The cursors are built from the ordering fields
+        lookups = dict.fromkeys([self.fields[name] for name in fields] + [name.lstrip('-') for name in self.ordering])
+        paginator = CursorPaginator(self.get_queryset().values(*lookups), self.get_paginate_by(), self.ordering)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursorError:
+            raise Http404(_("Invalid cursor."))
+        return {
+            'results': self.project(page.object_list, fields),
+            'next': self.get_page_url(page.next_cursor, fields) if page.has_next() else None,
+            'previous': self.get_page_url(page.previous_cursor, fields) if page.has_previous() else None,
+        }
+
+
+class PostListJsonView(JsonListView):
+    """JSON list of the posts, the latest first."""
+
+    fields = POST_FIELDS
+    default_fields = ('id', 'title', 'author', 'excerpt_html', 'comment_count', 'created', 'modified')
+
+    def get_queryset(self):
+        """Return the posts."""
+        return Post.objects.all()
+
+    def get_version_names(self):
+        """Return the versions of the list, including its comment counts."""
+        return [LIST_VERSION, LIST_HEAD_VERSION]
+
+
+class PostDetailJsonView(JsonView):
+    """JSON of a post."""
+
+    fields = POST_FIELDS
+    default_fields = ('id', 'title', 'author', 'text_html', 'comment_count', 'created', 'modified')
+
+    def get_version_names(self):
+        """Return the version of the post."""
+        return [get_post_version_name(self.kwargs['pk'])]
+
+    def get_data(self, fields):
+        """Return the post."""
+        rows = Post.objects.filter(pk=self.kwargs['pk']).values(*[self.fields[name] for name in fields])
+        if not rows:
+            raise Http404(_("No post found matching the query."))
+        return self.project(rows, fields)[0]
+
+
+class CommentListJsonView(JsonListView):
+    """JSON list of the comments of a post, the latest first."""
+
+    fields = COMMENT_FIELDS
+    default_fields = ('id', 'author', 'text', 'created', 'modified')
+
+    def get_queryset(self):
+        """Return the comments of the post."""
+        return Comment.objects.filter(post_id=self.kwargs['pk'])
+
+    def get_version_names(self):
+        """Return the version of the post, which also changes with its comments."""
+        return [get_post_version_name(self.kwargs['pk'])]
+
+    def get_data(self, fields):
+        """Return the page of comments, a 404 if the post does not exist."""
+        if not Post.objects.filter(pk=self.kwargs['pk']).exists():
+            raise Http404(_("No post found matching the query."))
+        return super().get_data(fields)
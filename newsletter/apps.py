@@ -17,4 +17,5 @@ class NewsletterConfig(AppConfig):
 
     def ready(self):
         """Run when Django starts."""
+        from newsletter import signals  # noqa: F401
         logger.debug("App {} ready.".format(self.name))
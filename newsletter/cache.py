@@ -0,0 +1,99 @@
+# coding=utf-8
+
+"""Versions of the cached data of the newsletter.
+
+A cache key embeds the version of the data it depends on, so that bumping the version invalidates every key at once
+without having to know them. A version is a random token rather than a counter: if it gets evicted, the new one
+cannot match the keys built from the old one.
+"""
+
+# Standard library
+import uuid
+
+# Django
+from django.core.cache import cache
+from django.db.models import Max
+
+KEY_PREFIX = 'newsletter:version'
+
+# Versions of the pages of the post list: all of them, and the first one which also shows the latest comment counts
+LIST_VERSION = 'list'
+LIST_HEAD_VERSION = 'list:head'
+
+# Number of primary keys covered by a section of the sitemap, the maximum number of URLs of a sitemap
+SITEMAP_SECTION_SIZE = 50000
+
+
+def _key(name):
+    return '{}:{}'.format(KEY_PREFIX, name)
+
+
+def get_post_version_name(pk):
+    """Return the name of the version of the pages showing a post and its comments."""
+    return 'post:{}'.format(pk)
+
+
+def get_sitemap_version_name(pk):
+    """Return the name of the version of the section of the sitemap holding a post."""
+    return 'sitemap:{}'.format((int(pk) - 1) // SITEMAP_SECTION_SIZE + 1)
+
+
+def get_sitemap_version_names(first_pk, last_pk):
+    """Return the names of the versions of the sections of the sitemap holding the posts from first_pk to last_pk."""
+    first, last = [(int(pk) - 1) // SITEMAP_SECTION_SIZE for pk in (first_pk, last_pk)]
+    return [get_sitemap_version_name(section * SITEMAP_SECTION_SIZE + 1) for section in range(first, last + 1)]
+
+
+def get_version(name):
+    """Return the current version of the named data."""
+    key = _key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*names):
+    """Return the current versions of the named data, in the same order, with one round-trip when possible."""
+    found = cache.get_many([_key(name) for name in names])
+    return [found[_key(name)] if _key(name) in found else get_version(name) for name in names]
+
+
+def bump_version(*names):
+    """Change the version of the named data, which invalidates every key built from the previous one."""
+    cache.set_many({_key(name): uuid.uuid4().hex for name in names}, None)
+
+
+def bump_post_versions(pks):
+    """Invalidate the pages of the posts, every page of the list and the sections of the sitemap holding them.
+
+    For the writes that send no signal, such as `newsletter.utils.bulk_update`.
+    """
+    pks = list(pks)
+    if pks:
+        bump_version(
+            LIST_VERSION,
+            LIST_HEAD_VERSION,
+            *{get_sitemap_version_name(pk) for pk in pks},
+            *[get_post_version_name(pk) for pk in pks]
+        )
+
+
+def get_post_card_version(post):
+    """Return the version of the card of a post in the list, which also shows its comment count."""
+    return '{}:{}:{}'.format(post.pk, post.modified.timestamp(), post.comment_count)
+
+
+def get_comment_list_version(post):
+    """Return the version of the comment list of a post.
+
+    The latest modification date of the comments changes when one is created or edited, the count when one is deleted.
+    """
+    last_modified = post.comment_set.aggregate(last_modified=Max('modified'))['last_modified']
+    return '{}:{}:{}:{}'.format(
+        post.pk,
+        post.modified.timestamp(),
+        post.comment_count,
+        last_modified.timestamp() if last_modified else '',
+    )
@@ -0,0 +1,82 @@
+# coding=utf-8
+
+"""Export of the posts and comments as newline-delimited JSON.
+
+Every line is a JSON object holding the label of its model and the values of a row, the posts first, then the
+comments. The rows are read by chunks through a database iterator and encoded one at a time, so that the memory used
+does not depend on the number of rows::
+
+    {"model": "newsletter.post", "id": 1, "title": "...", "author": "username", "text": "...", ...}
+    {"model": "newsletter.comment", "id": 1, "post": 1, "author": "username", "text": "...", ...}
+"""
+
+# Standard library
+import datetime
+import json
+import zlib
+
+# Current django project
+from newsletter.models import Comment, Post
+
+# Columns exported for every model, the author is exported by username so that the data can move between databases
+EXPORT_FIELDS = (
+    (Post, (('id', 'id'), ('title', 'title'), ('author', 'author__username'), ('text', 'text'),
+            ('created', 'created'), ('modified', 'modified'))),
+    (Comment, (('id', 'id'), ('post', 'post_id'), ('author', 'author__username'), ('text', 'text'),
+               ('created', 'created'), ('modified', 'modified'))),
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def encode_value(value):
+    """Encode the values that JSON does not know, keeping the microseconds of the dates."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+def iter_records(chunk_size=DEFAULT_CHUNK_SIZE, models=None):
+    """Yield the rows of the models (every exported model by default) as dictionaries, in primary key order."""
+    for model, fields in EXPORT_FIELDS:
+        if models is not None and model not in models:
+            continue
+        label = model._meta.label_lower
+        lookups = [lookup for name, lookup in fields]
+        rows = model.objects.order_by('pk').values_list(*lookups)
+        for row in rows.iterator(chunk_size=chunk_size):
+            record = {'model': label}
+            record.update(zip((name for name, lookup in fields), row))
+            yield record
+
+
+def iter_lines(chunk_size=DEFAULT_CHUNK_SIZE, models=None):
+    """Yield the rows of the models as encoded JSON lines."""
+    for record in iter_records(chunk_size=chunk_size, models=models):
+        yield (json.dumps(record, default=encode_value, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def iter_buffered(chunks, size=64 * 1024):
+    """Group the small chunks of bytes into chunks of about ``size`` bytes, to write them in fewer calls."""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks, level=6):
+    """Compress the chunks of bytes into a gzip stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        # The compressor buffers its output, only yield once it has produced a block
+        if data:
+            yield data
+    yield compressor.flush()
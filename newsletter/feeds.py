@@ -0,0 +1,193 @@
+# coding=utf-8
+
+"""RSS and Atom feeds of the newsletter.
+
+The feeds are polled by aggregators much more often than they change: their XML is cached under the version of the
+data they show, and the conditional requests get a 304 without any rendering. The following settings can be used:
+
+* ``NEWSLETTER_FEED_ITEMS``: number of items of a feed (default: 20).
+* ``NEWSLETTER_FEED_CACHE_TIMEOUT``: timeout in seconds of the cached feeds (default: one hour).
+"""
+
+# Standard library
+import hashlib
+from calendar import timegm
+
+# Django
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import linebreaks_filter
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import ugettext_lazy as _
+
+# Current django project
+from newsletter.cache import LIST_VERSION, get_post_version_name, get_versions
+from newsletter.models import Post
+
+
+class CachedFeed(Feed):
+    """Feed whose XML is cached and which answers the conditional requests.
+
+    The subclasses give the date of the last modification of the data of the feed and the names of their cache
+    versions, which also change when a row is deleted.
+    """
+
+    def get_last_modified(self, request, *args, **kwargs):
+        """Return the date of the last modification of the items, None if there is no item."""
+        raise NotImplementedError("Subclasses of CachedFeed must provide get_last_modified().")
+
+    def get_version_names(self, request, *args, **kwargs):
+        """Return the names of the cache versions of the items."""
+        raise NotImplementedError("Subclasses of CachedFeed must provide get_version_names().")
+
+    def __call__(self, request, *args, **kwargs):
+        """Return the feed from the cache, or a 304 if the client already has it."""
+        last_modified = self.get_last_modified(request, *args, **kwargs)
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        version = '{}:{}'.format(':'.join(get_versions(*self.get_version_names(request, *args, **kwargs))),
+                                 last_modified)
+        etag = quote_etag(hashlib.md5(version.encode('utf-8')).hexdigest())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        key = 'newsletter:feed:{}:{}'.format(
+            hashlib.md5('{}:{}'.format(type(self).__name__, request.get_full_path()).encode('utf-8')).hexdigest(),
+            version,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = super().__call__(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (response.content, response['Content-Type']),
+                          getattr(settings, 'NEWSLETTER_FEED_CACHE_TIMEOUT', 3600))
+
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class LatestPostsFeed(CachedFeed):
+    """RSS feed of the latest posts."""
+
+    title = _("Latest posts")
+    description = _("The latest posts of the newsletter.")
+
+    def get_last_modified(self, request, *args, **kwargs):
+        """Return the date of the last modified post."""
+        return Post.objects.aggregate(last_modified=Max('modified'))['last_modified']
+
+    def get_version_names(self, request, *args, **kwargs):
+        """Return the version of the list of posts."""
+        return [LIST_VERSION]
+
+    def link(self):
+        """Return the URL of the list of posts."""
+        return reverse('newsletter:post-list')
+
+    def items(self):
+        """Return the latest posts, without their markdown text."""
+        return Post.objects.select_related('author').defer('text')[:getattr(settings, 'NEWSLETTER_FEED_ITEMS', 20)]
+
+    def item_title(self, item):
+        """Return the title of the post."""
+        return item.title
+
+    def item_description(self, item):
+        """Return the pre-rendered HTML of the post."""
+        return item.text_html
+
+    def item_author_name(self, item):
+        """Return the name of the author of the post."""
+        return item.author.get_full_name() or item.author.get_username()
+
+    def item_pubdate(self, item):
+        """Return the date of creation of the post."""
+        return item.created
+
+    def item_updateddate(self, item):
+        """Return the date of the last modification of the post."""
+        return item.modified
+
+
+class AtomLatestPostsFeed(LatestPostsFeed):
+    """Atom feed of the latest posts."""
+
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class PostCommentsFeed(CachedFeed):
+    """RSS feed of the latest comments of a post."""
+
+    description = _("The latest comments of the post.")
+
+    def get_last_modified(self, request, *args, **kwargs):
+        """Return the date of the last modification of the post or of its comments."""
+        return Post.get_last_modified(kwargs['pk'])
+
+    def get_version_names(self, request, *args, **kwargs):
+        """Return the version of the post, which also changes when one of its comments is deleted."""
+        return [get_post_version_name(kwargs['pk'])]
+
+    def get_object(self, request, pk):
+        """Return the post."""
+        return get_object_or_404(Post.objects.only('pk', 'title', 'created'), pk=pk)
+
+    def title(self, obj):
+        """Return the title of the feed."""
+        return _("Comments on {}").format(obj.title)
+
+    def link(self, obj):
+        """Return the URL of the post."""
+        return obj.get_absolute_url()
+
+    def items(self, obj):
+        """Return the latest comments of the post with their author."""
+        return obj.comment_set.select_related('author').order_by('-created', '-id')[
+            :getattr(settings, 'NEWSLETTER_FEED_ITEMS', 20)]
+
+    def item_title(self, item):
+        """Return the title of the comment."""
+        return _("Comment by {}").format(item.author.get_full_name() or item.author.get_username())
+
+    def item_description(self, item):
+        """Return the text of the comment as HTML."""
+        return linebreaks_filter(item.text, autoescape=True)
+
+    def item_link(self, item):
+        """Return the URL of the comment in the page of its post."""
+        return '{}#comment-{}'.format(item.post.get_absolute_url(), item.pk)
+
+    def item_author_name(self, item):
+        """Return the name of the author of the comment."""
+        return item.author.get_full_name() or item.author.get_username()
+
+    def item_pubdate(self, item):
+        """Return the date of creation of the comment."""
+        return item.created
+
+    def item_updateddate(self, item):
+        """Return the date of the last modification of the comment."""
+        return item.modified
+
+
+class AtomPostCommentsFeed(PostCommentsFeed):
+    """Atom feed of the latest comments of a post."""
+
+    feed_type = Atom1Feed
+    subtitle = PostCommentsFeed.description
@@ -0,0 +1,209 @@
+# coding=utf-8
+
+"""Mailing of the posts to the subscribers.
+
+A post is rendered once for all the recipients into a MIME skeleton (see `newsletter.mime`) from which the message
+to each of them is spliced, and the messages are sent by batches, each batch over a single connection of the email
+backend.
+
+Every mailing is journaled in `newsletter.models.Delivery`: the pending rows of a batch are inserted at once before
+it is sent, and the statuses are updated every ``flush_every`` messages, and when the mailing stops, even on an error.
+A message refused by the server, e.g. for a bad address, is journaled as failed and the mailing goes on, only the loss
+of the connection stops it.
+A resumed mailing skips the subscribers whose delivery is sent with an anti-join on the journal, so at most the
+messages sent since the last flush are sent twice if the process is killed. The following settings can be used:
+
+* ``NEWSLETTER_FROM_EMAIL``: sender of the mails (default: ``DEFAULT_FROM_EMAIL``).
+* ``NEWSLETTER_SEND_BATCH_SIZE``: number of messages sent over a connection (default: 100).
+* ``NEWSLETTER_SEND_FLUSH_EVERY``: number of messages whose status is written at once (default: 500).
+* ``NEWSLETTER_BASE_URL``: scheme and domain of the links of the mails (default: ``http://`` and the domain of the
+  current site if ``django.contrib.sites`` is installed). The mails are only unsubscribed from in one click by the
+  mail clients (RFC 8058) if it is an ``https://`` URL.
+* ``NEWSLETTER_MAIL_TRACKING``: track the opening of the mails and the clicks on their links (default: True).
+"""
+
+# Standard library
+import logging
+import smtplib
+
+# Django
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import get_connection
+from django.db.models import Exists, OuterRef
+from django.urls import reverse
+
+# Current django project
+from newsletter.cache import bump_version
+from newsletter.mime import compile_post
+from newsletter.models import Delivery, Subscriber
+from newsletter.pagination import get_count_version_name, get_filtered_count_version_name
+from newsletter.tokens import TRACKING, UNSUBSCRIBE, make_token
+from newsletter.tracking import mark_mailed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_EVERY = 500
+
+
+class Journal(object):
+    """Buffer of the statuses of the deliveries of a post, written with one query per status."""
+
+    def __init__(self, post, flush_every):
+        """Create the journal."""
+        self.post = post
+        self.flush_every = flush_every
+        self.statuses = {Delivery.SENT: [], Delivery.FAILED: []}
+        self.count = 0
+
+    def add(self, subscriber_id, status):
+        """Record the status of the delivery to a subscriber, and write the statuses every ``flush_every`` ones."""
+        self.statuses[status].append(subscriber_id)
+        self.count += 1
+        if self.count >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write the recorded statuses."""
+        written = False
+        for status, subscriber_ids in self.statuses.items():
+            if subscriber_ids:
+                Delivery.objects.filter(post=self.post, subscriber_id__in=subscriber_ids).update(status=status)
+                subscriber_ids.clear()
+                written = True
+        self.count = 0
+        if written:
+            # The updates send no signal, the rows moved between the statuses filtered in the admin
+            bump_version(get_filtered_count_version_name(Delivery))
+
+
+def get_from_email():
+    """Return the sender of the mails."""
+    return getattr(settings, 'NEWSLETTER_FROM_EMAIL', settings.DEFAULT_FROM_EMAIL)
+
+
+def get_base_url():
+    """Return the scheme and domain of the links of the mails.
+
+    Raise `django.core.exceptions.ImproperlyConfigured` if there is no absolute URL to prefix them with.
+    """
+    base_url = getattr(settings, 'NEWSLETTER_BASE_URL', None)
+    if base_url is None and apps.is_installed('django.contrib.sites'):
+        from django.contrib.sites.models import Site
+        base_url = 'http://{}'.format(Site.objects.get_current().domain)
+    if not base_url or not base_url.startswith(('https://', 'http://')):
+        raise ImproperlyConfigured(
+            "The links of the mails must be absolute: set NEWSLETTER_BASE_URL to the scheme and domain of the site, "
+            "or install django.contrib.sites."
+        )
+    return base_url.rstrip('/')
+
+
+def get_unsubscribe_url(base_url, post_id, subscriber_id):
+    """Return the URL with which a subscriber unsubscribes."""
+    token = make_token(UNSUBSCRIBE, subscriber_id, post_id)
+    return base_url + reverse('newsletter:unsubscribe', kwargs={'token': token})
+
+
+def render_post(post, base_url):
+    """Return the skeleton of the mail of a post, rendered once for everyone."""
+    return compile_post(post, get_from_email(), base_url=base_url,
+                        tracking=getattr(settings, 'NEWSLETTER_MAIL_TRACKING', True))
+
+
+def iter_batches(subscribers, batch_size, fields=('pk', 'email', 'name')):
+    """Yield the rows of the given fields of the subscribers by batches, seeking the primary key index.
+
+    The primary key must be the first field.
+    """
+    last = 0
+    while True:
+        batch = list(subscribers.filter(pk__gt=last).order_by('pk').values_list(*fields)[:batch_size])
+        if batch:
+            yield batch
+        if len(batch) < batch_size:
+            return
+        last = batch[-1][0]
+
+
+def build_message(skeleton, base_url, post_id, subscriber_id, email, name):
+    """Return the message of a rendered post to a subscriber, with their signed tokens."""
+    return skeleton.build_message(
+        email,
+        name,
+        unsubscribe_url=get_unsubscribe_url(base_url, post_id, subscriber_id),
+        tracking_token=make_token(TRACKING, subscriber_id, post_id),
+    )
+
+
+def get_recipients(post, subscribers, resume):
+    """Return the subscribers annotated with whether they are in the journal, without the delivered ones if resuming.
+
+    The annotations are ``EXISTS`` subqueries served by the unique index of the journal.
+    """
+    journal = Delivery.objects.filter(post=post, subscriber=OuterRef('pk'))
+    subscribers = subscribers.annotate(journaled=Exists(journal))
+    if resume:
+        # Django 2.x can only filter on the annotation, not on the expression itself
+        subscribers = subscribers.annotate(
+            delivered=Exists(journal.filter(status=Delivery.SENT)),
+        ).filter(delivered=False)
+    return subscribers
+
+
+def send_batch(post, skeleton, base_url, rows, journal, fail_silently=False):
+    """Journal the batch, send it over one connection and return the number of sent messages."""
+    created = Delivery.objects.bulk_create([
+        Delivery(post=post, subscriber_id=pk) for pk, email, name, journaled in rows if not journaled
+    ])
+    if created:
+        # No signal is sent, invalidate the counts of the admin as the receivers of `newsletter.signals` would
+        bump_version(get_count_version_name(Delivery))
+    sent = 0
+    with get_connection(fail_silently=fail_silently) as connection:
+        for pk, email, name, journaled in rows:
+            try:
+                # One message per call to know which ones failed, the connection stays open
+                delivered = connection.send_messages([build_message(skeleton, base_url, post.pk, pk, email, name)])
+            except smtplib.SMTPServerDisconnected:
+                raise
+            except (smtplib.SMTPException, ValueError) as error:
+                # The message was refused, or an address cannot be encoded (CR or LF in a name)
+                logger.warning("Post %s could not be sent to subscriber %s: %r.", post.pk, pk, error)
+                delivered = False
+            if delivered:
+                journal.add(pk, Delivery.SENT)
+                sent += 1
+            else:
+                journal.add(pk, Delivery.FAILED)
+    return sent
+
+
+def send_post(post, subscribers=None, batch_size=None, flush_every=None, resume=False, fail_silently=False,
+              callback=None):
+    """Mail a post to the subscribers, the active ones by default, and return the number of sent messages.
+
+    If ``resume``, skip the subscribers to whom the post was already sent. ``callback`` is called with the number of
+    messages sent so far after every batch.
+    """
+    if subscribers is None:
+        subscribers = Subscriber.objects.filter(is_active=True)
+    batch_size = batch_size or getattr(settings, 'NEWSLETTER_SEND_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    flush_every = flush_every or getattr(settings, 'NEWSLETTER_SEND_FLUSH_EVERY', DEFAULT_FLUSH_EVERY)
+    base_url = get_base_url()
+    skeleton = render_post(post, base_url)
+    recipients = get_recipients(post, subscribers, resume)
+    journal = Journal(post, flush_every)
+    mark_mailed(post)
+
+    sent = 0
+    try:
+        for rows in iter_batches(recipients, batch_size, fields=('pk', 'email', 'name', 'journaled')):
+            sent += send_batch(post, skeleton, base_url, rows, journal, fail_silently=fail_silently)
+            if callback is not None:
+                callback(sent)
+    finally:
+        journal.flush()
+    return sent
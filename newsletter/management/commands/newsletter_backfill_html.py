@@ -0,0 +1,51 @@
+# coding=utf-8
+
+"""Fill the pre-rendered HTML column of the posts."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Current django project
+from newsletter.cache import bump_post_versions
+from newsletter.models import Post
+from newsletter.utils import bulk_update
+
+
+class Command(BaseCommand):
+    """Render the markdown text of the posts that do not have a pre-rendered HTML yet."""
+
+    help = "Render the markdown text of the posts into their pre-rendered HTML column."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--all', action='store_true', dest='all',
+                            help="Render every post, not only the ones without HTML.")
+        parser.add_argument('--batch-size', type=int, default=500, dest='batch_size',
+                            help="Number of posts written per transaction (default: 500).")
+
+    def handle(self, *args, **options):
+        """Render the posts batch by batch."""
+        queryset = Post.objects.only('pk', 'text').order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(text_html='').exclude(text='')
+
+        count = 0
+        batch = []
+        for post in queryset.iterator():
+            post.render()
+            batch.append(post)
+            if len(batch) >= options['batch_size']:
+                count += self.write(batch)
+                batch = []
+        count += self.write(batch)
+
+        self.stdout.write("{} post(s) rendered.".format(count))
+
+    @staticmethod
+    def write(posts):
+        """Write the rendered fields of the posts without triggering a new render, then invalidate their pages."""
+        with transaction.atomic():
+            bulk_update(Post, posts, Post.rendered_fields)
+        bump_post_versions(post.pk for post in posts)
+        return len(posts)
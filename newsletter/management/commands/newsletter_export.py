@@ -0,0 +1,62 @@
+# coding=utf-8
+
+"""Export the posts and comments as newline-delimited JSON."""
+
+# Standard library
+import sys
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Current django project
+from newsletter.export import DEFAULT_CHUNK_SIZE, EXPORT_FIELDS, iter_buffered, iter_gzip, iter_lines
+
+MODELS = {model._meta.model_name: model for model, fields in EXPORT_FIELDS}
+
+
+class Command(BaseCommand):
+    """Stream the posts and comments to a file, unlike ``dumpdata`` which loads them all in memory."""
+
+    help = "Export the posts and comments as newline-delimited JSON, optionally gzipped."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('-o', '--output', default='-', dest='output',
+                            help="File to write, - for the standard output (default).")
+        parser.add_argument('--gzip', action='store_true', dest='gzip',
+                            help="Compress the output with gzip.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, dest='chunk_size',
+                            help="Number of rows fetched from the database at once (default: {}).".format(
+                                DEFAULT_CHUNK_SIZE))
+        parser.add_argument('--model', action='append', choices=sorted(MODELS), dest='models',
+                            help="Model to export, can be repeated (default: every model).")
+
+    def handle(self, *args, **options):
+        """Write the lines by chunks."""
+        models = [MODELS[name] for name in options['models']] if options['models'] else None
+        self.count = 0
+        chunks = iter_buffered(self.count_lines(iter_lines(chunk_size=options['chunk_size'], models=models)))
+        if options['gzip']:
+            chunks = iter_gzip(chunks)
+
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, chunks)
+            sys.stdout.buffer.flush()
+            report = self.stderr
+        else:
+            with open(options['output'], 'wb') as f:
+                self.write(f, chunks)
+            report = self.stdout
+        report.write("{} row(s) exported.".format(self.count))
+
+    def count_lines(self, lines):
+        """Count the lines while they go through."""
+        for line in lines:
+            self.count += 1
+            yield line
+
+    @staticmethod
+    def write(f, chunks):
+        """Write the chunks to the file."""
+        for chunk in chunks:
+            f.write(chunk)
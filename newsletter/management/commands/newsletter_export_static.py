@@ -0,0 +1,171 @@
+# coding=utf-8
+
+"""Render the public pages of the newsletter to static files."""
+
+# Standard library
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Django
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from django.urls import reverse
+
+MANIFEST = '.manifest.json'
+
+
+def get_filename(url):
+    """Return the file of a URL, relative to the output directory: the index of the directory of its path."""
+    path, _, query = url.partition('?')
+    if query.startswith('page='):
+        path = '{}page/{}/'.format(path, query[len('page='):])
+    name = 'index.xml' if '/feed/' in path else 'index.html'
+    return os.path.join(path.lstrip('/'), name)
+
+
+def render_pages(urls, output, host):
+    """Render the pages to their files, replacing them atomically so that a half-written file is never served.
+
+    Run in the worker processes, which open their own database connection.
+    """
+    if not apps.ready:
+        django.setup()
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+    from django.urls import resolve
+    from newsletter.views import PostListView
+
+    factory = RequestFactory(HTTP_HOST=host)
+    # The static pages are numbered, whatever the pagination of the dynamic list
+    list_view = PostListView.as_view(cursor_pagination=False)
+    for url in urls:
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        match = resolve(request.path_info)
+        view = list_view if getattr(match.func, 'view_class', None) is PostListView else match.func
+        response = view(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            raise CommandError("{} returned a {}.".format(url, response.status_code))
+
+        filename = os.path.join(output, get_filename(url))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename + '.tmp', 'wb') as f:
+            f.write(response.content)
+        os.replace(filename + '.tmp', filename)
+    return len(urls)
+
+
+class Command(BaseCommand):
+    """Export the post list, the posts and the feeds as files, to serve the anonymous users without Django.
+
+    Every file is recorded in a manifest with the version of the data it shows, and only the files whose version
+    changed are rendered again. A page of the list ``?page=N`` is written to ``page/N/index.html``, which the web
+    server should map, for instance with nginx::
+
+        location = / {
+            try_files /page/$arg_page/index.html /index.html =404;
+        }
+
+    Only the first page of the comments of a post is exported.
+    """
+
+    help = "Render the post list, the posts and the feeds to static files, incrementally."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('output', help="Directory of the files.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), dest='workers',
+                            help="Number of rendering processes, 0 renders in the current process "
+                                 "(default: number of CPUs).")
+        parser.add_argument('--chunk-size', type=int, default=100, dest='chunk_size',
+                            help="Number of pages rendered by a process at once (default: 100).")
+        parser.add_argument('--host', dest='host',
+                            help="Host of the URLs of the feeds (default: the first of ALLOWED_HOSTS).")
+        parser.add_argument('--full', action='store_true', dest='full',
+                            help="Render every page, for instance after a change of the templates.")
+
+    def handle(self, *args, **options):
+        """Render the pages whose version changed, remove the ones which do not exist anymore."""
+        output = options['output']
+        host = options['host'] or next((host for host in settings.ALLOWED_HOSTS if '*' not in host), 'localhost')
+        started = time.monotonic()
+
+        manifest_path = os.path.join(output, MANIFEST)
+        manifest = {}
+        if os.path.exists(manifest_path) and not options['full']:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        versions = self.get_versions()
+        changed = [url for url, version in versions.items()
+                   if manifest.get(url) != version or not os.path.exists(os.path.join(output, get_filename(url)))]
+        chunks = [changed[i:i + options['chunk_size']] for i in range(0, len(changed), options['chunk_size'])]
+        if options['workers'] > 0 and chunks:
+            # The processes must not share the connection of this one
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                for future in [executor.submit(render_pages, chunk, output, host) for chunk in chunks]:
+                    future.result()
+        else:
+            for chunk in chunks:
+                render_pages(chunk, output, host)
+
+        removed = [url for url in manifest if url not in versions]
+        for url in removed:
+            try:
+                os.remove(os.path.join(output, get_filename(url)))
+            except FileNotFoundError:
+                pass
+
+        os.makedirs(output, exist_ok=True)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(versions, f, indent=0, sort_keys=True)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        self.stdout.write("Rendered {} page(s), removed {}, {} unchanged, in {:.2f}s.".format(
+            len(changed), len(removed), len(versions) - len(changed), time.monotonic() - started))
+
+    @staticmethod
+    def get_versions():
+        """Return the version of every page by URL, from one query over the posts and their comments."""
+        from newsletter.models import Post
+        from newsletter.views import PostListView
+
+        rows = Post.objects.order_by('-created', '-id').annotate(
+            last_comment=Max('comment__modified'),
+        ).values_list('pk', 'created', 'modified', 'comment_count', 'last_comment')
+
+        versions = {}
+        posts, items = [], []
+        for pk, created, modified, comment_count, last_comment in rows.iterator():
+            version = '{}:{}:{}'.format(modified.timestamp(), comment_count,
+                                        last_comment.timestamp() if last_comment else '')
+            posts.append('{}:{}'.format(pk, version))
+            items.append('{}:{}'.format(pk, modified.timestamp()))
+            versions[Post(pk=pk, created=created).get_absolute_url()] = version
+            versions[reverse('newsletter:post-comments-feed', kwargs={'pk': pk})] = version
+            versions[reverse('newsletter:post-comments-feed-atom', kwargs={'pk': pk})] = version
+
+        def digest(items):
+            return hashlib.md5(':'.join(items).encode('utf-8')).hexdigest()
+
+        # A page of the list also shows the number of pages
+        per_page = PostListView.paginate_by
+        pages = max(1, (len(posts) + per_page - 1) // per_page)
+        for number in range(1, pages + 1):
+            url = reverse('newsletter:post-list') + ('?page={}'.format(number) if number > 1 else '')
+            versions[url] = digest(posts[(number - 1) * per_page:number * per_page] + [str(pages)])
+        # The feed of the posts does not show their comments
+        feed = digest(items[:getattr(settings, 'NEWSLETTER_FEED_ITEMS', 20)])
+        versions[reverse('newsletter:post-feed')] = feed
+        versions[reverse('newsletter:post-feed-atom')] = feed
+        return versions
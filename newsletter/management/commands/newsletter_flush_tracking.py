@@ -0,0 +1,41 @@
+# coding=utf-8
+
+"""Fold the tracking counters of the cache into the statistics of the posts."""
+
+# Standard library
+import time
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Current django project
+from newsletter.tracking import flush
+
+
+class Command(BaseCommand):
+    """Write the openings and clicks counted in the cache to the database (see `newsletter.tracking`).
+
+    Run it periodically, from cron or with ``--interval``, and never twice at the same time.
+    """
+
+    help = "Write the tracking counters of the cache to the statistics of the posts."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--interval', type=float, default=0, dest='interval',
+                            help="Flush every INTERVAL seconds until interrupted (default: flush once).")
+
+    def handle(self, *args, **options):
+        """Flush once, or periodically."""
+        while True:
+            started = time.monotonic()
+            posts, hits = flush()
+            if options['verbosity'] >= 1:
+                self.stdout.write("Flushed {} hit(s) of {} post(s) in {:.2f}s.".format(
+                    hits, posts, time.monotonic() - started))
+            if not options['interval']:
+                return
+            try:
+                time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,235 @@
+# coding=utf-8
+
+"""Import posts and comments from NDJSON or CSV files."""
+
+# Standard library
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+# Django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Current django project
+from newsletter.cache import LIST_HEAD_VERSION, LIST_VERSION, bump_version, get_sitemap_version_names
+from newsletter.management.commands.newsletter_rerender import render_rows
+from newsletter.models import Comment, Post
+from newsletter.pagination import get_count_version_name
+from newsletter.utils import disabled_auto_now
+
+MODELS = {
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def open_text(path):
+    """Open a file, gzipped or not, as text."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_rows(f, is_csv):
+    """Yield the rows of a CSV or NDJSON file as dictionaries."""
+    if is_csv:
+        yield from csv.DictReader(f)
+    else:
+        yield from (json.loads(line) for line in f if line.strip())
+
+
+class Command(BaseCommand):
+    """Import the posts and comments of another platform, or of ``newsletter_export``, without saving them one by one.
+
+    The records hold the fields of the export: ``id`` (optional), ``title``, ``author`` (a username), ``text``,
+    ``created`` and ``modified`` (optional) for the posts, and ``post`` (the id of a post) instead of ``title`` for the
+    comments. Their model is given by their ``model`` field, or by ``--model``. The posts must come before their
+    comments.
+    """
+
+    help = "Import posts and comments from NDJSON or CSV files, by batches."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('paths', nargs='+', metavar='path',
+                            help="NDJSON or CSV file to import, optionally gzipped, - for the standard input.")
+        parser.add_argument('--format', choices=('ndjson', 'csv'), dest='format',
+                            help="Format of the files (default: guessed from their extension, NDJSON otherwise).")
+        parser.add_argument('--model', choices=sorted(MODELS), dest='model',
+                            help="Model of the records without a model field.")
+        parser.add_argument('--batch-size', type=int, default=1000, dest='batch_size',
+                            help="Number of rows inserted per transaction (default: 1000).")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), dest='workers',
+                            help="Number of processes rendering the markdown of the posts, 0 renders in the current "
+                                 "process (default: number of CPUs).")
+
+    def handle(self, *args, **options):
+        """Insert the records batch by batch, rendering the posts in the pool while the previous ones are written."""
+        self.verbosity = options['verbosity']
+        self.authors = {}
+        self.counts = {Post: 0, Comment: 0}
+        # Smallest id of the imported posts: the ones without id come after the last post before the import
+        self.first_post_id = (Post.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        self.started = time.monotonic()
+
+        records = self.iter_records(options['paths'], options['format'], options['model'])
+        with ExitStack() as stack:
+            # The rows keep the dates of the records
+            stack.enter_context(disabled_auto_now(Post))
+            stack.enter_context(disabled_auto_now(Comment))
+            executor = None
+            if options['workers'] > 0:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=options['workers']))
+            self.import_batches(self.iter_batches(records, options['batch_size']), executor, options['workers'])
+
+        self.reset_sequences()
+        if self.counts[Post]:
+            # The comments are taken care of by their bulk_create, see `newsletter.models.CommentQuerySet`
+            last_post_id = Post.objects.aggregate(last=Max('pk'))['last']
+            bump_version(
+                get_count_version_name(Post),
+                LIST_VERSION,
+                LIST_HEAD_VERSION,
+                *get_sitemap_version_names(self.first_post_id, max(last_post_id, self.first_post_id))
+            )
+
+        count = self.counts[Post] + self.counts[Comment]
+        elapsed = time.monotonic() - self.started
+        self.stdout.write("Imported {} post(s) and {} comment(s) in {:.2f}s ({:.1f} rows/s).".format(
+            self.counts[Post], self.counts[Comment], elapsed, count / elapsed if elapsed else 0))
+
+    def import_batches(self, batches, executor, workers):
+        """Render and insert the batches, with at most two batches of posts per worker waiting to be written."""
+        pending = deque()
+        for model, records in batches:
+            objs = [self.build(model, record) for record in self.resolve_authors(records)]
+            if model is not Post:
+                # The comments may belong to the posts which are still rendered
+                while pending:
+                    self.write_posts(*pending.popleft())
+                self.write(model, objs)
+            elif executor is None:
+                for post in objs:
+                    post.render()
+                self.write(Post, objs)
+            else:
+                pending.append((objs, executor.submit(render_rows, [(i, post.text) for i, post in enumerate(objs)])))
+                if len(pending) >= 2 * workers:
+                    self.write_posts(*pending.popleft())
+        while pending:
+            self.write_posts(*pending.popleft())
+
+    def iter_records(self, paths, format, model):
+        """Yield the ``(model, record)`` pairs of the files."""
+        for path in paths:
+            name = path[:-len('.gz')] if path.endswith('.gz') else path
+            is_csv = format == 'csv' or (format is None and name.endswith('.csv'))
+            with ExitStack() as stack:
+                f = sys.stdin if path == '-' else stack.enter_context(open_text(path))
+                for record in read_rows(f, is_csv):
+                    label = (record.pop('model', None) or model or '').split('.')[-1]
+                    if label not in MODELS:
+                        raise CommandError("Record without a known model in {}: {!r}.".format(path, record))
+                    yield MODELS[label], record
+
+    @staticmethod
+    def iter_batches(records, batch_size):
+        """Group the consecutive records of the same model by batches."""
+        batch, batch_model = [], None
+        for model, record in records:
+            if batch and (model is not batch_model or len(batch) >= batch_size):
+                yield batch_model, batch
+                batch = []
+            batch_model = model
+            batch.append(record)
+        if batch:
+            yield batch_model, batch
+
+    def resolve_authors(self, records):
+        """Replace the usernames of the authors of the records by their ids, querying the unknown ones at once."""
+        user_model = get_user_model()
+        missing = {record.get('author') for record in records} - set(self.authors)
+        if missing:
+            lookup = '{}__in'.format(user_model.USERNAME_FIELD)
+            self.authors.update(
+                user_model._default_manager.filter(**{lookup: missing}).values_list(user_model.USERNAME_FIELD, 'pk')
+            )
+            unknown = missing - set(self.authors)
+            if unknown:
+                raise CommandError("Unknown author(s): {}.".format(', '.join(sorted(map(str, unknown)))))
+        for record in records:
+            record['author'] = self.authors[record['author']]
+        return records
+
+    def build(self, model, record):
+        """Return the unsaved object of a record."""
+        created = self.parse_date(record.get('created')) or timezone.now()
+        fields = {
+            'id': int(record['id']) if record.get('id') else None,
+            'author_id': record['author'],
+            'text': record.get('text') or '',
+            'created': created,
+            'modified': self.parse_date(record.get('modified')) or created,
+        }
+        if model is Post:
+            fields['title'] = record.get('title') or ''
+        else:
+            try:
+                fields['post_id'] = int(record['post'])
+            except (KeyError, TypeError, ValueError):
+                raise CommandError("Comment without a valid post: {!r}.".format(record))
+        return model(**fields)
+
+    @staticmethod
+    def parse_date(value):
+        """Return the aware datetime of an ISO 8601 string, None if there is none."""
+        if not value:
+            return None
+        date = parse_datetime(value)
+        if date is None:
+            raise CommandError("Invalid date: {!r}.".format(value))
+        if settings.USE_TZ and timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def write_posts(self, posts, future):
+        """Copy the fields rendered by the pool into the posts, then insert them."""
+        for post, rendered in zip(posts, future.result()):
+            for name in post.rendered_fields:
+                setattr(post, name, getattr(rendered, name))
+        self.write(Post, posts)
+
+    def write(self, model, objs):
+        """Insert a batch in its own transaction."""
+        with transaction.atomic():
+            model.objects.bulk_create(objs)
+        self.counts[model] += len(objs)
+        if model is Post:
+            self.first_post_id = min([self.first_post_id] + [post.pk for post in objs if post.pk is not None])
+
+        if self.verbosity >= 2:
+            count = self.counts[Post] + self.counts[Comment]
+            elapsed = time.monotonic() - self.started
+            self.stdout.write("{} row(s) imported ({:.1f} rows/s).".format(count, count / elapsed if elapsed else 0))
+
+    @staticmethod
+    def reset_sequences():
+        """Move the sequences of the primary keys after the imported ids, as ``loaddata`` does."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [Post, Comment])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,52 @@
+# coding=utf-8
+
+"""Repair the comment count of the posts."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Current django project
+from newsletter.models import Comment, Post
+from newsletter.utils import bulk_update
+
+
+class Command(BaseCommand):
+    """Recount the comments of the posts and fix the counts that drifted.
+
+    The counts are kept in sync by the signals, but some paths bypass them (``QuerySet.update`` moving comments to
+    another post, raw SQL...).
+    """
+
+    help = "Recount the comments of the posts and fix the counts that drifted."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--batch-size', type=int, default=1000, dest='batch_size',
+                            help="Number of posts checked per query (default: 1000).")
+
+    def handle(self, *args, **options):
+        """Check the posts by ranges of pk."""
+        counts = Comment.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(count=Count('pk'))
+        queryset = Post.objects.order_by('pk').annotate(
+            actual=Coalesce(Subquery(counts.values('count')), 0),
+        )
+
+        checked = repaired = 0
+        start = 0
+        while True:
+            pks = Post.objects.filter(pk__gt=start).order_by('pk').values_list('pk', flat=True)
+            pks = list(pks[:options['batch_size']])
+            if not pks:
+                break
+            start = pks[-1]
+            with transaction.atomic():
+                drifted = queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]).exclude(comment_count=F('actual'))
+                posts = [Post(pk=pk, comment_count=actual) for pk, actual in drifted.values_list('pk', 'actual')]
+                bulk_update(Post, posts, ['comment_count'])
+            checked += len(pks)
+            repaired += len(posts)
+
+        self.stdout.write("{} post(s) checked, {} comment count(s) repaired.".format(checked, repaired))
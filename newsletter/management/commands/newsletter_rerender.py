@@ -0,0 +1,127 @@
+# coding=utf-8
+
+"""Re-render the markdown text of every post in parallel."""
+
+# Standard library
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Django
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# Current django project
+from newsletter.cache import bump_post_versions
+from newsletter.utils import bulk_update
+
+
+def render_rows(rows):
+    """Render a chunk of ``(pk, text)`` rows into posts holding only their pk and their rendered fields.
+
+    Run in the worker processes, which never touch the database. The markdown is rendered without the cache of the
+    renderer: a re-render must not read back the HTML it is meant to replace, nor fill the cache with every post.
+    """
+    if not apps.ready:
+        django.setup()
+    from markdownx.utils import markdownify
+    from newsletter.models import Post
+    from newsletter.rendering import render_excerpt
+
+    posts = []
+    for pk, text in rows:
+        post = Post(pk=pk, text=text)
+        post.text_html = markdownify(text)
+        post.excerpt_html, post.word_count = render_excerpt(post.text_html)
+        posts.append(post)
+    return posts
+
+
+class Command(BaseCommand):
+    """Re-render the posts, for instance after an upgrade of django-markdownx or of its extensions."""
+
+    help = "Re-render the markdown text of every post across a pool of processes."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), dest='workers',
+                            help="Number of rendering processes, 0 renders in the current process "
+                                 "(default: number of CPUs).")
+        parser.add_argument('--chunk-size', type=int, default=500, dest='chunk_size',
+                            help="Number of posts read, rendered and written at once (default: 500).")
+        parser.add_argument('--checkpoint', dest='checkpoint',
+                            help="File in which the pk of the last written post is saved after each chunk.")
+        parser.add_argument('--resume', action='store_true', dest='resume',
+                            help="Start after the pk saved in the checkpoint file.")
+
+    def handle(self, *args, **options):
+        """Stream the posts by chunks to the workers and write the results back in pk order."""
+        self.verbosity = options['verbosity']
+        self.checkpoint = options['checkpoint']
+        if options['resume'] and not self.checkpoint:
+            raise CommandError("--resume requires --checkpoint.")
+        start = self.read_checkpoint() if options['resume'] else 0
+
+        chunks = self.iter_chunks(start, options['chunk_size'])
+        self.count = 0
+        self.started = time.monotonic()
+        if options['workers'] > 0:
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(render_rows, chunk))
+                    # Bound the number of chunks in flight so that memory stays flat
+                    if len(pending) >= 2 * options['workers']:
+                        self.write(pending.popleft().result())
+                while pending:
+                    self.write(pending.popleft().result())
+        else:
+            for chunk in chunks:
+                self.write(render_rows(chunk))
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write("Rendered {} post(s) in {:.2f}s ({:.1f} posts/s).".format(
+            self.count, elapsed, self.count / elapsed if elapsed else 0))
+
+    def iter_chunks(self, start, chunk_size):
+        """Yield the ``(pk, text)`` rows of the posts after the pk ``start`` by chunks."""
+        from newsletter.models import Post
+        queryset = Post.objects.filter(pk__gt=start).order_by('pk').values_list('pk', 'text')
+        chunk = []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def write(self, posts):
+        """Write a rendered chunk, then save its last pk in the checkpoint file."""
+        with transaction.atomic():
+            bulk_update(type(posts[0]), posts, posts[0].rendered_fields)
+        bump_post_versions(post.pk for post in posts)
+        self.count += len(posts)
+        self.write_checkpoint(posts[-1].pk)
+
+        if self.verbosity >= 2:
+            elapsed = time.monotonic() - self.started
+            self.stdout.write("{} post(s) rendered, last pk {} ({:.1f} posts/s).".format(
+                self.count, posts[-1].pk, self.count / elapsed if elapsed else 0))
+
+    def read_checkpoint(self):
+        """Return the pk saved in the checkpoint file, or 0 if there is none."""
+        try:
+            with open(self.checkpoint) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, pk):
+        """Save the pk in the checkpoint file."""
+        if self.checkpoint:
+            with open(self.checkpoint, 'w') as f:
+                f.write(str(pk))
@@ -0,0 +1,66 @@
+# coding=utf-8
+
+"""Mail a post to the subscribers."""
+
+# Standard library
+import time
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Current django project
+from newsletter.mailing import DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_EVERY, send_post
+from newsletter.models import Delivery, Post
+
+
+class Command(BaseCommand):
+    """Mail a post to the active subscribers, by batches sharing an SMTP connection (see `newsletter.mailing`).
+
+    A mailing which was interrupted is resumed with ``--resume``, which skips the subscribers who already got the post.
+    """
+
+    help = "Mail a post to the active subscribers."
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('post_id', type=int, help="Id of the post to mail.")
+        parser.add_argument('--batch-size', type=int, dest='batch_size',
+                            default=getattr(settings, 'NEWSLETTER_SEND_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+                            help="Number of messages sent over a connection (default: NEWSLETTER_SEND_BATCH_SIZE "
+                                 "setting or {}).".format(DEFAULT_BATCH_SIZE))
+        parser.add_argument('--flush-every', type=int, dest='flush_every',
+                            default=getattr(settings, 'NEWSLETTER_SEND_FLUSH_EVERY', DEFAULT_FLUSH_EVERY),
+                            help="Number of messages whose status is written at once (default: "
+                                 "NEWSLETTER_SEND_FLUSH_EVERY setting or {}).".format(DEFAULT_FLUSH_EVERY))
+        parser.add_argument('--resume', action='store_true', dest='resume',
+                            help="Only mail the subscribers to whom the post was not sent yet.")
+
+    def handle(self, *args, **options):
+        """Send the messages and report the throughput."""
+        try:
+            post = Post.objects.get(pk=options['post_id'])
+        except Post.DoesNotExist:
+            raise CommandError("Post {} does not exist.".format(options['post_id']))
+        if not options['resume'] and Delivery.objects.filter(post=post).exists():
+            raise CommandError("Post {} was already mailed, use --resume to mail the remaining subscribers.".format(
+                post.pk))
+
+        self.verbosity = options['verbosity']
+        self.started = time.monotonic()
+        sent = send_post(post, batch_size=options['batch_size'], flush_every=options['flush_every'],
+                         resume=options['resume'], callback=self.report)
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write("Sent {} message(s) in {:.2f}s ({:.1f} messages/s).".format(
+            sent, elapsed, sent / elapsed if elapsed else 0))
+        failed = Delivery.objects.filter(post=post, status=Delivery.FAILED).count()
+        if failed:
+            self.stderr.write("{} message(s) could not be sent, use --resume to retry.".format(failed))
+
+    def report(self, sent):
+        """Report the progress after every batch."""
+        if self.verbosity >= 2:
+            elapsed = time.monotonic() - self.started
+            self.stdout.write("{} message(s) sent ({:.1f} messages/s).".format(
+                sent, sent / elapsed if elapsed else 0))
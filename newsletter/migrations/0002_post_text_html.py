@@ -0,0 +1,27 @@
+# Generated by Django 2.1.15 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from markdownx.utils import markdownify
+
+
+def render_text_html(apps, schema_editor):
+    """Render the markdown text of the existing posts into the new column."""
+    Post = apps.get_model('newsletter', 'Post')
+    for post in Post.objects.only('pk', 'text').iterator():
+        Post.objects.filter(pk=post.pk).update(text_html=markdownify(post.text))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Post text rendered as HTML'),
+        ),
+        migrations.RunPython(render_text_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.1.15 on 2026-10-18 11:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def render_excerpt(html):
+    """Return the excerpt of a rendered text and its number of words.
+
+    Frozen copy of `newsletter.rendering.render_excerpt`, so that later changes to it do not change this migration.
+    """
+    words = getattr(settings, 'NEWSLETTER_EXCERPT_WORDS', 50)
+    return Truncator(html).words(words, html=True), len(strip_tags(html).split())
+
+
+def render_excerpts(apps, schema_editor):
+    """Compute the excerpt and the word count of the existing posts from their pre-rendered HTML."""
+    Post = apps.get_model('newsletter', 'Post')
+    for post in Post.objects.only('pk', 'text_html').iterator():
+        excerpt_html, word_count = render_excerpt(post.text_html)
+        Post.objects.filter(pk=post.pk).update(excerpt_html=excerpt_html, word_count=word_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0002_post_text_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Post excerpt rendered as HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Post word count'),
+        ),
+        migrations.RunPython(render_excerpts, migrations.RunPython.noop),
+    ]
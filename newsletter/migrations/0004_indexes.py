@@ -0,0 +1,33 @@
+# Generated by Django 2.1.15 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0003_post_excerpt_html_word_count'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('post_id', '-created'), 'verbose_name': 'comment'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-created', '-id'), 'verbose_name': 'post'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created'], name='nl_comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created', 'id'], name='nl_post_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'created'], name='nl_post_author_created_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-18 14:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    """Count the comments of the existing posts."""
+    Comment = apps.get_model('newsletter', 'Comment')
+    Post = apps.get_model('newsletter', 'Post')
+    counts = Comment.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(count=Count('pk'))
+    Post.objects.update(comment_count=Coalesce(Subquery(counts.values('count')), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Post comment count'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
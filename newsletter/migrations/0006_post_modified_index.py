@@ -0,0 +1,17 @@
+# Generated by Django 2.1.15 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0005_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['modified'], name='nl_post_modified_idx'),
+        ),
+    ]
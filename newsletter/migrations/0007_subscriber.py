@@ -0,0 +1,31 @@
+# Generated by Django 2.1.15 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0006_post_modified_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subscriber',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True, verbose_name='Subscriber email address')),
+                ('name', models.CharField(blank=True, max_length=256, verbose_name='Subscriber name')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Subscriber is active')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Subscriber creation date')),
+            ],
+            options={
+                'verbose_name': 'subscriber',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active', 'id'], name='nl_subscriber_active_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.1.15 on 2026-10-18 15:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0007_subscriber'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Delivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'Pending'), (1, 'Sent'), (2, 'Failed')], default=0, verbose_name='Delivery status')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='newsletter.Post')),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='newsletter.Subscriber')),
+            ],
+            options={
+                'verbose_name': 'delivery',
+                'verbose_name_plural': 'deliveries',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='delivery',
+            unique_together={('post', 'subscriber')},
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-18 15:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0008_delivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostStats',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='newsletter.Post')),
+                ('mailed', models.DateTimeField(blank=True, null=True, verbose_name='Post last mailing date')),
+                ('opens', models.PositiveIntegerField(default=0, verbose_name='Number of openings')),
+                ('unique_opens', models.PositiveIntegerField(default=0, verbose_name='Number of recipients who opened the mail')),
+                ('clicks', models.PositiveIntegerField(default=0, verbose_name='Number of clicks')),
+                ('unique_clicks', models.PositiveIntegerField(default=0, verbose_name='Number of recipients who clicked')),
+            ],
+            options={
+                'verbose_name': 'post statistics',
+                'verbose_name_plural': 'post statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,219 @@
+# coding=utf-8
+
+"""Pre-rendered MIME messages of the posts.
+
+A post is rendered once into the bytes of a multipart plain text and HTML message, in which the data of the
+recipient are placeholders whose offsets are computed at the same time. The message to a recipient is then made by
+splicing their escaped values between the slices of the skeleton and prepending their headers, without rendering any
+template nor building any MIME object.
+
+The parts with long lines are encoded by Django in quoted-printable, which may split the placeholders: such a post
+falls back to building a message per recipient from the rendered parts, still without rendering the templates again.
+The following settings can be used:
+
+* ``NEWSLETTER_MAIL_TEXT_TEMPLATE``: name of the template of the plain text part (default: `TEXT_TEMPLATE`).
+* ``NEWSLETTER_MAIL_HTML_TEMPLATE``: name of the template of the HTML part (default: `HTML_TEMPLATE`).
+
+Their context holds the ``post``, its HTML ``content_html``, and the ``name`` and ``unsubscribe_url`` of the
+recipient, whose name is their address if they have none. When the mails are tracked, the links of ``content_html``
+go through the click tracking view, and ``open_url`` is the URL of the tracking pixel of the recipient.
+"""
+
+# Standard library
+import html as html_parser
+import re
+from email.utils import formataddr, make_msgid
+
+# Django
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.message import DNS_NAME, sanitize_address
+from django.template import Context, Template, loader
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.http import urlencode
+
+# Current django project
+from newsletter.tokens import sign_url
+
+TEXT_TEMPLATE = """{% autoescape off %}Hello {{ name }},
+
+{{ post.text }}
+
+--
+Unsubscribe: {{ unsubscribe_url }}
+{% endautoescape %}"""
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<body>
+<p>Hello {{ name }},</p>
+{{ content_html|safe }}
+<p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>
+{% if open_url %}<img src="{{ open_url }}" width="1" height="1" alt="">{% endif %}
+</body>
+</html>
+"""
+
+# Data of the recipients, each with a placeholder per part since they are escaped in the HTML one
+FIELDS = ('name', 'unsubscribe_url', 'tracking_token')
+PLACEHOLDER = '@@NEWSLETTER:{}:{}@@'
+PLACEHOLDER_RE = re.compile(rb'@@NEWSLETTER:(text|html):(\w+)@@')
+ENCODED_PART_RE = re.compile(rb'^Content-Transfer-Encoding: (?:quoted-printable|base64)\r$', re.MULTILINE)
+LINK_RE = re.compile(r'(<a\s[^>]*?href=")(https?://[^"]+)(")')
+
+
+def render_template(setting, default, context):
+    """Render the template named by the setting, the default template string if there is none."""
+    name = getattr(settings, setting, None)
+    if name:
+        return loader.render_to_string(name, context)
+    return Template(default).render(Context(context))
+
+
+class SplicedMessage(object):
+    """MIME message given as bytes, with the interface of `email.message.Message` used by the email backends."""
+
+    def __init__(self, data):
+        """Create the message from its bytes, with CRLF line endings."""
+        self.data = data
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        """Return the bytes of the message."""
+        if linesep == '\r\n':
+            return self.data
+        return self.data.replace(b'\r\n', linesep.encode('ascii'))
+
+    def get_charset(self):
+        """Return the charset of the message, None as for a multipart one."""
+        return None
+
+
+class SplicedEmailMessage(EmailMessage):
+    """Email message whose MIME message is the bytes spliced from a `MessageSkeleton`."""
+
+    def __init__(self, data, subject, from_email, to):
+        """Create the email message."""
+        super().__init__(subject=subject, from_email=from_email, to=to)
+        self.data = data
+
+    def message(self):
+        """Return the spliced MIME message."""
+        return SplicedMessage(self.data)
+
+
+class MessageSkeleton(object):
+    """Message of a post to be personalized for each recipient."""
+
+    def __init__(self, subject, text, html, from_email):
+        """Build the MIME message once and find the placeholders in its bytes."""
+        self.subject = subject
+        self.text = text
+        self.html = html
+        self.from_email = from_email
+
+        message = EmailMultiAlternatives(subject, text, from_email)
+        message.attach_alternative(html, 'text/html')
+        mime = message.message()
+        # The Message-ID is the one header which must differ between the recipients
+        del mime['Message-ID']
+        data = mime.as_bytes(linesep='\r\n')
+
+        self.data = None
+        self.offsets = []
+        if ENCODED_PART_RE.search(data) is None:
+            # The spliced values may not be ASCII
+            self.data = data.replace(b'Content-Transfer-Encoding: 7bit\r\n', b'Content-Transfer-Encoding: 8bit\r\n')
+            self.offsets = [(match.start(), match.end(), (match.group(1).decode(), match.group(2).decode()))
+                            for match in PLACEHOLDER_RE.finditer(self.data)]
+
+    @property
+    def spliced(self):
+        """Return True if the messages are spliced, False if they are built from the rendered parts."""
+        return self.data is not None
+
+    @staticmethod
+    def get_values(**values):
+        """Return the values of the placeholders of each part."""
+        escaped = {}
+        for name, value in values.items():
+            escaped['text', name] = value
+            escaped['html', name] = escape(value)
+        return escaped
+
+    def get_headers(self, email, name, unsubscribe_url):
+        """Return the headers specific to a recipient."""
+        headers = [
+            ('To', sanitize_address((name, email), settings.DEFAULT_CHARSET)),
+            ('Message-ID', make_msgid(domain=DNS_NAME)),
+        ]
+        if unsubscribe_url:
+            headers.append(('List-Unsubscribe', '<{}>'.format(unsubscribe_url)))
+            if unsubscribe_url.startswith('https://'):
+                # The unsubscribe view accepts the POST of RFC 8058, which requires HTTPS
+                headers.append(('List-Unsubscribe-Post', 'List-Unsubscribe=One-Click'))
+        return headers
+
+    def splice(self, email, name, unsubscribe_url, **values):
+        """Return the bytes of the message to a recipient."""
+        values = self.get_values(name=name or email, unsubscribe_url=unsubscribe_url, **values)
+        view = memoryview(self.data)
+        chunks = [''.join('{}: {}\r\n'.format(*header) for header in self.get_headers(email, name, unsubscribe_url))
+                  .encode('utf-8')]
+        position = 0
+        for start, end, key in self.offsets:
+            chunks.append(view[position:start])
+            chunks.append(values.get(key, '').encode('utf-8'))
+            position = end
+        chunks.append(view[position:])
+        return b''.join(chunks)
+
+    def build_message(self, email, name, unsubscribe_url='', **values):
+        """Return the email message to a recipient, with the values of the other fields of `FIELDS`."""
+        if self.spliced:
+            return SplicedEmailMessage(self.splice(email, name, unsubscribe_url, **values), self.subject,
+                                       self.from_email, [email])
+
+        parts = {'text': self.text, 'html': self.html}
+        values = self.get_values(name=name or email, unsubscribe_url=unsubscribe_url, **values)
+        for part in parts:
+            for field in FIELDS:
+                parts[part] = parts[part].replace(PLACEHOLDER.format(part, field), values.get((part, field), ''))
+        headers = {key: value for key, value in self.get_headers(email, name, unsubscribe_url) if key != 'To'}
+        message = EmailMultiAlternatives(self.subject, parts['text'], self.from_email, [formataddr((name, email))],
+                                         headers=headers)
+        message.attach_alternative(parts['html'], 'text/html')
+        return message
+
+
+def track_links(content_html, base_url, token):
+    """Return the HTML with its absolute links going through the click tracking view.
+
+    The targets are signed here, once for all the recipients, the token is the one of the recipient.
+    """
+    prefix = base_url + reverse('newsletter:track-click', kwargs={'token': token})
+
+    def replace(match):
+        url = html_parser.unescape(match.group(2))
+        tracked = '{}?{}'.format(prefix, urlencode({'url': url, 'sig': sign_url(url)}))
+        return match.group(1) + escape(tracked) + match.group(3)
+    return LINK_RE.sub(replace, content_html)
+
+
+def compile_post(post, from_email, base_url='', tracking=False):
+    """Render the templates of the mail of a post once, with placeholders for the data of the recipients.
+
+    The URLs of the tracking views are prefixed with ``base_url``, the scheme and domain of the site.
+    """
+    def context(part):
+        placeholders = {field: PLACEHOLDER.format(part, field) for field in FIELDS}
+        context = dict(placeholders, post=post, content_html=post.text_html, open_url='')
+        if tracking:
+            token = placeholders['tracking_token']
+            context['content_html'] = track_links(post.text_html, base_url, token)
+            context['open_url'] = base_url + reverse('newsletter:track-open', kwargs={'token': token})
+        return context
+
+    text = render_template('NEWSLETTER_MAIL_TEXT_TEMPLATE', TEXT_TEMPLATE, context('text'))
+    html = render_template('NEWSLETTER_MAIL_HTML_TEMPLATE', HTML_TEMPLATE, context('html'))
+    return MessageSkeleton(post.title, text, html, from_email)
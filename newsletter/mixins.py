@@ -0,0 +1,186 @@
+# coding=utf-8
+
+"""Mixins of the newsletter views."""
+
+# Standard library
+import hashlib
+import logging
+from calendar import timegm
+
+# Django
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# Current django project
+from newsletter.cache import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceededError(Exception):
+    """A view ran more queries than its budget."""
+
+    pass
+
+
+class AnonymousPageCacheMixin(object):
+    """Cache the whole page served to the anonymous users.
+
+    The key of a page is made of its URL and of the versions of the data it shows (see `get_page_cache_versions`),
+    which the signals of the newsletter models bump when the data change. The pages of the authenticated users are
+    never cached: they show their messages, their permissions and a CSRF token bound to their session. As with
+    ``UpdateCacheMiddleware``, neither are the pages which set a cookie or use the CSRF token of the visitor, since
+    they cannot be shared.
+
+    The cache is enabled by ``NEWSLETTER_PAGE_CACHE_TIMEOUT``, the timeout of the pages in seconds (default: 0, the
+    pages are not cached).
+    """
+
+    def get_page_cache_versions(self):
+        """Return the names of the versions of the data shown by the page."""
+        raise NotImplementedError("Subclasses of AnonymousPageCacheMixin must provide get_page_cache_versions().")
+
+    def get_page_cache_timeout(self):
+        """Return the timeout of the cached page in seconds."""
+        return getattr(settings, 'NEWSLETTER_PAGE_CACHE_TIMEOUT', 0)
+
+    def get_page_cache_key(self):
+        """Return the key of the page, or None if it must not be cached."""
+        request = self.request
+        if request.method != 'GET' or request.user.is_authenticated or not self.get_page_cache_timeout():
+            return None
+        # Counting the messages does not mark them as read
+        if len(messages.get_messages(request)):
+            return None
+        url = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+        return 'newsletter:page:{}:{}'.format(url, ':'.join(get_versions(*self.get_page_cache_versions())))
+
+    def dispatch(self, request, *args, **kwargs):
+        """Serve the page from the cache when possible, and cache it otherwise."""
+        key = self.get_page_cache_key()
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers:
+                response[header] = value
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            def store(response):
+                if response.cookies or request.META.get('CSRF_COOKIE_USED'):
+                    return
+                cache.set(key, (response.content, list(response.items())), self.get_page_cache_timeout())
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+
+class ConditionalGetMixin(object):
+    """Answer the conditional requests of the anonymous users before doing any work.
+
+    The validators of a page are the date of the last modification of the data it shows (see `get_last_modified`),
+    which should come from a single ``MAX(modified)`` query, and an optional ETag (see `get_etag`). A request whose
+    ``If-None-Match`` or ``If-Modified-Since`` header matches them gets a 304 without rendering anything.
+
+    Deleting a row does not move the last modification date, so the pages listing rows should provide an ETag, which
+    takes precedence over the date when the client sends both.
+    """
+
+    def get_last_modified(self):
+        """Return the date of the last modification of the data shown by the page, or None if it is unknown."""
+        raise NotImplementedError("Subclasses of ConditionalGetMixin must provide get_last_modified().")
+
+    def get_etag(self):
+        """Return a string that changes whenever the page changes, or None."""
+        return None
+
+    def get_validators(self):
+        """Return the quoted ETag and the last modification timestamp of the page, or None if it has none."""
+        request = self.request
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return None
+        # The messages are shown once, the page is not the same on the next request
+        if len(messages.get_messages(request)):
+            return None
+
+        last_modified = self.get_last_modified()
+        etag = self.get_etag()
+        if last_modified is None and etag is None:
+            return None
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        if etag is not None:
+            etag = quote_etag(hashlib.md5('{}:{}'.format(etag, last_modified).encode('utf-8')).hexdigest())
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        """Return a 304 if the page has not changed, and add the validators to the full responses."""
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            if etag is not None and not response.has_header('ETag'):
+                response['ETag'] = etag
+            if last_modified is not None and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class QueryBudgetMixin(object):
+    """Count the queries run by the view, including the rendering of its template, against a budget.
+
+    Going over ``query_budget`` queries logs a warning, or raises `QueryBudgetExceededError` if
+    ``NEWSLETTER_QUERY_BUDGET_STRICT`` is set (default: False), as in the settings of the tests, so that a regression
+    such as a query per row of a list shows up in the tests instead of in production.
+    """
+
+    query_budget = None
+
+    def get_query_budget(self):
+        """Return the maximum number of queries of the view, None if it has no budget."""
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        """Run the view and render its response while counting the queries."""
+        budget = self.get_query_budget()
+        if budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connections[self.model.objects.db].execute_wrapper(count):
+            response = super().dispatch(request, *args, **kwargs)
+            # The template responses are rendered after the view returns, render them while the queries are counted
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+
+        if len(queries) > budget:
+            message = "{} ran {} queries, over its budget of {}.".format(type(self).__name__, len(queries), budget)
+            if getattr(settings, 'NEWSLETTER_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceededError(message)
+            logger.warning(message)
+        return response
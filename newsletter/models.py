@@ -1,15 +1,60 @@
 # -*- coding: utf-8 -*-
 """Django Newsletter model implementation."""
 
+# Standard library
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
 # Third-party
 from markdownx.models import MarkdownxField
-from markdownx.utils import markdownify
 
 # Django
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+# Current django project
+from newsletter.cache import LIST_HEAD_VERSION, bump_version, get_post_version_name
+from newsletter.pagination import get_count_version_name
+from newsletter.rendering import render_excerpt, render_markdown
+
+
+class CommentDeletions(threading.local):
+    """Deletions of comments in progress in the current thread, see `newsletter.signals.decrement_comment_count`."""
+
+    def __init__(self):
+        """Start with no deletion in progress."""
+        # Primary keys of the posts being deleted, whose comments deleted in cascade need not be uncounted
+        self.posts = set()
+        # Number of comments deleted per post by the bulk deletion in progress, None if there is none
+        self.counts = None
+
+    @contextmanager
+    def deleting_posts(self):
+        """Forget the posts marked as being deleted within the block when it exits, even if their deletion failed."""
+        posts = set(self.posts)
+        try:
+            yield
+        finally:
+            self.posts.intersection_update(posts)
+
+
+comment_deletions = CommentDeletions()
+
+
+class PostQuerySet(models.QuerySet):
+    """Post queryset that does not leave the deleted posts marked if the deletion fails."""
+
+    def delete(self):
+        """Delete the posts, see `CommentDeletions.deleting_posts`."""
+        with comment_deletions.deleting_posts():
+            return super().delete()
+
 
 class Post(models.Model):
     """Post model."""
@@ -17,20 +62,113 @@ class Post(models.Model):
     title = models.CharField(_("Post title"), max_length=512)
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     text = MarkdownxField(_('Post text'))
+    text_html = models.TextField(_('Post text rendered as HTML'), blank=True, editable=False)
+    excerpt_html = models.TextField(_('Post excerpt rendered as HTML'), blank=True, editable=False)
+    word_count = models.PositiveIntegerField(_('Post word count'), default=0, editable=False)
+    comment_count = models.PositiveIntegerField(_('Post comment count'), default=0, editable=False)
     created = models.DateTimeField('Post creation date', auto_now_add=True)
     modified = models.DateTimeField('Post last modification date', auto_now=True)
 
+    # Fields computed from the markdown text by `render`
+    rendered_fields = ('text_html', 'excerpt_html', 'word_count')
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("post")
-        ordering = ("-created",)
+        ordering = ("-created", "-id")
+        indexes = [
+            models.Index(fields=['created', 'id'], name='nl_post_created_id_idx'),
+            models.Index(fields=['author', 'created'], name='nl_post_author_created_idx'),
+            models.Index(fields=['modified'], name='nl_post_modified_idx'),
+        ]
 
     def __str__(self):
         """Representation as a string."""
         return self.title
 
+    def get_absolute_url(self):
+        """Return the URL of the detail page of the post, dated in the current time zone as the view expects."""
+        created = timezone.localtime(self.created) if timezone.is_aware(self.created) else self.created
+        return reverse('newsletter:post-detail-date', kwargs={
+            'year': created.year,
+            'month': created.month,
+            'day': created.day,
+            'pk': self.pk
+        })
+
+    def save(self, *args, **kwargs):
+        """Render the markdown text once so that the read path never runs the parser."""
+        self.render()
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete the post, see `CommentDeletions.deleting_posts`."""
+        with comment_deletions.deleting_posts():
+            return super().delete(*args, **kwargs)
+
+    def render(self):
+        """Render the markdown text into the stored HTML, excerpt and word count columns."""
+        self.text_html = render_markdown(self.text)
+        self.excerpt_html, self.word_count = render_excerpt(self.text_html)
+
     def text_md(self):
         """Return the text mardownified."""
-        return markdownify(self.text)
+        return self.text_html
+
+    @classmethod
+    def add_to_comment_count(cls, pk, delta):
+        """Add delta to the comment count of a post in the database, without reading it."""
+        queryset = cls.objects.filter(pk=pk)
+        if delta < 0:
+            # A drifted count must not go below zero
+            queryset.update(comment_count=Greatest(F('comment_count'), -delta) + delta)
+        else:
+            queryset.update(comment_count=F('comment_count') + delta)
+
+    @classmethod
+    def get_last_modified(cls, pk):
+        """Return the date of the last modification of a post or of its comments, None if the post does not exist."""
+        row = cls.objects.filter(pk=pk).annotate(
+            last_comment=Max('comment__modified'),
+        ).values_list('modified', 'last_comment').first()
+        if row is None:
+            return None
+        return max(date for date in row if date is not None)
+
+
+class CommentQuerySet(models.QuerySet):
+    """Comment queryset that keeps the comment count of the posts and the caches in sync on bulk operations."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create the comments and add them to the comment count of their post, one query per post."""
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            counts = Counter(obj.post_id for obj in objs)
+            for post_id, count in counts.items():
+                Post.add_to_comment_count(post_id, count)
+        # No signal is sent, invalidate what the receivers of `newsletter.signals` would have
+        bump_version(
+            get_count_version_name(self.model),
+            LIST_HEAD_VERSION,
+            *[get_post_version_name(post_id) for post_id in counts]
+        )
+        return objs
+
+    def delete(self):
+        """Delete the comments and remove them from the comment count of their post, one query per post."""
+        if comment_deletions.counts is not None:
+            return super().delete()
+
+        comment_deletions.counts = Counter()
+        try:
+            with transaction.atomic(using=self.db):
+                result = super().delete()
+                for post_id, count in comment_deletions.counts.items():
+                    Post.add_to_comment_count(post_id, -count)
+        finally:
+            comment_deletions.counts = None
+        return result
 
 
 class Comment(models.Model):
@@ -42,10 +180,87 @@ class Comment(models.Model):
     created = models.DateTimeField('Comment creation date', auto_now_add=True)
     modified = models.DateTimeField('Comment last modification date', auto_now=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("comment")
-        ordering = ("post", "-created",)
+        ordering = ("post_id", "-created",)
+        indexes = [
+            models.Index(fields=['post', 'created'], name='nl_comment_post_created_idx'),
+        ]
 
     def __str__(self):
         """Representation as a string."""
         return "{} - {} ({})".format(self.post.title, self.author, self.id)
+
+    def save(self, *args, **kwargs):
+        """Save the comment in the same transaction as the update of the comment count done by the signals."""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class Subscriber(models.Model):
+    """Subscriber to whom the posts are mailed."""
+
+    email = models.EmailField(_("Subscriber email address"), unique=True)
+    name = models.CharField(_("Subscriber name"), max_length=256, blank=True)
+    is_active = models.BooleanField(_("Subscriber is active"), default=True)
+    created = models.DateTimeField('Subscriber creation date', auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("subscriber")
+        ordering = ("id",)
+        indexes = [
+            # The sends walk the active subscribers by primary key
+            models.Index(fields=['is_active', 'id'], name='nl_subscriber_active_id_idx'),
+        ]
+
+    def __str__(self):
+        """Representation as a string."""
+        return self.email
+
+
+class Delivery(models.Model):
+    """Journal entry of the mailing of a post to a subscriber, which lets an interrupted mailing be resumed."""
+
+    PENDING = 0
+    SENT = 1
+    FAILED = 2
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (SENT, _("Sent")),
+        (FAILED, _("Failed")),
+    )
+
+    post = models.ForeignKey('Post', on_delete=models.CASCADE)
+    subscriber = models.ForeignKey('Subscriber', on_delete=models.CASCADE)
+    status = models.PositiveSmallIntegerField(_("Delivery status"), choices=STATUS_CHOICES, default=PENDING)
+
+    class Meta:
+        verbose_name = _("delivery")
+        verbose_name_plural = _("deliveries")
+        # Also the index of the lookups of the subscribers of a post
+        unique_together = (('post', 'subscriber'),)
+
+    def __str__(self):
+        """Representation as a string."""
+        return "{} - {} ({})".format(self.post_id, self.subscriber_id, self.get_status_display())
+
+
+class PostStats(models.Model):
+    """Aggregated tracking counters of the mails of a post, written by batches (see `newsletter.tracking`)."""
+
+    post = models.OneToOneField('Post', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    mailed = models.DateTimeField('Post last mailing date', null=True, blank=True)
+    opens = models.PositiveIntegerField(_("Number of openings"), default=0)
+    unique_opens = models.PositiveIntegerField(_("Number of recipients who opened the mail"), default=0)
+    clicks = models.PositiveIntegerField(_("Number of clicks"), default=0)
+    unique_clicks = models.PositiveIntegerField(_("Number of recipients who clicked"), default=0)
+
+    class Meta:
+        verbose_name = _("post statistics")
+        verbose_name_plural = _("post statistics")
+
+    def __str__(self):
+        """Representation as a string."""
+        return "{} ({} opening(s), {} click(s))".format(self.post_id, self.opens, self.clicks)
@@ -0,0 +1,254 @@
+# coding=utf-8
+
+"""Paginators of the newsletter listings.
+
+The following settings can be used:
+
+* ``NEWSLETTER_COUNT_CACHE_TIMEOUT``: timeout in seconds of the cached counts (default: one hour).
+* ``NEWSLETTER_FILTERED_COUNT_CACHE_TIMEOUT``: timeout in seconds of the cached counts of the filtered querysets,
+  which bounds the time they stay wrong after a ``QuerySet.update()`` (default: one minute).
+* ``NEWSLETTER_COUNT_ESTIMATE_THRESHOLD``: number of rows above which the count of a whole table is taken from the
+  statistics of the database instead of ``COUNT(*)`` (default: None, the count is always exact).
+"""
+
+# Standard library
+import base64
+import binascii
+import hashlib
+import json
+import logging
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# Current django project
+from newsletter.cache import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(Exception):
+    """The cursor token cannot be decoded."""
+
+    pass
+
+
+class CursorPage(object):
+    """Page of a `CursorPaginator`.
+
+    Follow the interface of `django.core.paginator.Page` that makes sense without a count, so that the templates can
+    use ``has_next``, ``has_previous`` and ``has_other_pages`` whatever the pagination mode.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        """Create the page."""
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        """Representation of the page."""
+        return '<CursorPage of {} object(s)>'.format(len(self.object_list))
+
+    def __len__(self):
+        """Return the number of objects of the page."""
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        """Return an object of the page."""
+        return self.object_list[index]
+
+    def has_next(self):
+        """Return True if there is a page after this one."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Return True if there is a page before this one."""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        """Return True if there is a page before or after this one."""
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator(object):
+    """Keyset paginator.
+
+    A page is selected by the values of the ordering fields of its neighbour instead of an offset, so that the
+    database seeks the page through an index whatever its depth and never counts the rows. The ordering must be
+    unique, hence it ends with the primary key.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created', '-id')):
+        """Create the paginator."""
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, previous=False):
+        """Return the opaque token of the page after (or before if ``previous``) the object or row of ``values()``."""
+        # Serialize as the fields do, the JSON encoder of Django truncates the microseconds
+        meta = self.queryset.model._meta
+        if isinstance(obj, dict):
+            obj = self.queryset.model(**{name: obj[name] for name in self.fields})
+        data = {'v': [meta.get_field(name).value_to_string(obj) for name in self.fields]}
+        if previous:
+            data['p'] = 1
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        """Return the values of the ordering fields and the direction stored in the token."""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            values = data['v']
+            if len(values) != len(self.fields):
+                raise InvalidCursorError(cursor)
+            meta = self.queryset.model._meta
+            values = [meta.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except (InvalidCursorError, ValueError, TypeError, KeyError, UnicodeError, binascii.Error, ValidationError):
+            raise InvalidCursorError(cursor)
+        return values, bool(data.get('p'))
+
+    def get_filter(self, values, previous):
+        """Return the condition selecting the rows after (or before if ``previous``) the values."""
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            lookup = 'gt' if name.startswith('-') == previous else 'lt'
+            equal = {field: value for field, value in zip(self.fields[:i], values[:i])}
+            condition |= Q(**equal, **{'{}__{}'.format(self.fields[i], lookup): values[i]})
+        # The redundant bound on the first field lets the database seek the index instead of scanning it
+        lookup = 'gte' if self.ordering[0].startswith('-') == previous else 'lte'
+        return Q(**{'{}__{}'.format(self.fields[0], lookup): values[0]}) & condition
+
+    def page(self, cursor=None):
+        """Return the page designated by the cursor, the first page if there is none."""
+        previous = False
+        queryset = self.queryset
+        if cursor:
+            values, previous = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.get_filter(values, previous))
+
+        if previous:
+            ordering = [name[1:] if name.startswith('-') else '-' + name for name in self.ordering]
+        else:
+            ordering = self.ordering
+        # Fetch one more row to know whether there is another page in this direction
+        object_list = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if previous:
+            object_list.reverse()
+
+        if not object_list:
+            return CursorPage(object_list, self)
+        has_next = has_more if not previous else True
+        has_previous = has_more if previous else bool(cursor)
+        return CursorPage(
+            object_list,
+            self,
+            next_cursor=self.encode_cursor(object_list[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor(object_list[0], previous=True) if has_previous else None,
+        )
+
+
+def get_count_version_name(model):
+    """Return the name of the version of the counts of a model."""
+    return 'count:{}'.format(model._meta.label_lower)
+
+
+def get_filtered_count_version_name(model):
+    """Return the name of the version of the filtered counts of a model, which also change when a row is edited."""
+    return 'count:{}:filtered'.format(model._meta.label_lower)
+
+
+def estimate_count(model, using='default'):
+    """Return the number of rows of the table of the model according to the statistics of the database.
+
+    Return None if the database has no statistics about the table: the SQLite ones only exist after an ``ANALYZE``.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql, params = "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [connection.ops.quote_name(table)]
+    elif connection.vendor == 'mysql':
+        sql = "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s"
+        params = [table]
+    elif connection.vendor == 'sqlite':
+        # The first number of the statistics of any index of the table is its number of rows
+        sql, params = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table]
+    else:
+        return None
+
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        logger.debug("No statistics about the table %s.", table)
+        return None
+    if row is None or row[0] is None:
+        return None
+    return int(float(str(row[0]).split()[0]))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose count is cached until a row of the model is created or deleted.
+
+    The cached counts are invalidated by the signals of the newsletter models (see `newsletter.signals`). The counts
+    of the filtered querysets are also invalidated when a row is saved, since it may enter or leave the filter, and
+    expire sooner since the rows updated by ``QuerySet.update()`` send no signal. Above
+    ``NEWSLETTER_COUNT_ESTIMATE_THRESHOLD`` rows, the count of an unfiltered queryset is an estimate from the database
+    statistics.
+    """
+
+    @cached_property
+    def count(self):
+        """Return the number of objects, from the cache when possible."""
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        names = [get_count_version_name(queryset.model)]
+        filtered = bool(queryset.query.where)
+        if filtered:
+            names.append(get_filtered_count_version_name(queryset.model))
+        key = 'newsletter:count:{}:{}:{}'.format(
+            queryset.db,
+            ':'.join(get_versions(*names)),
+            hashlib.md5(sql.encode('utf-8')).hexdigest(),
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self.estimate_count(queryset)
+            if count is None:
+                count = queryset.count()
+            if filtered:
+                timeout = getattr(settings, 'NEWSLETTER_FILTERED_COUNT_CACHE_TIMEOUT', 60)
+            else:
+                timeout = getattr(settings, 'NEWSLETTER_COUNT_CACHE_TIMEOUT', 3600)
+            cache.set(key, count, timeout)
+        return count
+
+    @staticmethod
+    def estimate_count(queryset):
+        """Return the estimated count of the queryset if it is unfiltered and large enough, None otherwise."""
+        threshold = getattr(settings, 'NEWSLETTER_COUNT_ESTIMATE_THRESHOLD', None)
+        query = queryset.query
+        if threshold is None or query.where or query.distinct or query.low_mark or query.high_mark is not None:
+            return None
+        estimate = estimate_count(queryset.model, using=queryset.db)
+        if estimate is None or estimate < threshold:
+            return None
+        return estimate
@@ -0,0 +1,333 @@
+# coding=utf-8
+
+"""Markdown rendering of the posts.
+
+The rendered HTML is keyed on a hash of the markdown source and of the renderer configuration. It is stored in the
+Django cache backend with an in-process LRU in front of it, so that an identical body is never rendered twice.
+
+Large texts are split into top-level blocks that are cached independently, so that an edit only renders the blocks it
+changed. The reassembled HTML is identical to the one of a full render: the texts that cannot be split safely are
+rendered as a whole, as are all the texts when an extension which is not known to keep the blocks independent (see
+`SPLIT_SAFE_EXTENSIONS`) is enabled.
+
+The following settings can be used:
+
+* ``NEWSLETTER_RENDER_CACHE_SIZE``: maximum number of entries of the in-process LRU (default: 1024, 0 disables it).
+* ``NEWSLETTER_RENDER_CACHE_TTL``: lifetime in seconds of the in-process entries (default: 300, None for no expiry).
+* ``NEWSLETTER_RENDER_CACHE_ALIAS``: alias of the Django cache backend (default: ``'default'``, None disables it).
+* ``NEWSLETTER_RENDER_CACHE_TIMEOUT``: timeout in seconds of the shared entries (default: one day).
+* ``NEWSLETTER_RENDER_BLOCK_THRESHOLD``: length from which a text is rendered block by block (default: 4096, None
+  disables it).
+* ``NEWSLETTER_EXCERPT_WORDS``: number of words of the excerpts shown in the post list (default: 50).
+"""
+
+# Standard library
+import hashlib
+import importlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Third-party
+from markdownx.settings import MARKDOWNX_MARKDOWN_EXTENSION_CONFIGS, MARKDOWNX_MARKDOWN_EXTENSIONS
+from markdownx.utils import markdownify
+
+# Django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'newsletter:md'
+
+# Extensions whose output is known to be the same block by block, the others (e.g. codehilite, which keeps the
+# separators of the raw HTML of the indented code, or toc, whose header ids are unique in the whole document) are
+# rendered with the whole document
+SPLIT_SAFE_EXTENSIONS = (
+    'extra', 'abbr', 'attr_list', 'def_list', 'fenced_code', 'footnotes', 'md_in_html', 'tables',
+    'nl2br', 'sane_lists',
+)
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+LIST_RE = re.compile(r'^ {0,3}([*+-]|\d+\.)[ \t]')
+# Reference links, footnotes and abbreviations are defined in one block and used in the others
+DEFINITION_RE = re.compile(r'^ {0,3}(\*?\[[^\]]*\]:)', re.MULTILINE)
+# Raw HTML blocks may contain blank lines
+HTML_RE = re.compile(r'^ {0,3}<', re.MULTILINE)
+
+
+def is_split_safe(extension):
+    """Return True if the extension is known to render the same block by block.
+
+    The extension is given by name (``'extra'``, ``'markdown.extensions.extra:ExtraExtension'``...) or as an instance,
+    which is never considered safe since its configuration is unknown.
+    """
+    if not isinstance(extension, str):
+        return False
+    name = extension.split(':', 1)[0]
+    if name.startswith('markdown.extensions.'):
+        name = name[len('markdown.extensions.'):]
+    return name in SPLIT_SAFE_EXTENSIONS
+
+
+def continues(previous, lines):
+    """Return True if the block made of the lines may continue the previous block.
+
+    It is the case of an indented block (code, list item content), a list item following a list, a quote following a
+    quote, a definition following its term or another definition list, and of any block ending with fenced code since
+    the fenced code extension keeps the separator of the raw HTML it produces.
+    """
+    first = lines[0]
+    return (
+        first[0] in ' \t'
+        or first.startswith(':')
+        or FENCE_RE.match(previous[-1])
+        or (LIST_RE.match(first) and any(LIST_RE.match(line) for line in previous))
+        or (first.startswith('>') and any(line.lstrip().startswith('>') for line in previous))
+        or (any(line.startswith(':') for line in lines) and any(line.startswith(':') for line in previous))
+    )
+
+
+def group_lines(text):
+    """Yield the ``(blank lines before the group, lines of the group)`` of the text separated by blank lines."""
+    blanks, current, fence = [], [], None
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if fence is None and not stripped:
+            if current:
+                yield blanks, current
+                blanks, current = [], []
+            blanks.append(line)
+            continue
+        match = FENCE_RE.match(line)
+        if fence is None and match:
+            fence = match.group(1)[0]
+        elif fence is not None and set(stripped) == {fence} and len(stripped) >= 3:
+            fence = None
+        current.append(line)
+    if current:
+        yield blanks, current
+
+
+def split_blocks(text):
+    """Split a markdown text into top-level blocks that render independently.
+
+    The blocks are separated by blank lines. A block stays attached to the previous one when it may continue it (see
+    `continues`). Blank lines inside fenced code never split.
+
+    Return None when the text cannot be split safely.
+    """
+    if '\r' in text or DEFINITION_RE.search(text) or HTML_RE.search(text):
+        return None
+    if not all(is_split_safe(extension) for extension in MARKDOWNX_MARKDOWN_EXTENSIONS):
+        return None
+
+    blocks = []
+    for blanks, lines in group_lines(text):
+        if blocks and continues(blocks[-1], lines):
+            blocks[-1].extend(blanks + lines)
+        else:
+            blocks.append(lines)
+
+    if len(blocks) < 2:
+        return None
+    return ['\n'.join(lines) for lines in blocks]
+
+
+def get_extension_module(extension):
+    """Return the name of the module of a markdown extension, given by name or as an instance."""
+    if isinstance(extension, str):
+        return extension.split(':', 1)[0]
+    return type(extension).__module__
+
+
+def get_package_version(module_name):
+    """Return the version of the top-level package of a module, an empty string if it is unknown."""
+    try:
+        package = importlib.import_module(module_name.split('.', 1)[0])
+    except ImportError:
+        return ''
+    return str(getattr(package, '__version__', getattr(package, 'version', '')))
+
+
+class LRUCache(object):
+    """Thread-safe least recently used cache whose entries expire after a time-to-live."""
+
+    def __init__(self, maxsize, ttl=None):
+        """Create an empty cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of entries, expired or not."""
+        return len(self._data)
+
+    def get(self, key):
+        """Return the value stored for the key or None if it is missing or expired."""
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return None
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store the value and evict the least recently used entries above the maximum size."""
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock:
+            self._data.clear()
+
+
+class MarkdownRenderer(object):
+    """Render markdown through a two-tier cache: the in-process LRU, then the Django cache backend."""
+
+    def __init__(self, maxsize=1024, ttl=300, cache_alias='default', cache_timeout=86400, block_threshold=4096):
+        """Create a renderer with an empty in-process tier."""
+        self.local = LRUCache(maxsize, ttl)
+        self.block_threshold = block_threshold
+        self.cache_alias = cache_alias
+        self.cache_timeout = cache_timeout
+        self.signature = self.get_signature()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @staticmethod
+    def get_signature():
+        """Return a string that changes whenever the output of the renderer may change.
+
+        It holds the versions of markdown, of django-markdownx and of the packages of the extensions, so that an
+        upgrade of any of them changes every key.
+        """
+        return repr((
+            get_package_version('markdown'),
+            get_package_version('markdownx'),
+            MARKDOWNX_MARKDOWN_EXTENSIONS,
+            [get_package_version(get_extension_module(extension)) for extension in MARKDOWNX_MARKDOWN_EXTENSIONS],
+            sorted(MARKDOWNX_MARKDOWN_EXTENSION_CONFIGS.items()),
+        ))
+
+    @property
+    def shared(self):
+        """Return the Django cache backend, or None when the shared tier is disabled."""
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    @property
+    def stats(self):
+        """Return the hit and miss counters of the renderer."""
+        return dict(self._stats)
+
+    def reset_stats(self):
+        """Reset the hit and miss counters."""
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def get_key(self, text):
+        """Return the cache key of a markdown text."""
+        digest = hashlib.sha256()
+        digest.update(self.signature.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return '{}:{}'.format(KEY_PREFIX, digest.hexdigest())
+
+    def render(self, text):
+        """Return the HTML of the markdown text, rendering it only if no tier knows it yet."""
+        return self._render(text, split=True)
+
+    def _render(self, text, split):
+        if not text:
+            return ''
+
+        key = self.get_key(text)
+        html = self.local.get(key)
+        if html is not None:
+            self._count('local_hits')
+            return html
+
+        shared = self.shared
+        html = shared.get(key) if shared is not None else None
+        if html is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            blocks = None
+            if split and self.block_threshold and len(text) >= self.block_threshold:
+                blocks = split_blocks(text)
+            if blocks:
+                # A block rendering to nothing must not add a separator
+                html = '\n'.join(filter(None, (self._render(block, split=False) for block in blocks)))
+            else:
+                html = markdownify(text)
+            if shared is not None:
+                shared.set(key, html, self.cache_timeout)
+
+        self.local.set(key, html)
+        return html
+
+    def clear(self):
+        """Empty the in-process tier.
+
+        The shared tier does not need to be cleared: a change of configuration changes every key.
+        """
+        self.local.clear()
+
+
+_renderer = None
+
+
+def get_renderer():
+    """Return the renderer configured from the settings."""
+    global _renderer
+    if _renderer is None:
+        _renderer = MarkdownRenderer(
+            maxsize=getattr(settings, 'NEWSLETTER_RENDER_CACHE_SIZE', 1024),
+            ttl=getattr(settings, 'NEWSLETTER_RENDER_CACHE_TTL', 300),
+            cache_alias=getattr(settings, 'NEWSLETTER_RENDER_CACHE_ALIAS', 'default'),
+            cache_timeout=getattr(settings, 'NEWSLETTER_RENDER_CACHE_TIMEOUT', 86400),
+            block_threshold=getattr(settings, 'NEWSLETTER_RENDER_BLOCK_THRESHOLD', 4096),
+        )
+    return _renderer
+
+
+def render_markdown(text):
+    """Return the HTML of a markdown text."""
+    return get_renderer().render(text)
+
+
+def render_excerpt(html):
+    """Return the excerpt of a rendered text, with its tags closed, and the number of words of the text."""
+    words = getattr(settings, 'NEWSLETTER_EXCERPT_WORDS', 50)
+    return Truncator(html).words(words, html=True), len(strip_tags(html).split())
+
+
+@receiver(setting_changed)
+def reset_renderer(sender, setting, **kwargs):
+    """Drop the renderer when one of its settings changes."""
+    global _renderer
+    if setting.startswith('NEWSLETTER_RENDER_'):
+        logger.debug("Setting %s changed, resetting the markdown renderer.", setting)
+        _renderer = None
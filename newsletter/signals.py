@@ -0,0 +1,100 @@
+# coding=utf-8
+
+"""Signal receivers keeping the cached data of the newsletter up to date."""
+
+# Django
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+# Current django project
+from newsletter.cache import (
+    LIST_HEAD_VERSION,
+    LIST_VERSION,
+    bump_version,
+    get_post_version_name,
+    get_sitemap_version_name
+)
+from newsletter.models import Comment, Delivery, Post, Subscriber, comment_deletions
+from newsletter.pagination import get_count_version_name, get_filtered_count_version_name
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Subscriber)
+def invalidate_counts_on_save(sender, instance, created, **kwargs):
+    """Invalidate the cached counts of the model when a row is created, only the filtered ones when it is edited."""
+    if created:
+        bump_version(get_count_version_name(sender))
+    else:
+        bump_version(get_filtered_count_version_name(sender))
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Subscriber)
+def invalidate_counts_on_delete(sender, instance, **kwargs):
+    """Invalidate the cached counts of the model when a row is deleted.
+
+    The deliveries of a post or of a subscriber are deleted in cascade without signal, so that they are deleted in
+    one query, their counts are invalidated with them.
+    """
+    bump_version(get_count_version_name(sender))
+    if sender in (Post, Subscriber):
+        bump_version(get_count_version_name(Delivery))
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Add a created comment to the comment count of its post."""
+    if created and not raw:
+        Post.add_to_comment_count(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=Post)
+def start_post_deletion(sender, instance, **kwargs):
+    """Record that the post is being deleted, so that its comments deleted in cascade are not uncounted one by one.
+
+    The post is forgotten by `end_post_deletion`, or by `newsletter.models.CommentDeletions.deleting_posts` if the
+    deletion fails.
+    """
+    comment_deletions.posts.add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def end_post_deletion(sender, instance, **kwargs):
+    """Forget the deleted post, its comments are deleted before it."""
+    comment_deletions.posts.discard(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Remove a deleted comment, including the ones deleted in cascade or in bulk, from the comment count.
+
+    Nothing is done if the post is being deleted too, and the comments deleted in bulk are counted per post by
+    `newsletter.models.CommentQuerySet.delete` instead.
+    """
+    if instance.post_id in comment_deletions.posts:
+        return
+    if comment_deletions.counts is not None:
+        comment_deletions.counts[instance.post_id] += 1
+    else:
+        Post.add_to_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """Invalidate the pages of the post, every page of the list, where the posts may have shifted, and its sitemap."""
+    bump_version(
+        get_post_version_name(instance.pk),
+        LIST_VERSION,
+        LIST_HEAD_VERSION,
+        get_sitemap_version_name(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    """Invalidate the page of the post of the comment and the first page of the list."""
+    bump_version(get_post_version_name(instance.post_id), LIST_HEAD_VERSION)
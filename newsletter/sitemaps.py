@@ -0,0 +1,108 @@
+# coding=utf-8
+
+"""Sitemap of the posts.
+
+The sitemap is split into sections of ``SITEMAP_SECTION_SIZE`` primary keys instead of the pages of an ordered list:
+a section never moves when posts are added or deleted, it is found with an index range, and the number of sections
+comes from ``MAX(id)`` instead of ``COUNT(*)``. The URLs of a section are cached until a post inside it changes (see
+`newsletter.signals`). The timeout of the cached sections is ``NEWSLETTER_SITEMAP_CACHE_TIMEOUT`` seconds (default:
+one day).
+
+To serve the sitemap index and its sections, install ``django.contrib.sitemaps`` and include the newsletter URLs.
+"""
+
+# Standard library
+import math
+
+# Django
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+# Current django project
+from newsletter.cache import SITEMAP_SECTION_SIZE, get_sitemap_version_name, get_version
+from newsletter.models import Post
+
+
+class PkRangePaginator(object):
+    """Paginator whose page N holds the objects whose primary key is in ``((N - 1) * per_page, N * per_page]``.
+
+    Follow the interface of `django.core.paginator.Paginator` used by the sitemaps.
+    """
+
+    def __init__(self, queryset, per_page):
+        """Create the paginator."""
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    @cached_property
+    def num_pages(self):
+        """Return the number of pages, from the largest primary key."""
+        last = self.queryset.aggregate(last=Max('pk'))['last']
+        return max(1, math.ceil((last or 0) / self.per_page))
+
+    def validate_number(self, number):
+        """Validate the given 1-based page number."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1 or number > self.num_pages:
+            raise EmptyPage("That page contains no results")
+        return number
+
+    def page(self, number):
+        """Return the page of the given 1-based page number."""
+        number = self.validate_number(number)
+        start = (number - 1) * self.per_page
+        return Page(self.queryset.filter(pk__gt=start, pk__lte=start + self.per_page), number, self)
+
+
+class PostSitemap(Sitemap):
+    """Sitemap of the detail pages of the posts."""
+
+    limit = SITEMAP_SECTION_SIZE
+    changefreq = 'weekly'
+
+    def items(self):
+        """Return the posts, with only the fields of their URL and of their last modification date."""
+        return Post.objects.only('pk', 'created', 'modified').order_by('pk')
+
+    def lastmod(self, item):
+        """Return the date of the last modification of the post."""
+        return item.modified
+
+    @cached_property
+    def paginator(self):
+        """Return the paginator by ranges of primary keys."""
+        return PkRangePaginator(self.items(), self.limit)
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        """Return the URLs of a section from the cache when possible.
+
+        The cached URLs do not hold their post under the ``item`` key, which would make the sections heavy to cache.
+        """
+        number = self.paginator.validate_number(page)
+        key = 'newsletter:sitemap:{}:{}:{}:{}'.format(
+            number,
+            get_version(get_sitemap_version_name((number - 1) * self.limit + 1)),
+            self.protocol or protocol,
+            site.domain if site is not None else '',
+        )
+        cached = cache.get(key)
+        if cached is None:
+            urls = super().get_urls(page=number, site=site, protocol=protocol)
+            cached = ([dict(url, item=None) for url in urls], getattr(self, 'latest_lastmod', None))
+            cache.set(key, cached, getattr(settings, 'NEWSLETTER_SITEMAP_CACHE_TIMEOUT', 86400))
+        urls, latest_lastmod = cached
+        if latest_lastmod is not None:
+            self.latest_lastmod = latest_lastmod
+        return urls
+
+
+sitemaps = {
+    'posts': PostSitemap,
+}
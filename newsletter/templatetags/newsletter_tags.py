@@ -0,0 +1,41 @@
+# coding=utf-8
+
+"""Template tags of the newsletter.
+
+The version tags give the arguments of the ``{% cache %}`` fragments of the posts, so that a fragment is rendered again
+as soon as the post or its comments change::
+
+    {% load cache newsletter_tags %}
+    {% fragment_cache_timeout as timeout %}
+    {% post_card_version post as version %}
+    {% cache timeout newsletter-post-card version %}...{% endcache %}
+
+The timeout of the fragments is ``NEWSLETTER_FRAGMENT_CACHE_TIMEOUT`` seconds (default: one hour).
+"""
+
+# Django
+from django import template
+from django.conf import settings
+
+# Current django project
+from newsletter.cache import get_comment_list_version, get_post_card_version
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment_cache_timeout():
+    """Return the timeout of the cached fragments."""
+    return getattr(settings, 'NEWSLETTER_FRAGMENT_CACHE_TIMEOUT', 3600)
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Return the version of the card of the post."""
+    return get_post_card_version(post)
+
+
+@register.simple_tag
+def comment_list_version(post):
+    """Return the version of the comment list of the post, with one aggregate query."""
+    return get_comment_list_version(post)
@@ -27,9 +27,12 @@ DATABASES = {
 ROOT_URLCONF = "newsletter.tests.urls"
 
 INSTALLED_APPS = [
+    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.sitemaps',
     "django.contrib.sites",
     'markdownx',
     "newsletter",
@@ -65,3 +68,6 @@ MIDDLEWARE = (
 )
 
 MEDIA_ROOT = '/tmp/newsletter/media/'
+
+# Fail the tests of the views which run more queries than their budget
+NEWSLETTER_QUERY_BUDGET_STRICT = True
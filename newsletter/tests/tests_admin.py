@@ -0,0 +1,154 @@
+#! /usr/bin/env python
+# coding=utf-8
+
+"""Tests the admin of the newsletter."""
+
+# Django
+from django.contrib.admin.sites import AdminSite
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
+from django.test import RequestFactory, TestCase, tag
+
+# Current django project
+from newsletter.admin import CachedDatesQuerySetMixin, CommentAdmin, PostAdmin, SubscriberAdmin, with_cached_dates
+from newsletter.models import Comment, Post, Subscriber
+
+
+@tag('admin')
+class TestCachedDates(TestCase):
+    """Tests the queryset with the cached dates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post and its comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(title="Title", author=cls.user)
+        for i in range(0, 3):
+            Comment.objects.create(post=cls.post, author=cls.user, text="Text {}".format(i))
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_dates(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created')
+        self.assertIsInstance(queryset, type(Comment.objects.all()))
+
+        years = queryset.dates('created', 'year')
+        with self.assertNumQueries(0):
+            self.assertEqual(with_cached_dates(Comment.objects.all(), 'created').dates('created', 'year'), years)
+        self.assertEqual(years, list(Comment.objects.dates('created', 'year')))
+
+    def test_dates_other_field(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created')
+        queryset.dates('modified', 'year')
+        with self.assertNumQueries(1):
+            list(queryset.dates('modified', 'year'))
+
+    def test_aggregate(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created')
+
+        date_range = queryset.aggregate(first=Min('created'), last=Max('created'))
+        with self.assertNumQueries(0):
+            self.assertEqual(queryset.aggregate(first=Min('created'), last=Max('created')), date_range)
+        self.assertEqual(date_range, Comment.objects.aggregate(first=Min('created'), last=Max('created')))
+
+    def test_other_aggregates_not_cached(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created')
+
+        for aggregates in ({'first': Min('created')},
+                           {'first': Min('modified'), 'last': Max('modified')},
+                           {'first': Max('created'), 'last': Min('created')},
+                           {'count': Count('id')}):
+            queryset.aggregate(**aggregates)
+            with self.assertNumQueries(1):
+                queryset.aggregate(**aggregates)
+
+        # An aggregate over an editable field is never stale
+        Comment.objects.update(text="Edited")
+        self.assertEqual(queryset.aggregate(text=Max('text')), {'text': "Edited"})
+
+    def test_invalidated_on_create(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created')
+        date_range = queryset.aggregate(first=Min('created'), last=Max('created'))
+
+        comment = Comment.objects.create(post=self.post, author=self.user, text="Text")
+
+        self.assertNotEqual(queryset.aggregate(first=Min('created'), last=Max('created')), date_range)
+        self.assertEqual(queryset.aggregate(first=Min('created'), last=Max('created'))['last'], comment.created)
+
+    def test_chain(self):
+        """Tests."""
+        queryset = with_cached_dates(Comment.objects.all(), 'created').filter(post=self.post).order_by('-created')[:2]
+
+        self.assertIsInstance(queryset, type(with_cached_dates(Comment.objects.all(), 'created')))
+
+
+@tag('admin')
+class TestChangeList(TestCase):
+    """Tests the change lists of the admin."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts and comments."""
+        cls.user = get_user_model().objects.create_superuser(username="admin", email="admin@example.com",
+                                                             password="password")
+        for i in range(0, 5):
+            post = Post.objects.create(title="Title {}".format(i), author=cls.user, text="Text " * 1000)
+            for j in range(0, 5):
+                Comment.objects.create(post=post, author=cls.user, text="Text {}".format(j))
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def get_changelist(self, model_admin):
+        """Return the change list of the admin for a superuser."""
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return model_admin.get_changelist_instance(request)
+
+    def test_comment_changelist(self):
+        """Tests."""
+        model_admin = CommentAdmin(Comment, AdminSite())
+        results = list(self.get_changelist(model_admin).result_list)
+
+        # The representations of the rows do not query their post or their author
+        with self.assertNumQueries(0):
+            for comment in results:
+                str(comment)
+                str(comment.author)
+                self.assertEqual(comment.post.get_deferred_fields(), {'text', 'text_html', 'excerpt_html'})
+        self.assertEqual(len(results), 25)
+
+    def test_post_changelist(self):
+        """Tests."""
+        model_admin = PostAdmin(Post, AdminSite())
+        results = list(self.get_changelist(model_admin).result_list)
+
+        with self.assertNumQueries(0):
+            for post in results:
+                str(post.author)
+        self.assertEqual(results[0].get_deferred_fields(), {'text', 'text_html', 'excerpt_html'})
+
+    def test_date_hierarchy_cached(self):
+        """Tests."""
+        model_admin = CommentAdmin(Comment, AdminSite())
+        hierarchy = date_hierarchy(self.get_changelist(model_admin))
+
+        changelist = self.get_changelist(model_admin)
+        with self.assertNumQueries(0):
+            self.assertEqual(date_hierarchy(changelist), hierarchy)
+
+    def test_no_date_hierarchy(self):
+        """Tests."""
+        model_admin = SubscriberAdmin(Subscriber, AdminSite())
+        model_admin.date_hierarchy = None
+        self.assertNotIsInstance(self.get_changelist(model_admin).queryset, CachedDatesQuerySetMixin)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the JSON API of the `newsletter`."""
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('api')
+@override_settings(NEWSLETTER_API_PAGE_SIZE=2)
+class TestJsonApi(TestCase):
+    """Tests the JSON views of the posts and comments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+        self.posts = [Post.objects.create(author=self.user, title="Title {}".format(i), text="*Text* {}".format(i))
+                      for i in range(0, 5)]
+        self.post = self.posts[-1]
+        for i in range(0, 3):
+            Comment.objects.create(author=self.user, post=self.post, text="Comment {}".format(i))
+
+    def test_post_list(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:api-post-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual([post['title'] for post in data['results']], ["Title 4", "Title 3"])
+        self.assertEqual(data['results'][0]['author'], "username")
+        self.assertEqual(data['results'][0]['comment_count'], 3)
+        self.assertNotIn('text', data['results'][0])
+        self.assertIsNone(data['previous'])
+
+    def test_pagination(self):
+        """Tests."""
+        titles = []
+        url = reverse('newsletter:api-post-list') + '?fields=title'
+        while url:
+            data = self.client.get(url).json()
+            titles += [post['title'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(titles, ["Title {}".format(i) for i in range(4, -1, -1)])
+
+        url = self.client.get(reverse('newsletter:api-post-list')).json()['next']
+        data = self.client.get(url).json()
+        previous = self.client.get(data['previous']).json()
+        self.assertEqual([post['title'] for post in previous['results']], ["Title 4", "Title 3"])
+
+    def test_invalid_cursor(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:api-post-list') + '?cursor=invalid')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_fields(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:api-post-list') + '?fields=id,title,title')
+
+        self.assertEqual(response.json()['results'][0], {'id': self.post.pk, 'title': "Title 4"})
+        self.assertIn('fields=id%2Ctitle', response.json()['next'])
+
+    def test_unknown_fields(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:api-post-list') + '?fields=title,password')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()['error'])
+
+    def test_post_detail(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:api-post-detail', kwargs={'pk': self.post.pk}))
+
+        data = response.json()
+        self.assertEqual(data['title'], "Title 4")
+        self.assertEqual(data['text_html'], self.post.text_html)
+
+        response = self.client.get(reverse('newsletter:api-post-detail', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_list(self):
+        """Tests."""
+        url = reverse('newsletter:api-comment-list', kwargs={'pk': self.post.pk})
+        data = self.client.get(url).json()
+
+        self.assertEqual([comment['text'] for comment in data['results']], ["Comment 2", "Comment 1"])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([comment['text'] for comment in data['results']], ["Comment 0"])
+        self.assertIsNone(data['next'])
+
+        response = self.client.get(reverse('newsletter:api-comment-list', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached(self):
+        """Tests."""
+        url = reverse('newsletter:api-post-list')
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+
+        Comment.objects.create(author=self.user, post=self.post, text="Comment")
+        self.assertEqual(self.client.get(url).json()['results'][0]['comment_count'], 4)
+
+    def test_etag(self):
+        """Tests."""
+        url = reverse('newsletter:api-comment-list', kwargs={'pk': self.post.pk})
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Comment.objects.create(author=self.user, post=self.post, text="Comment")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
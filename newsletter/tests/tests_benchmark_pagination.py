@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Benchmark of the offset and cursor paginations of the post list.
+
+It is excluded from the default run of the tests, run it alone with
+``python runtests.py newsletter.tests.tests_benchmark_pagination``. The timings are written to the standard error.
+"""
+
+# Standard library
+import sys
+import timeit
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Post
+from newsletter.pagination import CursorPaginator
+
+POSTS = 20000
+PER_PAGE = 10
+REPEAT = 20
+
+
+@tag('benchmark', 'pagination')
+class TestBenchmarkPagination(TestCase):
+    """Compare the cost of the first and of the last page of both paginations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the archive."""
+        user = get_user_model().objects.create_user(username="username", password="password")
+        Post.objects.bulk_create(Post(title="Title {}".format(i), author=user) for i in range(0, POSTS))
+
+    def measure(self, func):
+        return min(timeit.repeat(func, number=1, repeat=REPEAT))
+
+    def test_deep_pages(self):
+        """Tests."""
+        queryset = Post.objects.defer('text', 'text_html')
+
+        paginator = Paginator(queryset.order_by('-created', '-id'), PER_PAGE)
+        offset_first = self.measure(lambda: list(paginator.page(1)))
+        offset_last = self.measure(lambda: list(paginator.page(paginator.num_pages)))
+
+        cursor_paginator = CursorPaginator(queryset, PER_PAGE)
+        # Cursor of the last page, as if the reader had followed every "next" link
+        before_last = Post.objects.order_by('-created', '-id')[POSTS - PER_PAGE - 1]
+        cursor = cursor_paginator.encode_cursor(before_last)
+        cursor_first = self.measure(lambda: list(cursor_paginator.page().object_list))
+        cursor_last = self.measure(lambda: list(cursor_paginator.page(cursor).object_list))
+
+        sys.stderr.write("\n{} posts, {} per page (best of {}): offset first page {:.2f}ms, last page {:.2f}ms, cursor "
+                         "first page {:.2f}ms, last page {:.2f}ms.\n".format(POSTS, PER_PAGE, REPEAT,
+                                                                             offset_first * 1000, offset_last * 1000,
+                                                                             cursor_first * 1000, cursor_last * 1000))
+
+        self.assertEqual(len(cursor_paginator.page(cursor).object_list), PER_PAGE)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for `newsletter` cache module."""
+
+# Standard library
+from unittest import mock
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.cache import bump_version, get_sitemap_version_names, get_version, get_versions
+
+
+@tag('cache')
+class TestVersions(TestCase):
+    """Tests the versions of the cached data."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_get_version(self):
+        """Tests."""
+        version = get_version('a')
+        self.assertEqual(get_version('a'), version)
+        self.assertNotEqual(get_version('b'), version)
+        self.assertEqual(get_versions('a', 'b'), [version, get_version('b')])
+
+    def test_bump_version(self):
+        """Tests."""
+        a, b = get_versions('a', 'b')
+        bump_version('a')
+        self.assertNotEqual(get_version('a'), a)
+        self.assertEqual(get_version('b'), b)
+
+    def test_evicted_version(self):
+        """Tests."""
+        version = get_version('a')
+        cache.clear()
+        self.assertNotEqual(get_version('a'), version)
+
+    @mock.patch('newsletter.cache.SITEMAP_SECTION_SIZE', 3)
+    def test_sitemap_version_names(self):
+        """Tests."""
+        self.assertEqual(get_sitemap_version_names(1, 3), ['sitemap:1'])
+        self.assertEqual(get_sitemap_version_names(3, 7), ['sitemap:1', 'sitemap:2', 'sitemap:3'])
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the `newsletter_backfill_html` management command."""
+
+# Standard library
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Post
+
+
+@tag('command', 'post')
+class TestBackfillHtmlCommand(TestCase):
+    """Tests the backfill of the pre-rendered HTML column."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts whose HTML column is empty, like rows created before the column existed."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 5):
+            p = Post.objects.create(title="Title {}".format(i), author=cls.user, text="# Title {}".format(i))
+            Post.objects.filter(pk=p.pk).update(text_html='')
+
+    def test_backfill(self):
+        """Tests."""
+        out = StringIO()
+        call_command('newsletter_backfill_html', batch_size=2, stdout=out)
+
+        self.assertIn("5 post(s) rendered.", out.getvalue())
+        for p in Post.objects.all():
+            self.assertEqual(p.text_html, "<h1>{}</h1>".format(p.title))
+
+    def test_backfill_skips_rendered_posts(self):
+        """Tests."""
+        call_command('newsletter_backfill_html', stdout=StringIO())
+
+        out = StringIO()
+        call_command('newsletter_backfill_html', stdout=out)
+        self.assertIn("0 post(s) rendered.", out.getvalue())
+
+        out = StringIO()
+        call_command('newsletter_backfill_html', all=True, stdout=out)
+        self.assertIn("5 post(s) rendered.", out.getvalue())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the `newsletter_export_static` management command."""
+
+# Standard library
+import os
+import tempfile
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('command', 'post')
+class TestExportStaticCommand(TestCase):
+    """Tests the incremental export of the pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create 12 posts, over 2 pages of the list, with comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 12):
+            post = Post.objects.create(title="Title {}".format(i), author=cls.user, text="Text {}".format(i))
+            Comment.objects.create(post=post, author=cls.user, text="Comment")
+
+    def setUp(self):
+        """Export in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = self.directory.name
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def export(self, **options):
+        """Run the command and return its output."""
+        out = StringIO()
+        call_command('newsletter_export_static', self.output, workers=0, stdout=out, **options)
+        return out.getvalue()
+
+    def path(self, *parts):
+        """Return the path of an exported file."""
+        return os.path.join(self.output, *parts)
+
+    def test_export(self):
+        """Tests."""
+        # 12 posts and their 2 comment feeds, 2 pages of the list and 2 feeds
+        self.assertIn("Rendered 40 page(s), removed 0, 0 unchanged", self.export())
+
+        self.assertTrue(os.path.exists(self.path('index.html')))
+        self.assertTrue(os.path.exists(self.path('page', '2', 'index.html')))
+        self.assertTrue(os.path.exists(self.path('feed', 'index.xml')))
+        self.assertTrue(os.path.exists(self.path('feed', 'atom', 'index.xml')))
+        post = Post.objects.first()
+        self.assertTrue(os.path.exists(self.path(post.get_absolute_url().lstrip('/'), 'index.html')))
+        self.assertTrue(os.path.exists(self.path(str(post.pk), 'comments', 'feed', 'index.xml')))
+        with open(self.path('feed', 'index.xml')) as f:
+            self.assertIn("<title>{}</title>".format(post.title), f.read())
+
+    def test_unchanged(self):
+        """Tests."""
+        self.export()
+
+        self.assertIn("Rendered 0 page(s), removed 0, 40 unchanged", self.export())
+        self.assertIn("Rendered 40 page(s)", self.export(full=True))
+
+    def test_comment(self):
+        """Tests."""
+        self.export()
+        # The oldest post, on the second page of the list
+        post = Post.objects.order_by('created').first()
+
+        Comment.objects.create(post=post, author=self.user, text="Another comment")
+
+        # The post, its 2 comment feeds and the second page of the list
+        self.assertIn("Rendered 4 page(s), removed 0, 36 unchanged", self.export())
+
+    def test_deleted_file(self):
+        """Tests."""
+        self.export()
+        os.remove(self.path('index.html'))
+
+        self.assertIn("Rendered 1 page(s)", self.export())
+        self.assertTrue(os.path.exists(self.path('index.html')))
+
+    def test_delete(self):
+        """Tests."""
+        self.export()
+        post = Post.objects.order_by('created').first()
+        filename = self.path(post.get_absolute_url().lstrip('/'), 'index.html')
+
+        post.delete()
+
+        # The second page of the list and the feeds show one post less
+        self.assertIn("Rendered 3 page(s), removed 3, 34 unchanged", self.export())
+        self.assertFalse(os.path.exists(filename))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the `newsletter_import` management command."""
+
+# Standard library
+import csv
+import datetime
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, tag
+from django.utils import timezone
+
+# Current django project
+from newsletter.cache import get_sitemap_version_name, get_versions
+from newsletter.models import Comment, Post
+
+
+@tag('command', 'post', 'comment')
+class TestImportCommand(TestCase):
+    """Tests the import of posts and comments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts with comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.other = get_user_model().objects.create_user(username="other", password="password")
+        for i in range(0, 5):
+            post = Post.objects.create(title="Title {}".format(i), author=cls.user, text="# Title {}\n\nText".format(i))
+            for j in range(0, i):
+                Comment.objects.create(post=post, author=cls.other, text="Comment {}".format(j))
+        # Older dates than the ones of the import
+        Post.objects.update(created=timezone.now() - datetime.timedelta(days=10))
+
+    def setUp(self):
+        """Export the rows in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'export.ndjson.gz')
+        call_command('newsletter_export', output=self.path, gzip=True, stdout=StringIO())
+        self.posts = list(Post.objects.order_by('pk').values())
+        self.comments = list(Comment.objects.order_by('pk').values())
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def assertImported(self, workers):
+        """Import the export in an empty database and compare the rows."""
+        Post.objects.all().delete()
+
+        out = StringIO()
+        call_command('newsletter_import', self.path, batch_size=2, workers=workers, stdout=out)
+
+        self.assertEqual(list(Post.objects.order_by('pk').values()), self.posts)
+        self.assertEqual(list(Comment.objects.order_by('pk').values()), self.comments)
+        self.assertIn("Imported 5 post(s) and 10 comment(s)", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+    def test_import(self):
+        """Tests."""
+        self.assertImported(workers=0)
+
+    def test_import_with_workers(self):
+        """Tests."""
+        self.assertImported(workers=2)
+
+    @mock.patch('newsletter.cache.SITEMAP_SECTION_SIZE', 2)
+    def test_sitemap_invalidated(self):
+        """Tests."""
+        pks = [post['id'] for post in self.posts]
+        Post.objects.all().delete()
+        names = list(dict.fromkeys(get_sitemap_version_name(pk) for pk in range(pks[0], pks[-1] + 3)))
+        versions = get_versions(*names)
+
+        call_command('newsletter_import', self.path, workers=0, stdout=StringIO())
+
+        changed = [name for name, old, new in zip(names, versions, get_versions(*names)) if old != new]
+        self.assertEqual(changed, sorted({get_sitemap_version_name(pk) for pk in pks}, key=names.index))
+
+    def test_auto_now_restored(self):
+        """Tests."""
+        Post.objects.all().delete()
+        call_command('newsletter_import', self.path, workers=0, stdout=StringIO())
+
+        post = Post.objects.create(title="New", author=self.user)
+        self.assertGreater(post.created, timezone.now() - datetime.timedelta(minutes=1))
+
+    def test_csv(self):
+        """Tests."""
+        post = Post.objects.create(title="New", author=self.user)
+        path = os.path.join(self.directory.name, 'comments.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['post', 'author', 'text', 'created'])
+            for i in range(0, 5):
+                writer.writerow([post.pk, 'other', "Comment, {}".format(i), '2019-01-23T12:00:{:02}'.format(i)])
+
+        call_command('newsletter_import', path, model='comment', batch_size=2, workers=0, stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 5)
+        comment = post.comment_set.order_by('created').first()
+        self.assertEqual(comment.text, "Comment, 0")
+        self.assertEqual(comment.author, self.other)
+        self.assertEqual(comment.created, timezone.make_aware(datetime.datetime(2019, 1, 23, 12, 0, 0)))
+        self.assertEqual(comment.modified, comment.created)
+
+    def test_unknown_author(self):
+        """Tests."""
+        path = os.path.join(self.directory.name, 'posts.ndjson')
+        with open(path, 'w') as f:
+            f.write('{"model": "newsletter.post", "title": "Title", "author": "nobody"}\n')
+
+        with self.assertRaisesMessage(CommandError, "Unknown author(s): nobody."):
+            call_command('newsletter_import', path, workers=0, stdout=StringIO())
+
+    def test_unknown_model(self):
+        """Tests."""
+        path = os.path.join(self.directory.name, 'posts.ndjson')
+        with open(path, 'w') as f:
+            f.write('{"title": "Title", "author": "username"}\n')
+
+        with self.assertRaises(CommandError):
+            call_command('newsletter_import', path, workers=0, stdout=StringIO())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the `newsletter_recount` management command."""
+
+# Standard library
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('command', 'post', 'comment')
+class TestRecountCommand(TestCase):
+    """Tests the repair of the comment counts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts with comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 5):
+            post = Post.objects.create(title="Title {}".format(i), author=cls.user)
+            for j in range(0, i):
+                Comment.objects.create(post=post, author=cls.user, text="Text")
+
+    def test_recount(self):
+        """Tests."""
+        # Drift: the comments of a post are moved without the signals
+        first, last = Post.objects.get(title="Title 1"), Post.objects.get(title="Title 4")
+        Comment.objects.filter(post=last).update(post=first)
+        Post.objects.filter(title="Title 2").update(comment_count=42)
+
+        out = StringIO()
+        call_command('newsletter_recount', batch_size=2, stdout=out)
+
+        self.assertIn("5 post(s) checked, 3 comment count(s) repaired.", out.getvalue())
+        for post in Post.objects.all():
+            self.assertEqual(post.comment_count, post.comment_set.count())
+
+        out = StringIO()
+        call_command('newsletter_recount', stdout=out)
+        self.assertIn("5 post(s) checked, 0 comment count(s) repaired.", out.getvalue())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the `newsletter_rerender` management command."""
+
+# Standard library
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Post
+
+
+@tag('command', 'post')
+class TestRerenderCommand(TestCase):
+    """Tests the parallel re-rendering of the posts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts whose HTML column is outdated."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 7):
+            p = Post.objects.create(title="Title {}".format(i), author=cls.user, text="# Title {}".format(i))
+            Post.objects.filter(pk=p.pk).update(text_html='outdated')
+
+    def setUp(self):
+        """Create a checkpoint file path."""
+        fd, self.checkpoint = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.checkpoint)
+
+    def tearDown(self):
+        """Remove the checkpoint file."""
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    def assertRendered(self, queryset):
+        for p in queryset:
+            self.assertEqual(p.text_html, "<h1>{}</h1>".format(p.title))
+
+    def test_rerender_in_process(self):
+        """Tests."""
+        out = StringIO()
+        call_command('newsletter_rerender', workers=0, chunk_size=3, stdout=out)
+
+        self.assertIn("Rendered 7 post(s)", out.getvalue())
+        self.assertIn("posts/s", out.getvalue())
+        self.assertRendered(Post.objects.all())
+
+    def test_rerender_with_workers(self):
+        """Tests."""
+        out = StringIO()
+        call_command('newsletter_rerender', workers=2, chunk_size=2, stdout=out)
+
+        self.assertIn("Rendered 7 post(s)", out.getvalue())
+        self.assertRendered(Post.objects.all())
+
+    def test_rerender_uncached(self):
+        """Tests."""
+        with mock.patch('newsletter.models.render_markdown', side_effect=AssertionError):
+            call_command('newsletter_rerender', workers=0, stdout=StringIO())
+
+        self.assertRendered(Post.objects.all())
+
+    def test_checkpoint_and_resume(self):
+        """Tests."""
+        pks = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        with open(self.checkpoint, 'w') as f:
+            f.write(str(pks[3]))
+
+        out = StringIO()
+        call_command('newsletter_rerender', workers=0, chunk_size=2, checkpoint=self.checkpoint, resume=True,
+                     stdout=out)
+
+        self.assertIn("Rendered 3 post(s)", out.getvalue())
+        self.assertRendered(Post.objects.filter(pk__gt=pks[3]))
+        self.assertFalse(Post.objects.filter(pk__lte=pks[3]).exclude(text_html='outdated').exists())
+        with open(self.checkpoint) as f:
+            self.assertEqual(f.read(), str(pks[-1]))
+
+    def test_resume_without_checkpoint(self):
+        """Tests."""
+        with self.assertRaises(CommandError):
+            call_command('newsletter_rerender', resume=True, stdout=StringIO())
@@ -0,0 +1,120 @@
+#! /usr/bin/env python
+# coding=utf-8
+
+"""Tests the conditional requests of the views."""
+
+# Standard library
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('view', 'conditional')
+class TestConditionalGet(TestCase):
+    """Tests the ETag and Last-Modified validators of the list and detail views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username='author', password='password')
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+        self.post = Post.objects.create(author=self.user, title="First", text="First post")
+        self.other = Post.objects.create(author=self.user, title="Second", text="Second post")
+        self.list_url = reverse('newsletter:post-list')
+        self.detail_url = reverse('newsletter:post-detail-date', kwargs={
+            'year': self.post.created.year,
+            'month': self.post.created.month,
+            'day': self.post.created.day,
+            'pk': self.post.id
+        })
+
+    def test_validators(self):
+        """Tests."""
+        for url in (self.list_url, self.detail_url):
+            r = self.client.get(url)
+
+            self.assertEqual(r.status_code, 200)
+            self.assertTrue(r.has_header('ETag'))
+            self.assertTrue(r.has_header('Last-Modified'))
+
+    def test_not_modified_etag(self):
+        """Tests."""
+        for url in (self.list_url, self.detail_url):
+            etag = self.client.get(url)['ETag']
+
+            # Only the query of the last modification date, nothing is rendered
+            with self.assertNumQueries(1):
+                r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(r.status_code, 304)
+            self.assertIsNone(r.context)
+            self.assertEqual(r.content, b'')
+
+    def test_not_modified_last_modified(self):
+        """Tests."""
+        last_modified = self.client.get(self.list_url)['Last-Modified']
+
+        r = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(r.status_code, 304)
+
+    def test_comment_changes_validators(self):
+        """Tests."""
+        etags = {url: self.client.get(url)['ETag'] for url in (self.list_url, self.detail_url)}
+
+        Comment.objects.create(author=self.user, post=self.post, text="A comment")
+
+        for url, etag in etags.items():
+            r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(r.status_code, 200)
+            self.assertNotEqual(r['ETag'], etag)
+
+    def test_delete_changes_etag(self):
+        """Tests."""
+        etag = self.client.get(self.list_url)['ETag']
+
+        self.other.delete()
+
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_render_commands_change_etag(self):
+        """Tests."""
+        for name, options in (('newsletter_rerender', {'workers': 0}), ('newsletter_backfill_html', {'all': True})):
+            etags = {url: self.client.get(url)['ETag'] for url in (self.list_url, self.detail_url)}
+
+            call_command(name, stdout=StringIO(), **options)
+
+            for url, etag in etags.items():
+                r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(r.status_code, 200, name)
+                self.assertNotEqual(r['ETag'], etag)
+
+    def test_not_found(self):
+        """Tests."""
+        url = reverse('newsletter:post-detail-date', kwargs={'year': 2000, 'month': 1, 'day': 1, 'pk': 0})
+
+        r = self.client.get(url)
+
+        self.assertEqual(r.status_code, 404)
+        self.assertFalse(r.has_header('ETag'))
+
+    def test_authenticated(self):
+        """Tests."""
+        self.client.login(username='author', password='password')
+
+        r = self.client.get(self.list_url)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(r.has_header('ETag'))
+        self.assertFalse(r.has_header('Last-Modified'))
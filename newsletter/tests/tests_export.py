@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the NDJSON export of the `newsletter`."""
+
+# Standard library
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.export import iter_buffered, iter_gzip, iter_lines
+from newsletter.models import Comment, Post
+
+
+@tag('export')
+class TestExport(TestCase):
+    """Tests the export of the posts and comments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts with comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password", is_staff=True)
+        for i in range(0, 5):
+            post = Post.objects.create(title="Title {}".format(i), author=cls.user, text="Text é {}".format(i))
+            for j in range(0, 3):
+                Comment.objects.create(post=post, author=cls.user, text="Comment {}".format(j))
+
+    def parse(self, data):
+        """Return the records of the NDJSON data."""
+        return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+
+    def assertExported(self, records):
+        """Check the records against the database."""
+        self.assertEqual(len(records), 20)
+        self.assertEqual([record['model'] for record in records], ['newsletter.post'] * 5 + ['newsletter.comment'] * 15)
+
+        post = Post.objects.order_by('pk').first()
+        self.assertEqual(records[0], {
+            'model': 'newsletter.post',
+            'id': post.pk,
+            'title': post.title,
+            'author': 'username',
+            'text': post.text,
+            'created': post.created.isoformat(),
+            'modified': post.modified.isoformat(),
+        })
+        comment = Comment.objects.order_by('pk').first()
+        self.assertEqual(records[5]['post'], comment.post_id)
+        self.assertEqual(records[5]['created'], comment.created.isoformat())
+
+    def test_lines(self):
+        """Tests."""
+        self.assertExported(self.parse(b''.join(iter_lines(chunk_size=2))))
+
+    def test_buffered_gzip(self):
+        """Tests."""
+        data = b''.join(iter_lines())
+
+        self.assertEqual(b''.join(iter_buffered(iter_lines(), size=100)), data)
+        self.assertEqual(gzip.decompress(b''.join(iter_gzip(iter_buffered(iter_lines(), size=100)))), data)
+
+    def test_command(self):
+        """Tests."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson')
+            out = StringIO()
+            call_command('newsletter_export', output=path, chunk_size=3, stdout=out)
+            with open(path, 'rb') as f:
+                self.assertExported(self.parse(f.read()))
+        self.assertIn("20 row(s) exported.", out.getvalue())
+
+    def test_command_gzip_model(self):
+        """Tests."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson.gz')
+            call_command('newsletter_export', output=path, gzip=True, models=['comment'], stdout=StringIO())
+            with gzip.open(path) as f:
+                records = self.parse(f.read())
+        self.assertEqual(len(records), 15)
+        self.assertTrue(all(record['model'] == 'newsletter.comment' for record in records))
+
+    def test_view(self):
+        """Tests."""
+        self.client.login(username="username", password="password")
+
+        response = self.client.get(reverse('newsletter:export'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertExported(self.parse(b''.join(response.streaming_content)))
+
+    def test_view_gzip(self):
+        """Tests."""
+        self.client.login(username="username", password="password")
+
+        response = self.client.get(reverse('newsletter:export'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertExported(self.parse(gzip.decompress(b''.join(response.streaming_content))))
+
+    def test_view_not_staff(self):
+        """Tests."""
+        get_user_model().objects.create_user(username="user", password="password")
+        self.client.login(username="user", password="password")
+
+        response = self.client.get(reverse('newsletter:export'))
+
+        self.assertIn(response.status_code, (302, 403))
+        self.client.logout()
+        self.assertIn(self.client.get(reverse('newsletter:export')).status_code, (302, 403))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the feeds of the `newsletter`."""
+
+# Standard library
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('feed')
+class TestFeeds(TestCase):
+    """Tests the RSS and Atom feeds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password",
+                                                        first_name="John", last_name="Doe")
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+        self.post = Post.objects.create(author=self.user, title="First", text="# Title\n\n*First* post")
+        self.other = Post.objects.create(author=self.user, title="Second", text="Second post")
+        Comment.objects.create(author=self.user, post=self.post, text="A <comment>")
+        self.urls = (
+            reverse('newsletter:post-feed'),
+            reverse('newsletter:post-feed-atom'),
+            reverse('newsletter:post-comments-feed', kwargs={'pk': self.post.pk}),
+            reverse('newsletter:post-comments-feed-atom', kwargs={'pk': self.post.pk}),
+        )
+
+    def test_posts_feed(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:post-feed'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/rss+xml; charset=utf-8')
+        content = response.content.decode()
+        self.assertIn("<title>First</title>", content)
+        self.assertIn("&lt;em&gt;First&lt;/em&gt; post", content)
+        self.assertIn(self.post.get_absolute_url(), content)
+        self.assertIn("John Doe", content)
+
+    def test_atom_feed(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:post-feed-atom'))
+
+        self.assertEqual(response['Content-Type'], 'application/atom+xml; charset=utf-8')
+        self.assertIn("<updated>", response.content.decode())
+
+    def test_comments_feed(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:post-comments-feed', kwargs={'pk': self.post.pk}))
+
+        content = response.content.decode()
+        self.assertIn("Comments on First", content)
+        self.assertIn("&lt;p&gt;A &amp;lt;comment&amp;gt;&lt;/p&gt;", content)
+        self.assertIn("#comment-", content)
+
+    def test_comments_feed_not_found(self):
+        """Tests."""
+        response = self.client.get(reverse('newsletter:post-comments-feed', kwargs={'pk': 0}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached(self):
+        """Tests."""
+        for url in self.urls:
+            first = self.client.get(url)
+            # Only the query of the last modification date
+            with self.assertNumQueries(1):
+                second = self.client.get(url)
+            self.assertEqual(second.content, first.content)
+
+    def test_not_modified(self):
+        """Tests."""
+        for url in self.urls:
+            response = self.client.get(url)
+
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_invalidated(self):
+        """Tests."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+
+        Comment.objects.create(author=self.user, post=self.post, text="Another comment")
+        self.other.delete()
+
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+        self.assertNotIn("Second", self.client.get(self.urls[0]).content.decode())
+        self.assertIn("Another comment", self.client.get(self.urls[2]).content.decode())
+
+    def test_invalidated_by_rerender(self):
+        """Tests."""
+        etag = self.client.get(self.urls[0])['ETag']
+
+        # Written without signals, like a text fixed in the database before a re-render
+        Post.objects.filter(pk=self.post.pk).update(text="*Edited* post")
+        call_command('newsletter_rerender', workers=0, stdout=StringIO())
+
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("&lt;em&gt;Edited&lt;/em&gt; post", response.content.decode())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests that the hot queries of the newsletter use the indexes of the models."""
+
+# Standard library
+import unittest
+from datetime import timedelta
+
+# Django
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Comment, Post
+from newsletter.pagination import CursorPaginator
+
+
+@tag('index')
+@unittest.skipUnless(connection.vendor == 'sqlite', "The query plans are checked with SQLite.")
+class TestIndexes(TestCase):
+    """Tests the query plans of the list, detail and comment queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post and its comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(title="Title", author=cls.user)
+        for i in range(0, 3):
+            Comment.objects.create(post=cls.post, author=cls.user, text="Text {}".format(i))
+
+    def plan(self, queryset):
+        """Return the query plan of the queryset as a single string."""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertSorted(self, plan):
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_list(self):
+        """Tests."""
+        plan = self.plan(Post.objects.defer('text', 'text_html')[:10])
+        self.assertIn('USING INDEX nl_post_created_id_idx', plan)
+        self.assertSorted(plan)
+
+    def test_list_cursor(self):
+        """Tests."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        values = [self.post.created, self.post.pk]
+        plan = self.plan(Post.objects.filter(paginator.get_filter(values, False)).order_by('-created', '-id')[:10])
+        self.assertIn('USING INDEX nl_post_created_id_idx (created<?)', plan)
+        self.assertSorted(plan)
+
+        plan = self.plan(Post.objects.filter(paginator.get_filter(values, True)).order_by('created', 'id')[:10])
+        self.assertIn('USING INDEX nl_post_created_id_idx (created>?)', plan)
+        self.assertSorted(plan)
+
+    def test_date_range(self):
+        """Tests."""
+        start = self.post.created.replace(hour=0, minute=0, second=0, microsecond=0)
+        plan = self.plan(Post.objects.filter(created__gte=start, created__lt=start + timedelta(days=1)))
+        self.assertIn('USING INDEX nl_post_created_id_idx (created>? AND created<?)', plan)
+        self.assertSorted(plan)
+
+    def test_detail(self):
+        """Tests."""
+        start = self.post.created.replace(hour=0, minute=0, second=0, microsecond=0)
+        plan = self.plan(Post.objects.filter(created__gte=start, created__lt=start + timedelta(days=1), pk=self.post.pk))
+        self.assertNotIn('SCAN', plan)
+
+    def test_comments(self):
+        """Tests."""
+        plan = self.plan(self.post.comment_set.all())
+        self.assertIn('USING INDEX nl_comment_post_created_idx (post_id=?)', plan)
+        # The comments are ordered without joining the post
+        self.assertNotIn('newsletter_post', plan)
+        self.assertSorted(plan)
+
+    def test_author(self):
+        """Tests."""
+        plan = self.plan(Post.objects.filter(author=self.user))
+        self.assertIn('USING INDEX nl_post_author_created_idx (author_id=?)', plan)
+        self.assertSorted(plan)
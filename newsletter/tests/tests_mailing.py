@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the mailing of the posts."""
+
+# Standard library
+import smtplib
+import socket
+import unittest
+from email import message_from_bytes, policy
+from io import StringIO
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends import locmem
+from django.core.management import CommandError, call_command
+from django.test import TestCase, modify_settings, override_settings, tag
+
+# Current django project
+from newsletter.mailing import send_post
+from newsletter.models import Delivery, Post, PostStats, Subscriber
+from newsletter.pagination import CachedCountPaginator
+
+try:
+    # Third-party
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Message
+except ImportError:
+    Controller = Message = None
+
+
+class CountingBackend(locmem.EmailBackend):
+    """Email backend counting its connections."""
+
+    opened = 0
+
+    def open(self):
+        """Count the connection."""
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class CrashingBackend(locmem.EmailBackend):
+    """Email backend failing after a number of messages."""
+
+    limit = 0
+
+    def send_messages(self, messages):
+        """Fail once the limit is reached."""
+        if len(mail.outbox) + len(messages) > CrashingBackend.limit:
+            if self.fail_silently:
+                return 0
+            raise ConnectionError("Connection lost.")
+        return super().send_messages(messages)
+
+
+class RefusingBackend(locmem.EmailBackend):
+    """Email backend whose server refuses some recipients."""
+
+    refused = ()
+
+    def send_messages(self, messages):
+        """Refuse the messages to the refused recipients as the SMTP backend does."""
+        for message in messages:
+            refused = {address: (550, b"No such user.") for address in message.to if address in self.refused}
+            if refused:
+                if self.fail_silently:
+                    return 0
+                raise smtplib.SMTPRecipientsRefused(refused)
+        return super().send_messages(messages)
+
+
+@tag('mailing')
+@override_settings(NEWSLETTER_FROM_EMAIL='newsletter@example.com')
+class TestSendPost(TestCase):
+    """Tests the mailing of a post."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post and its subscribers."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Title", text="*Text*")
+        PostStats.objects.create(post=cls.post)
+        Subscriber.objects.bulk_create([
+            Subscriber(email="subscriber{}@example.com".format(i), name="Subscriber {}".format(i))
+            for i in range(0, 5)
+        ])
+        Subscriber.objects.create(email="inactive@example.com", is_active=False)
+
+    def test_send_post(self):
+        """Tests."""
+        self.assertEqual(send_post(self.post, batch_size=2), 5)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ["subscriber{}@example.com".format(i) for i in range(0, 5)])
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, "Title")
+        self.assertEqual(message.from_email, 'newsletter@example.com')
+        mime = message_from_bytes(message.message().as_bytes(), policy=policy.default)
+        self.assertEqual(mime['To'], "Subscriber 0 <subscriber0@example.com>")
+        # The domain of the current site, the one-click unsubscription of RFC 8058 requires HTTPS
+        self.assertTrue(mime['List-Unsubscribe'].startswith("<http://example.com/unsubscribe/"))
+        self.assertIsNone(mime['List-Unsubscribe-Post'])
+        text, html = [part.get_content() for part in mime.iter_parts()]
+        self.assertIn("Hello Subscriber 0,", text)
+        self.assertIn("*Text*", text)
+        self.assertIn(self.post.text_html, html)
+
+    def test_no_base_url(self):
+        """Tests."""
+        with modify_settings(INSTALLED_APPS={'remove': 'django.contrib.sites'}):
+            with self.assertRaises(ImproperlyConfigured):
+                send_post(self.post)
+        with override_settings(NEWSLETTER_BASE_URL='/newsletter'):
+            with self.assertRaises(ImproperlyConfigured):
+                send_post(self.post)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_one_connection_per_batch(self):
+        """Tests."""
+        CountingBackend.opened = 0
+
+        with override_settings(EMAIL_BACKEND='newsletter.tests.tests_mailing.CountingBackend'):
+            # The date of the mailing, the 3 batches and their journal rows, then the statuses at once
+            with self.assertNumQueries(8):
+                send_post(self.post, batch_size=2)
+
+        self.assertEqual(CountingBackend.opened, 3)
+
+    def test_command(self):
+        """Tests."""
+        out = StringIO()
+        call_command('newsletter_send', self.post.pk, batch_size=2, verbosity=2, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn("4 message(s) sent", out.getvalue())
+        self.assertIn("Sent 5 message(s)", out.getvalue())
+        self.assertIn("messages/s", out.getvalue())
+
+    def test_journal(self):
+        """Tests."""
+        send_post(self.post, batch_size=2)
+
+        self.assertEqual(Delivery.objects.filter(post=self.post, status=Delivery.SENT).count(), 5)
+        self.assertFalse(Delivery.objects.filter(subscriber__is_active=False).exists())
+
+    def test_journal_counts(self):
+        """Tests."""
+        cache.clear()
+        pending = Delivery.objects.filter(status=Delivery.PENDING)
+        self.assertEqual(CachedCountPaginator(Delivery.objects.all(), 10).count, 0)
+        self.assertEqual(CachedCountPaginator(pending, 10).count, 0)
+
+        with mock.patch('newsletter.mailing.Journal.flush'):
+            send_post(self.post)
+        self.assertEqual(CachedCountPaginator(Delivery.objects.all(), 10).count, 5)
+        self.assertEqual(CachedCountPaginator(pending, 10).count, 5)
+
+        send_post(self.post, resume=True)
+        self.assertEqual(CachedCountPaginator(pending, 10).count, 0)
+
+        # The deliveries are deleted in cascade with their subscriber
+        Subscriber.objects.get(email="subscriber0@example.com").delete()
+        self.assertEqual(CachedCountPaginator(Delivery.objects.all(), 10).count, 4)
+
+    def test_resume(self):
+        """Tests."""
+        CrashingBackend.limit = 3
+
+        with override_settings(EMAIL_BACKEND='newsletter.tests.tests_mailing.CrashingBackend'):
+            with self.assertRaises(ConnectionError):
+                send_post(self.post, batch_size=2, flush_every=2)
+        # The statuses recorded before the crash are flushed
+        self.assertEqual(Delivery.objects.filter(status=Delivery.SENT).count(), 3)
+        self.assertEqual(Delivery.objects.filter(status=Delivery.PENDING).count(), 1)
+
+        self.assertEqual(send_post(self.post, batch_size=2, resume=True), 2)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len({message.to[0] for message in mail.outbox}), 5)
+        self.assertEqual(Delivery.objects.filter(status=Delivery.SENT).count(), 5)
+
+    def test_failed(self):
+        """Tests."""
+        CrashingBackend.limit = 4
+
+        with override_settings(EMAIL_BACKEND='newsletter.tests.tests_mailing.CrashingBackend'):
+            self.assertEqual(send_post(self.post, fail_silently=True), 4)
+        self.assertEqual(Delivery.objects.filter(status=Delivery.FAILED).count(), 1)
+
+        # The failed deliveries are retried
+        self.assertEqual(send_post(self.post, resume=True), 1)
+
+    def test_refused(self):
+        """Tests."""
+        RefusingBackend.refused = {"subscriber2@example.com"}
+
+        with override_settings(EMAIL_BACKEND='newsletter.tests.tests_mailing.RefusingBackend'):
+            with self.assertLogs('newsletter.mailing', 'WARNING'):
+                self.assertEqual(send_post(self.post, batch_size=2), 4)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(list(Delivery.objects.filter(status=Delivery.FAILED).values_list('subscriber__email',
+                                                                                           flat=True)),
+                         ["subscriber2@example.com"])
+
+        # The failed deliveries are retried
+        self.assertEqual(send_post(self.post, resume=True), 1)
+        self.assertEqual(Delivery.objects.filter(status=Delivery.SENT).count(), 5)
+
+    def test_invalid_name(self):
+        """Tests."""
+        Subscriber.objects.create(email="invalid@example.com", name="Name\nBcc: spam@example.com")
+
+        with self.assertLogs('newsletter.mailing', 'WARNING'):
+            self.assertEqual(send_post(self.post), 5)
+        self.assertEqual(Delivery.objects.get(status=Delivery.FAILED).subscriber.email, "invalid@example.com")
+
+    def test_command_refused(self):
+        """Tests."""
+        RefusingBackend.refused = {"subscriber2@example.com"}
+
+        err = StringIO()
+        with override_settings(EMAIL_BACKEND='newsletter.tests.tests_mailing.RefusingBackend'):
+            with self.assertLogs('newsletter.mailing', 'WARNING'):
+                call_command('newsletter_send', self.post.pk, stdout=StringIO(), stderr=err)
+        self.assertIn("1 message(s) could not be sent, use --resume to retry.", err.getvalue())
+
+        out = StringIO()
+        call_command('newsletter_send', self.post.pk, resume=True, stdout=out)
+        self.assertIn("Sent 1 message(s)", out.getvalue())
+
+    def test_command_resume(self):
+        """Tests."""
+        call_command('newsletter_send', self.post.pk, stdout=StringIO())
+
+        with self.assertRaisesMessage(CommandError, "use --resume"):
+            call_command('newsletter_send', self.post.pk, stdout=StringIO())
+        out = StringIO()
+        call_command('newsletter_send', self.post.pk, resume=True, stdout=out)
+        self.assertIn("Sent 0 message(s)", out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_command_unknown_post(self):
+        """Tests."""
+        with self.assertRaises(CommandError):
+            call_command('newsletter_send', 0, stdout=StringIO())
+
+
+@tag('mailing')
+@unittest.skipIf(Controller is None, "aiosmtpd is not installed.")
+class TestSendPostSmtp(TestCase):
+    """Tests the mailing of a post to a local SMTP server."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post and its subscribers."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Title", text="Text")
+        Subscriber.objects.bulk_create([
+            Subscriber(email="subscriber{}@example.com".format(i)) for i in range(0, 5)
+        ])
+
+    def setUp(self):
+        """Start the SMTP server on a free port."""
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+
+        self.messages = []
+        messages = self.messages
+
+        class Handler(Message):
+            """Keep the received messages."""
+
+            async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+                if address == "subscriber2@example.com":
+                    return "550 No such user"
+                envelope.rcpt_tos.append(address)
+                return "250 OK"
+
+            def handle_message(self, message):
+                messages.append(message)
+
+        self.controller = Controller(Handler(), hostname='127.0.0.1', port=port)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+        self.settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=port,
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_send_post(self):
+        """Tests."""
+        # The refused recipient does not stop the mailing, nor close the connection
+        with self.assertLogs('newsletter.mailing', 'WARNING'):
+            self.assertEqual(send_post(self.post, batch_size=2), 4)
+
+        self.assertEqual(sorted(message['To'] for message in self.messages),
+                         ["subscriber{}@example.com".format(i) for i in (0, 1, 3, 4)])
+        self.assertEqual(self.messages[0]['Subject'], "Title")
+        self.assertEqual(Delivery.objects.get(status=Delivery.FAILED).subscriber.email, "subscriber2@example.com")
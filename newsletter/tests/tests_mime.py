@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the pre-rendered MIME messages of the `newsletter`."""
+
+# Standard library
+import sys
+import time
+from email import message_from_bytes, policy
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, Template
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.mime import HTML_TEMPLATE, TEXT_TEMPLATE, compile_post
+from newsletter.models import Post
+
+
+def parse(message):
+    """Return the MIME message of an email message, its plain text and its HTML."""
+    mime = message_from_bytes(message.message().as_bytes(), policy=policy.default)
+    text, html = [part.get_content() for part in mime.iter_parts()]
+    return mime, text, html
+
+
+@tag('mailing')
+class TestMessageSkeleton(TestCase):
+    """Tests the splicing of the messages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Tïtle", text="# Title\n\n*Text* & more")
+
+    def setUp(self):
+        """Compile the post."""
+        self.skeleton = compile_post(self.post, 'newsletter@example.com')
+
+    def test_splice(self):
+        """Tests."""
+        self.assertTrue(self.skeleton.spliced)
+        self.assertEqual(len(self.skeleton.offsets), 4)
+
+        message = self.skeleton.build_message("jane@example.com", "Jane <Doe>", "https://example.com/u?a=1&b=2")
+        mime, text, html = parse(message)
+
+        self.assertEqual(message.recipients(), ["jane@example.com"])
+        self.assertEqual(mime['Subject'], "Tïtle")
+        self.assertEqual(mime['To'].addresses[0].display_name, "Jane <Doe>")
+        self.assertEqual(mime['List-Unsubscribe'], "<https://example.com/u?a=1&b=2>")
+        self.assertIn("Hello Jane <Doe>,", text)
+        self.assertIn("*Text* & more", text)
+        self.assertIn("Unsubscribe: https://example.com/u?a=1&b=2", text)
+        self.assertIn("<p>Hello Jane &lt;Doe&gt;,</p>", html)
+        self.assertIn(self.post.text_html, html)
+        self.assertIn('href="https://example.com/u?a=1&amp;b=2"', html)
+        self.assertNotIn("@@NEWSLETTER", text + html)
+
+    def test_not_ascii(self):
+        """Tests."""
+        message = self.skeleton.build_message("jose@example.com", "José", "")
+        mime, text, html = parse(message)
+
+        self.assertIn("Hello José,", text)
+        self.assertIn("<p>Hello José,</p>", html)
+        self.assertIsNone(mime['List-Unsubscribe'])
+
+    def test_without_name(self):
+        """Tests."""
+        mime, text, html = parse(self.skeleton.build_message("jane@example.com", "", ""))
+
+        self.assertEqual(mime['To'], "jane@example.com")
+        self.assertIn("Hello jane@example.com,", text)
+
+    def test_message_id(self):
+        """Tests."""
+        first, _, _ = parse(self.skeleton.build_message("jane@example.com", "", ""))
+        second, _, _ = parse(self.skeleton.build_message("jane@example.com", "", ""))
+
+        self.assertNotEqual(first['Message-ID'], second['Message-ID'])
+        self.assertEqual(len(first.get_all('Message-ID')), 1)
+
+    def test_long_lines(self):
+        """Tests."""
+        post = Post.objects.create(author=self.user, title="Title", text="word " * 500)
+        skeleton = compile_post(post, 'newsletter@example.com')
+
+        self.assertFalse(skeleton.spliced)
+        mime, text, html = parse(skeleton.build_message("jane@example.com", "Jane", "https://example.com/u"))
+        self.assertIn("Hello Jane,", text)
+        self.assertIn("word word", html)
+        self.assertEqual(mime['List-Unsubscribe'], "<https://example.com/u>")
+
+
+@tag('mailing', 'benchmark')
+class TestMessageSkeletonBenchmark(TestCase):
+    """Compare the cost of a message spliced from the skeleton to the one of a message rendered from the templates.
+
+    It is excluded from the default run of the tests, the timings are written to the standard error.
+    """
+
+    recipients = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Title", text="Paragraph *text*.\n\n" * 50)
+
+    def render(self, templates, name, email, unsubscribe_url):
+        """Return the bytes of a message rendered from the compiled templates for a recipient."""
+        context = Context({'post': self.post, 'name': name, 'unsubscribe_url': unsubscribe_url})
+        text, html = [template.render(context) for template in templates]
+        message = EmailMultiAlternatives(self.post.title, text, 'newsletter@example.com', [email])
+        message.attach_alternative(html, 'text/html')
+        return message.message().as_bytes(linesep='\r\n')
+
+    def test_benchmark(self):
+        """Tests."""
+        recipients = [("Name {}".format(i), "user{}@example.com".format(i), "https://example.com/u/{}".format(i))
+                      for i in range(0, self.recipients)]
+
+        started = time.perf_counter()
+        templates = (Template(TEXT_TEMPLATE), Template(HTML_TEMPLATE))
+        for name, email, url in recipients:
+            self.render(templates, name, email, url)
+        rendered = (time.perf_counter() - started) / self.recipients
+
+        started = time.perf_counter()
+        skeleton = compile_post(self.post, 'newsletter@example.com')
+        for name, email, url in recipients:
+            skeleton.build_message(email, name, url).message().as_bytes(linesep='\r\n')
+        spliced = (time.perf_counter() - started) / self.recipients
+
+        sys.stderr.write("\nPer recipient: {:.1f}µs spliced, {:.1f}µs rendered.\n".format(spliced * 1e6, rendered * 1e6))
+        self.assertTrue(skeleton.spliced)
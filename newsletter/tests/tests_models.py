@@ -3,12 +3,16 @@
 
 """Tests for `newsletter` models module."""
 
+# Standard library
+from unittest import mock
+
 # Django
 from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
 from django.test import TestCase
 
 # Current django project
-from newsletter.models import Comment, Post
+from newsletter.models import Comment, Post, comment_deletions
 
 
 class TestPostModel(TestCase):
@@ -33,6 +37,13 @@ class TestPostModel(TestCase):
         """Test the verbose name in singular."""
         self.assertEqual(str(Post._meta.verbose_name), "post")
 
+    def test_get_absolute_url(self):
+        """Test the URL of the post, which the detail view resolves."""
+        s = Post.objects.create(**self.dict)
+        r = self.client.get(s.get_absolute_url())
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['post'], s)
+
     def test_verbose_name_plural(self):
         """Test the verbose name in plural."""
         self.assertEqual(str(Post._meta.verbose_name_plural), "posts")
@@ -55,6 +66,39 @@ class TestPostModel(TestCase):
             self.assertIn(test[1], p.text_md())
             self.assertIn(test[2], p.text_md())
 
+    def test_text_html_rendered_on_save(self):
+        """Test that the HTML is rendered when the post is saved."""
+        p = Post.objects.create(title="My Title", author=self.user, text="# Toto")
+        self.assertEqual(Post.objects.get(pk=p.pk).text_html, "<h1>Toto</h1>")
+
+        p.text = "*Toto*"
+        p.save()
+        self.assertEqual(Post.objects.get(pk=p.pk).text_html, "<p><em>Toto</em></p>")
+
+    def test_excerpt_rendered_on_save(self):
+        """Test that the excerpt and the word count are computed when the post is saved."""
+        p = Post.objects.create(title="My Title", author=self.user, text="Short *text*")
+        self.assertEqual(p.excerpt_html, "<p>Short <em>text</em></p>")
+        self.assertEqual(p.word_count, 2)
+
+        with self.settings(NEWSLETTER_EXCERPT_WORDS=3):
+            p.text = "A *much* longer text\n\nwith two paragraphs"
+            p.save()
+        p = Post.objects.get(pk=p.pk)
+        self.assertTrue(p.excerpt_html.startswith("<p>A <em>much</em> longer"))
+        self.assertTrue(p.excerpt_html.endswith("</p>"))
+        self.assertNotIn("paragraphs", p.excerpt_html)
+        self.assertEqual(p.word_count, 7)
+
+    def test_text_md_does_not_render(self):
+        """Test that reading the text does not run the markdown parser."""
+        Post.objects.create(title="My Title", author=self.user, text="# Toto")
+        p = Post.objects.get(title="My Title")
+
+        with mock.patch('newsletter.rendering.markdownify') as markdownify:
+            self.assertEqual(p.text_md(), "<h1>Toto</h1>")
+        markdownify.assert_not_called()
+
 
 class TestCommentModel(TestCase):
     """Test comment class model."""
@@ -76,3 +120,102 @@ class TestCommentModel(TestCase):
     def test_verbose_name_plural(self):
         """Test the verbose name in plural."""
         self.assertEqual(str(Comment._meta.verbose_name_plural), "comments")
+
+
+class TestCommentCount(TestCase):
+    """Test the comment count of the posts."""
+
+    def setUp(self):
+        """Set up function."""
+        self.user = get_user_model().objects.create_user(username="username", password="password")
+        self.post = Post.objects.create(title="My Title", author=self.user, text="My text")
+        self.other = Post.objects.create(title="Other", author=self.user, text="My text")
+
+    def assertCount(self, post, count):
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, count)
+
+    def test_create_and_delete(self):
+        """Test that creating and deleting comments updates the count."""
+        c = Comment.objects.create(post=self.post, author=self.user, text="Hello World")
+        Comment.objects.create(post=self.post, author=self.user, text="Hello World")
+        self.assertCount(self.post, 2)
+        self.assertCount(self.other, 0)
+
+        c.text = "Updated"
+        c.save()
+        self.assertCount(self.post, 2)
+
+        c.delete()
+        self.assertCount(self.post, 1)
+
+    def test_bulk(self):
+        """Test that creating and deleting comments in bulk updates the count."""
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.user, text="Hello"),
+            Comment(post=self.post, author=self.user, text="World"),
+            Comment(post=self.other, author=self.user, text="Hello"),
+        ])
+        self.assertCount(self.post, 2)
+        self.assertCount(self.other, 1)
+
+        Comment.objects.filter(text="Hello").delete()
+        self.assertCount(self.post, 1)
+        self.assertCount(self.other, 0)
+
+    def test_bulk_delete_queries(self):
+        """Test that the comments deleted in bulk are uncounted with one query per post."""
+        for i in range(0, 5):
+            Comment.objects.create(post=self.post, author=self.user, text="Hello")
+            Comment.objects.create(post=self.other, author=self.user, text="Hello")
+
+        with mock.patch.object(Post, 'add_to_comment_count', wraps=Post.add_to_comment_count) as add:
+            Comment.objects.filter(text="Hello").delete()
+        self.assertEqual(sorted(call[0] for call in add.call_args_list), [(self.post.pk, -5), (self.other.pk, -5)])
+        self.assertCount(self.post, 0)
+        self.assertCount(self.other, 0)
+
+    def test_post_delete(self):
+        """Test that the comments deleted with their post are not uncounted."""
+        for i in range(0, 5):
+            Comment.objects.create(post=self.post, author=self.user, text="Hello")
+
+        with mock.patch.object(Post, 'add_to_comment_count') as add:
+            self.post.delete()
+        add.assert_not_called()
+        self.assertFalse(Comment.objects.exists())
+
+        # The post is forgotten once deleted
+        Comment.objects.create(post=self.other, author=self.user, text="Hello").delete()
+        self.assertCount(self.other, 0)
+
+    def test_failed_post_delete(self):
+        """Test that a post whose deletion failed is forgotten."""
+        Comment.objects.create(post=self.post, author=self.user, text="Hello")
+        Comment.objects.create(post=self.other, author=self.user, text="Hello")
+
+        for queryset in (None, Post.objects.all()):
+            with mock.patch('django.db.models.sql.DeleteQuery.delete_batch', side_effect=DatabaseError):
+                with self.assertRaises(DatabaseError), transaction.atomic():
+                    self.post.delete() if queryset is None else queryset.delete()
+            self.assertFalse(comment_deletions.posts)
+
+        Comment.objects.filter(post=self.post).get().delete()
+        self.assertCount(self.post, 0)
+
+    def test_cascade(self):
+        """Test that the comments deleted with their author are removed from the count."""
+        user = get_user_model().objects.create_user(username="other", password="password")
+        Comment.objects.create(post=self.post, author=user, text="Hello World")
+        Comment.objects.create(post=self.post, author=self.user, text="Hello World")
+        self.assertCount(self.post, 2)
+
+        user.delete()
+        self.assertCount(self.post, 1)
+
+    def test_no_negative_count(self):
+        """Test that a drifted count does not go below zero."""
+        c = Comment.objects.create(post=self.post, author=self.user, text="Hello World")
+        Post.objects.filter(pk=self.post.pk).update(comment_count=0)
+        c.delete()
+        self.assertCount(self.post, 0)
@@ -0,0 +1,178 @@
+#! /usr/bin/env python
+# coding=utf-8
+
+"""Tests the page cache of the views."""
+
+# Standard library
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.models import Comment, Post
+from newsletter.views import PostListView
+
+
+def get_detail_url(post):
+    """Return the URL of the detail page of the post."""
+    return reverse('newsletter:post-detail-date', kwargs={
+        'year': post.created.year,
+        'month': post.created.month,
+        'day': post.created.day,
+        'pk': post.id
+    })
+
+
+@tag('view', 'cache')
+@override_settings(NEWSLETTER_PAGE_CACHE_TIMEOUT=600)
+class TestAnonymousPageCache(TestCase):
+    """Tests the cache of the pages served to the anonymous users.
+
+    A page served from the cache renders no template, hence its response has no context.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username='author', password='password')
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+        self.post = Post.objects.create(author=self.user, title="First", text="First post")
+        self.other = Post.objects.create(author=self.user, title="Second", text="Second post")
+
+    def test_list_served_from_cache(self):
+        """Tests."""
+        first = self.client.get(reverse('newsletter:post-list'))
+        second = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNotNone(first.context)
+        self.assertIsNone(second.context)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_detail_served_from_cache(self):
+        """Tests."""
+        first = self.client.get(get_detail_url(self.post))
+        second = self.client.get(get_detail_url(self.post))
+
+        self.assertIsNotNone(first.context)
+        self.assertIsNone(second.context)
+        self.assertEqual(second.content, first.content)
+
+    def patch_response(self, func):
+        """Return a patch of the list view calling the function with the view and its response."""
+        render_to_response = PostListView.render_to_response
+
+        def render(view, *args, **kwargs):
+            response = render_to_response(view, *args, **kwargs)
+            func(view, response)
+            return response
+        return mock.patch.object(PostListView, 'render_to_response', autospec=True, side_effect=render)
+
+    def test_headers_cached(self):
+        """Tests."""
+        def add_header(view, response):
+            response['Cache-Control'] = 'max-age=60'
+
+        with self.patch_response(add_header):
+            self.client.get(reverse('newsletter:post-list'))
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNone(r.context)
+        self.assertEqual(r['Cache-Control'], 'max-age=60')
+
+    def test_csrf_token_not_cached(self):
+        """Tests."""
+        with self.patch_response(lambda view, response: get_token(view.request)):
+            self.client.get(reverse('newsletter:post-list'))
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNotNone(r.context)
+
+    def test_cookie_not_cached(self):
+        """Tests."""
+        with self.patch_response(lambda view, response: response.set_cookie('name', 'value')):
+            self.client.get(reverse('newsletter:post-list'))
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNotNone(r.context)
+
+    def test_authenticated_not_cached(self):
+        """Tests."""
+        self.client.login(username='author', password='password')
+        self.client.get(reverse('newsletter:post-list'))
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNotNone(r.context)
+
+    @override_settings(NEWSLETTER_PAGE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """Tests."""
+        self.client.get(reverse('newsletter:post-list'))
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertIsNotNone(r.context)
+
+    def test_not_found_not_cached(self):
+        """Tests."""
+        self.client.get(reverse('newsletter:post-list') + '?page=100')
+        r = self.client.get(reverse('newsletter:post-list') + '?page=100')
+
+        self.assertEqual(r.status_code, 404)
+        self.assertIsNotNone(r.context)
+
+    def test_post_save_invalidates_list_and_detail(self):
+        """Tests."""
+        self.client.get(reverse('newsletter:post-list'))
+        self.client.get(get_detail_url(self.post))
+
+        self.post.title = "Edited"
+        self.post.save()
+
+        r = self.client.get(reverse('newsletter:post-list'))
+        self.assertIn("Edited", [post.title for post in r.context['post_list']])
+        r = self.client.get(get_detail_url(self.post))
+        self.assertIsNotNone(r.context)
+
+    def test_post_delete_invalidates_list(self):
+        """Tests."""
+        self.client.get(reverse('newsletter:post-list'))
+
+        self.other.delete()
+
+        r = self.client.get(reverse('newsletter:post-list'))
+        self.assertEqual(list(r.context['post_list']), [self.post])
+
+    def test_comment_invalidates_its_post_and_first_page(self):
+        """Tests."""
+        for i in range(0, 10):
+            Post.objects.create(author=self.user, title="Post {}".format(i))
+        self.client.get(reverse('newsletter:post-list'))
+        self.client.get(reverse('newsletter:post-list') + '?page=2')
+        self.client.get(get_detail_url(self.post))
+        self.client.get(get_detail_url(self.other))
+
+        Comment.objects.create(author=self.user, post=self.post, text="A comment")
+
+        self.assertIsNotNone(self.client.get(reverse('newsletter:post-list')).context)
+        self.assertIsNone(self.client.get(reverse('newsletter:post-list') + '?page=2').context)
+        self.assertIsNotNone(self.client.get(get_detail_url(self.post)).context)
+        self.assertIsNone(self.client.get(get_detail_url(self.other)).context)
+
+    def test_bulk_create_comments_invalidates_their_posts(self):
+        """Tests."""
+        self.client.get(get_detail_url(self.post))
+        self.client.get(get_detail_url(self.other))
+
+        Comment.objects.bulk_create([Comment(author=self.user, post=self.post, text="A comment")])
+
+        self.assertIsNotNone(self.client.get(get_detail_url(self.post)).context)
+        self.assertIsNone(self.client.get(get_detail_url(self.other)).context)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for `newsletter` pagination module."""
+
+# Standard library
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.models import Comment, Post, Subscriber
+from newsletter.pagination import CachedCountPaginator, CursorPaginator, InvalidCursorError, estimate_count
+
+
+@tag('pagination')
+class TestCursorPaginator(TestCase):
+    """Tests the keyset paginator."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts, some of them sharing their creation date."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 25):
+            Post.objects.create(title="Title {}".format(i), author=cls.user)
+        # Ties on the creation date are broken by the primary key
+        created = Post.objects.get(title="Title 12").created
+        Post.objects.filter(title__in=["Title 10", "Title 11", "Title 13"]).update(created=created)
+        cls.expected = list(Post.objects.order_by('-created', '-id'))
+
+    def setUp(self):
+        """Create the paginator."""
+        self.paginator = CursorPaginator(Post.objects.all(), 10)
+
+    def test_forward(self):
+        """Tests."""
+        page = self.paginator.page()
+        self.assertEqual(page.object_list, self.expected[:10])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+        page = self.paginator.page(page.next_cursor)
+        self.assertEqual(page.object_list, self.expected[10:20])
+        self.assertTrue(page.has_next())
+        self.assertTrue(page.has_previous())
+
+        page = self.paginator.page(page.next_cursor)
+        self.assertEqual(page.object_list, self.expected[20:])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_backward(self):
+        """Tests."""
+        page = self.paginator.page(self.paginator.page().next_cursor)
+        last = self.paginator.page(page.next_cursor)
+
+        page = self.paginator.page(last.previous_cursor)
+        self.assertEqual(page.object_list, self.expected[10:20])
+        self.assertTrue(page.has_next())
+        self.assertTrue(page.has_previous())
+
+        page = self.paginator.page(page.previous_cursor)
+        self.assertEqual(page.object_list, self.expected[:10])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_empty(self):
+        """Tests."""
+        page = CursorPaginator(Post.objects.none(), 10).page()
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_other_pages())
+
+    def test_invalid_cursor(self):
+        """Tests."""
+        for cursor in ("not a cursor", "eyJ2IjogWzFdfQ==", "eyJ2IjogWyJhIiwgMV19"):
+            with self.assertRaises(InvalidCursorError):
+                self.paginator.page(cursor)
+
+    def test_no_count_nor_offset(self):
+        """Tests."""
+        cursor = self.paginator.page().next_cursor
+        with self.assertNumQueries(1) as context:
+            self.paginator.page(cursor)
+        sql = context.captured_queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+
+@tag('pagination')
+class TestCachedCountPaginator(TestCase):
+    """Tests the paginator with a cached count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create posts and comments."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        for i in range(0, 5):
+            Post.objects.create(title="Title {}".format(i), author=cls.user)
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_count_cached(self):
+        """Tests."""
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+
+        # The key depends on the query
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedCountPaginator(Post.objects.filter(title="Title 1"), 2).count, 1)
+
+    def test_count_invalidated(self):
+        """Tests."""
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+
+        post = Post.objects.create(title="Title", author=self.user)
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 6)
+
+        post.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 6)
+
+        post.delete()
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+
+    def test_filtered_count_invalidated(self):
+        """Tests."""
+        self.assertEqual(CachedCountPaginator(Post.objects.filter(title__startswith="Title"), 2).count, 5)
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+
+        # An edit moves the post out of the filter without changing the number of rows
+        post = Post.objects.first()
+        post.title = "Edited"
+        post.save()
+        self.assertEqual(CachedCountPaginator(Post.objects.filter(title__startswith="Title"), 2).count, 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
+
+    def test_filtered_count_timeout(self):
+        """Tests."""
+        with mock.patch('newsletter.pagination.cache.set', wraps=cache.set) as cache_set:
+            CachedCountPaginator(Post.objects.all(), 2).count
+            CachedCountPaginator(Post.objects.filter(title="Title 1"), 2).count
+        self.assertEqual([call[0][2] for call in cache_set.call_args_list], [3600, 60])
+
+    def test_comment_count_invalidated(self):
+        """Tests."""
+        post = Post.objects.first()
+        self.assertEqual(CachedCountPaginator(Comment.objects.all(), 2).count, 0)
+        Comment.objects.create(post=post, author=self.user, text="Text")
+        self.assertEqual(CachedCountPaginator(Comment.objects.all(), 2).count, 1)
+
+        # Deleting the post cascades to its comments
+        post.delete()
+        self.assertEqual(CachedCountPaginator(Comment.objects.all(), 2).count, 0)
+
+    def test_subscriber_count_invalidated(self):
+        """Tests."""
+        self.assertEqual(CachedCountPaginator(Subscriber.objects.all(), 2).count, 0)
+        Subscriber.objects.create(email="jane@example.com")
+        subscriber = Subscriber.objects.create(email="john@example.com")
+        self.assertEqual(CachedCountPaginator(Subscriber.objects.all(), 2).count, 2)
+
+        subscriber.delete()
+        self.assertEqual(CachedCountPaginator(Subscriber.objects.all(), 2).count, 1)
+
+    def test_empty_queryset(self):
+        """Tests."""
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Post.objects.none(), 2).count, 0)
+
+    def test_list(self):
+        """Tests."""
+        self.assertEqual(CachedCountPaginator([1, 2, 3], 2).count, 3)
+
+    def test_estimate(self):
+        """Tests."""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(estimate_count(Post), 5)
+
+        with self.settings(NEWSLETTER_COUNT_ESTIMATE_THRESHOLD=3):
+            with mock.patch('newsletter.pagination.estimate_count', return_value=1000):
+                self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 1000)
+                # Filtered querysets are always counted
+                self.assertEqual(CachedCountPaginator(Post.objects.filter(title="Title 1"), 2).count, 1)
+
+        with self.settings(NEWSLETTER_COUNT_ESTIMATE_THRESHOLD=10):
+            cache.clear()
+            self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 5)
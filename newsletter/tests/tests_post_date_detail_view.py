@@ -3,15 +3,20 @@
 
 """Tests the views."""
 
+# Standard library
+from unittest import mock
+
 # Django
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
-from django.test import TestCase, tag
+from django.test import TestCase, override_settings, tag
 from django.urls import reverse
 
 # Current django project
-from newsletter.models import Post
+from newsletter.mixins import QueryBudgetExceededError
+from newsletter.models import Comment, Post
 from newsletter.tests.utils import create_user
+from newsletter.views import PostDateDetailView
 
 
 @tag('post', 'view', 'detail', 'anonymous')
@@ -318,3 +323,66 @@ class TestPostDetailViewAsSuperuser(TestCase):
                                             }), data=d)
         self.assertEqual(len(Post.objects.all()), 1)
         self.assertRedirects(response, "/{}/{}/{}/{}/".format(self.post.created.year, self.post.created.month, self.post.created.day, self.post.id), fetch_redirect_response=False)
+
+
+@tag('post', 'view', 'detail', 'comments')
+class TestPostDetailViewComments(TestCase):
+    """Tests the comments of the detail view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post with more comments than a page."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Title")
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.user, text="Comment {}".format(i)) for i in range(0, 120)
+        ])
+        cls.url = reverse('newsletter:post-detail-date', kwargs={
+            'year': cls.post.created.year,
+            'month': cls.post.created.month,
+            'day': cls.post.created.day,
+            'pk': cls.post.id
+        })
+
+    def test_comments_within_budget(self):
+        """Tests."""
+        # The post with its author and the comments with their authors, whatever the number of comments
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['comment_list']), 50)
+        self.assertEqual(response.content.decode().count("Title - username"), 50)
+
+    def test_comments_pages(self):
+        """Tests."""
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(self.url, {'comments': cursor})
+            self.assertEqual(response.status_code, 200)
+            page = response.context['comment_page']
+            seen.extend(comment.pk for comment in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, list(self.post.comment_set.order_by('-created', '-id').values_list('pk', flat=True)))
+
+    def test_invalid_cursor(self):
+        """Tests."""
+        response = self.client.get(self.url, {'comments': 'invalid'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_over_budget(self):
+        """Tests."""
+        with mock.patch.object(PostDateDetailView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceededError):
+                self.client.get(self.url)
+
+        with override_settings(NEWSLETTER_QUERY_BUDGET_STRICT=False):
+            with mock.patch.object(PostDateDetailView, 'query_budget', 1):
+                with self.assertLogs('newsletter.mixins', 'WARNING'):
+                    response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
@@ -6,6 +6,7 @@
 # Django
 from django.test import TestCase, tag
 from django.urls import reverse
+from django.utils.http import urlencode
 
 # Current django project
 from newsletter.models import Post
@@ -46,6 +47,18 @@ class TestPostListViewAsAnonymous(TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertEqual(len(r.context['post_list']), 10)
 
+    def tests_list_view_defers_text(self):
+        """Tests."""
+        Post.objects.create(author=self.user, text="# Title\n\n" + "word " * 1000)
+
+        r = self.client.get(reverse('newsletter:post-list'))
+
+        self.assertEqual(r.status_code, 200)
+        post = r.context['post_list'][0]
+        self.assertEqual(post.get_deferred_fields(), {'text', 'text_html'})
+        self.assertEqual(post.word_count, 1001)
+        self.assertTrue(post.excerpt_html.startswith("<h1>Title</h1>"))
+
 
 @tag('post', 'view', 'list', 'logged')
 class TestPostListViewAsLogged(TestCase):
@@ -165,3 +178,53 @@ class TestPostListViewAsSuperuser(TestCase):
 
         self.assertEqual(r.status_code, 200)
         self.assertEqual(len(r.context['post_list']), 10)
+
+
+@tag('post', 'view', 'list', 'cursor')
+class TestPostListViewWithCursors(TestCase):
+    """Tests ListView for Post paginated with cursors."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the posts of three pages."""
+        cls.dict, cls.user = create_user()
+        for i in range(0, 25):
+            Post.objects.create(author=cls.user, title="Title {}".format(i))
+
+    def tests_list_view_pages(self):
+        """Tests."""
+        with self.settings(NEWSLETTER_CURSOR_PAGINATION=True):
+            r = self.client.get(reverse('newsletter:post-list'))
+            self.assertEqual(r.status_code, 200)
+            self.assertEqual([p.title for p in r.context['post_list']], ["Title {}".format(i) for i in range(24, 14, -1)])
+            self.assertTrue(r.context['is_paginated'])
+            self.assertFalse(r.context['page_obj'].has_previous())
+
+            self.assertIsNone(r.context['previous_page_url'])
+
+            # Follow the links, as a reader would
+            r = self.client.get(reverse('newsletter:post-list') + r.context['next_page_url'])
+            r = self.client.get(reverse('newsletter:post-list') + r.context['next_page_url'])
+            self.assertEqual(r.status_code, 200)
+            self.assertEqual([p.title for p in r.context['post_list']], ["Title {}".format(i) for i in range(4, -1, -1)])
+            self.assertFalse(r.context['page_obj'].has_next())
+            self.assertIsNone(r.context['next_page_url'])
+            self.assertEqual(r.context['previous_page_url'],
+                             '?' + urlencode({'cursor': r.context['page_obj'].previous_cursor}))
+
+            r = self.client.get(reverse('newsletter:post-list') + r.context['previous_page_url'])
+            self.assertEqual(r.status_code, 200)
+            self.assertEqual([p.title for p in r.context['post_list']], ["Title {}".format(i) for i in range(14, 4, -1)])
+
+    def tests_list_view_page_urls(self):
+        """Tests."""
+        r = self.client.get(reverse('newsletter:post-list'), {'page': 2})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['next_page_url'], '?page=3')
+        self.assertEqual(r.context['previous_page_url'], '?page=1')
+
+    def tests_list_view_invalid_cursor(self):
+        """Tests."""
+        with self.settings(NEWSLETTER_CURSOR_PAGINATION=True):
+            r = self.client.get(reverse('newsletter:post-list'), {'cursor': 'invalid'})
+        self.assertEqual(r.status_code, 404)
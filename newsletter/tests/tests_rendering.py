@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for `newsletter` rendering module."""
+
+# Standard library
+from unittest import mock
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
+
+# Current django project
+from newsletter.rendering import LRUCache, MarkdownRenderer, get_renderer, render_markdown
+
+
+@tag('rendering')
+class TestLRUCache(TestCase):
+    """Tests the in-process LRU cache."""
+
+    def test_eviction(self):
+        """Tests."""
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+    def test_ttl(self):
+        """Tests."""
+        lru = LRUCache(2, ttl=10)
+        with mock.patch('newsletter.rendering.time.monotonic', return_value=100):
+            lru.set('a', 1)
+        with mock.patch('newsletter.rendering.time.monotonic', return_value=105):
+            self.assertEqual(lru.get('a'), 1)
+        with mock.patch('newsletter.rendering.time.monotonic', return_value=111):
+            self.assertIsNone(lru.get('a'))
+        self.assertEqual(len(lru), 0)
+
+    def test_disabled(self):
+        """Tests."""
+        lru = LRUCache(0)
+        lru.set('a', 1)
+        self.assertIsNone(lru.get('a'))
+
+
+@tag('rendering')
+class TestMarkdownRenderer(TestCase):
+    """Tests the cached markdown renderer."""
+
+    def setUp(self):
+        """Start every test with empty tiers."""
+        cache.clear()
+        self.renderer = MarkdownRenderer()
+
+    def test_render(self):
+        """Tests."""
+        self.assertEqual(self.renderer.render(''), '')
+        self.assertEqual(self.renderer.render('# Toto'), '<h1>Toto</h1>')
+
+    def test_identical_bodies_rendered_once(self):
+        """Tests."""
+        with mock.patch('newsletter.rendering.markdownify', return_value='<h1>Toto</h1>') as markdownify:
+            for i in range(0, 3):
+                self.assertEqual(self.renderer.render('# Toto'), '<h1>Toto</h1>')
+        markdownify.assert_called_once_with('# Toto')
+        self.assertEqual(self.renderer.stats, {'local_hits': 2, 'shared_hits': 0, 'misses': 1})
+
+    def test_shared_tier(self):
+        """Tests."""
+        self.renderer.render('# Toto')
+
+        # Another process has its own in-process tier but shares the Django cache
+        other = MarkdownRenderer()
+        with mock.patch('newsletter.rendering.markdownify') as markdownify:
+            self.assertEqual(other.render('# Toto'), '<h1>Toto</h1>')
+        markdownify.assert_not_called()
+        self.assertEqual(other.stats, {'local_hits': 0, 'shared_hits': 1, 'misses': 0})
+
+    def test_without_shared_tier(self):
+        """Tests."""
+        renderer = MarkdownRenderer(cache_alias=None)
+        renderer.render('# Toto')
+        renderer.clear()
+        renderer.render('# Toto')
+        self.assertEqual(renderer.stats, {'local_hits': 0, 'shared_hits': 0, 'misses': 2})
+
+    def test_key_depends_on_configuration(self):
+        """Tests."""
+        key = self.renderer.get_key('# Toto')
+        self.assertNotEqual(key, self.renderer.get_key('# Tata'))
+
+        with mock.patch.object(MarkdownRenderer, 'get_signature', return_value='other'):
+            self.assertNotEqual(key, MarkdownRenderer().get_key('# Toto'))
+
+    def test_signature_depends_on_versions(self):
+        """Tests."""
+        signature = MarkdownRenderer.get_signature()
+
+        with mock.patch('markdownx.__version__', '0.0.0', create=True):
+            self.assertNotEqual(MarkdownRenderer.get_signature(), signature)
+
+        with mock.patch('newsletter.rendering.MARKDOWNX_MARKDOWN_EXTENSIONS', ['markdown.extensions.extra']):
+            signature = MarkdownRenderer.get_signature()
+            with mock.patch('markdown.__version__', '0.0.0'):
+                self.assertNotEqual(MarkdownRenderer.get_signature(), signature)
+
+    def test_settings(self):
+        """Tests."""
+        with override_settings(NEWSLETTER_RENDER_CACHE_SIZE=3, NEWSLETTER_RENDER_CACHE_TTL=None):
+            self.assertEqual(get_renderer().local.maxsize, 3)
+            self.assertIsNone(get_renderer().local.ttl)
+            self.assertEqual(render_markdown('*Toto*'), '<p><em>Toto</em></p>')
+        self.assertEqual(get_renderer().local.maxsize, 1024)
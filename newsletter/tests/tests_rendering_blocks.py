@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Parity tests for the block-level rendering of the `newsletter` rendering module."""
+
+# Standard library
+import random
+from unittest import mock
+
+# Third-party
+from markdown.extensions.extra import ExtraExtension
+from markdownx.utils import markdownify
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase, tag
+
+# Current django project
+from newsletter.rendering import MarkdownRenderer, split_blocks
+
+BLOCKS = (
+    "# Title",
+    "Title\n=====",
+    "Subtitle\n---",
+    "A paragraph\non two lines  \nwith a line break",
+    "*em* and **strong** and `code` and [link](https://example.com)",
+    "Entities & < > &amp; &copy;",
+    "Escaped\\\nline",
+    "![image](image.png)",
+    "- first\n- second",
+    "- first\n\n    continued",
+    "+ plus",
+    "1. one\n2. two",
+    "10. ten",
+    "> quote\n> on two lines",
+    "> quote",
+    "    indented code\n\n\n    after blank lines",
+    "\ttabbed code",
+    "   three spaces",
+    "```\nfenced\n\n\ncode\n```",
+    "~~~python\nx = 1\n\ny = 2\n~~~",
+    "```\nfenced\n```\nfollowed by text",
+    "***",
+    "* * *",
+    "| a | b |\n|---|---|\n| 1 | 2 |",
+    "term\n: definition",
+)
+
+# Extensions and whether the texts are split with them
+EXTENSIONS = (
+    ([], True),
+    (['markdown.extensions.extra'], True),
+    (['markdown.extensions.extra:ExtraExtension'], True),
+    (['markdown.extensions.nl2br', 'markdown.extensions.sane_lists'], True),
+    (['markdown.extensions.codehilite'], False),
+    (['markdown.extensions.extra', 'markdown.extensions.codehilite'], False),
+    (['markdown.extensions.toc:TocExtension'], False),
+    ([ExtraExtension()], False),
+)
+
+
+def documents(count, seed=0):
+    """Yield random documents assembled from the blocks with various separators."""
+    rnd = random.Random(seed)
+    for i in range(0, count):
+        blocks = [rnd.choice(BLOCKS) for j in range(0, rnd.randint(2, 10))]
+        yield ''.join(block + '\n' * rnd.randint(1, 4) for block in blocks)
+
+
+@tag('rendering')
+class TestSplitBlocks(TestCase):
+    """Tests the split of a text into top-level blocks."""
+
+    def test_split(self):
+        """Tests."""
+        self.assertEqual(split_blocks("# Title\n\nA paragraph\n\n\n***"), ["# Title", "A paragraph", "***"])
+
+    def test_continuations(self):
+        """Tests."""
+        self.assertEqual(split_blocks("- a\n\n- b\n\n    c\n\nd"), ["- a\n\n- b\n\n    c", "d"])
+        self.assertEqual(split_blocks("> a\n\n> b\n\nc"), ["> a\n\n> b", "c"])
+        self.assertEqual(split_blocks("a\n\n```\nb\n\nc\n```\n\nd\n\ne"), ["a", "```\nb\n\nc\n```\n\nd", "e"])
+
+    def test_not_splittable(self):
+        """Tests."""
+        self.assertIsNone(split_blocks("A single paragraph"))
+        self.assertIsNone(split_blocks("- a\n\n- b"))
+        self.assertIsNone(split_blocks("A [link][1]\n\n[1]: https://example.com"))
+        self.assertIsNone(split_blocks("A note[^1]\n\n[^1]: The note"))
+        self.assertIsNone(split_blocks("<div>\n\nraw\n\n</div>\n\ntext"))
+        self.assertIsNone(split_blocks("a\r\n\r\nb"))
+        for extension in ('markdown.extensions.toc', 'markdown.extensions.codehilite', ExtraExtension()):
+            with mock.patch('newsletter.rendering.MARKDOWNX_MARKDOWN_EXTENSIONS', [extension]):
+                self.assertIsNone(split_blocks("# a\n\n# a"))
+
+
+@tag('rendering')
+class TestBlockRenderingParity(TestCase):
+    """Tests that the block-level rendering is byte-identical to a full render."""
+
+    def assertParity(self, text):
+        blocks = split_blocks(text)
+        if blocks is None:
+            return False
+        self.assertEqual('\n'.join(filter(None, map(markdownify, blocks))), markdownify(text), repr(text))
+        return True
+
+    def test_parity(self):
+        """Tests."""
+        for extensions, splittable in EXTENSIONS:
+            with mock.patch('markdownx.utils.MARKDOWNX_MARKDOWN_EXTENSIONS', extensions), \
+                    mock.patch('newsletter.rendering.MARKDOWNX_MARKDOWN_EXTENSIONS', extensions):
+                split = [self.assertParity(text) for text in documents(500)]
+            if splittable:
+                # Make sure that the corpus actually exercises the split
+                self.assertGreater(split.count(True), 400, extensions)
+            else:
+                self.assertEqual(split.count(True), 0, extensions)
+
+    def test_parity_renderer(self):
+        """Tests."""
+        for extensions, splittable in EXTENSIONS:
+            cache.clear()
+            renderer = MarkdownRenderer(block_threshold=1)
+            with mock.patch('markdownx.utils.MARKDOWNX_MARKDOWN_EXTENSIONS', extensions), \
+                    mock.patch('newsletter.rendering.MARKDOWNX_MARKDOWN_EXTENSIONS', extensions):
+                for text in documents(100, seed=1):
+                    self.assertEqual(renderer.render(text), markdownify(text), repr(text))
+
+
+@tag('rendering')
+class TestIncrementalRendering(TestCase):
+    """Tests that an edit only renders the blocks it changed."""
+
+    def setUp(self):
+        """Start every test with empty tiers."""
+        cache.clear()
+        self.paragraphs = ["Paragraph number {}, long enough to be worth caching.".format(i) for i in range(0, 50)]
+
+    def test_edit_renders_changed_block(self):
+        """Tests."""
+        renderer = MarkdownRenderer(block_threshold=1000)
+        text = '\n\n'.join(self.paragraphs)
+        renderer.render(text)
+
+        self.paragraphs[10] = "An *edited* paragraph."
+        edited = '\n\n'.join(self.paragraphs)
+        with mock.patch('newsletter.rendering.markdownify', wraps=markdownify) as render:
+            html = renderer.render(edited)
+
+        render.assert_called_once_with("An *edited* paragraph.")
+        self.assertEqual(html, markdownify(edited))
+
+    def test_small_text_rendered_whole(self):
+        """Tests."""
+        renderer = MarkdownRenderer(block_threshold=1000000)
+        text = '\n\n'.join(self.paragraphs)
+        with mock.patch('newsletter.rendering.markdownify', wraps=markdownify) as render:
+            renderer.render(text)
+        render.assert_called_once_with(text)
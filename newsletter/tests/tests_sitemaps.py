@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the sitemap of the `newsletter`."""
+
+# Standard library
+from unittest import mock
+
+# Django
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, tag
+from django.urls import reverse
+
+# Current django project
+from newsletter.models import Post
+from newsletter.sitemaps import PostSitemap
+
+
+@tag('sitemap')
+@mock.patch('newsletter.cache.SITEMAP_SECTION_SIZE', 3)
+@mock.patch.object(PostSitemap, 'limit', 3)
+class TestSitemap(TestCase):
+    """Tests the sitemap index and its sections of 3 primary keys."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+
+    def setUp(self):
+        """Create 7 posts, over 3 sections, in every test."""
+        cache.clear()
+        # The current site is cached by the process, cache it before counting the queries
+        Site.objects.get_current()
+        self.posts = [Post.objects.create(author=self.user, title="Title {}".format(i)) for i in range(0, 7)]
+        self.first_pk = self.posts[0].pk
+        self.section_url = reverse('newsletter:sitemap-section', kwargs={'section': 'posts'})
+
+    def get_section(self, number):
+        """Return the response of a section of the sitemap."""
+        return self.client.get(self.section_url, {'p': number})
+
+    def test_index(self):
+        """Tests."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('newsletter:sitemap'))
+
+        self.assertEqual(response.status_code, 200)
+        pages = (self.posts[-1].pk - 1) // 3 + 1
+        self.assertEqual(response.content.decode().count('<sitemap>'), pages)
+
+    def test_sections(self):
+        """Tests."""
+        locations = []
+        pages = (self.posts[-1].pk - 1) // 3 + 1
+        for number in range(1, pages + 1):
+            response = self.get_section(number)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header('Last-Modified'))
+            locations.extend(url['location'] for url in response.context['urlset'])
+
+        self.assertEqual(locations, ['http://example.com' + post.get_absolute_url() for post in self.posts])
+        self.assertEqual(self.get_section(pages + 1).status_code, 404)
+        self.assertEqual(self.get_section('a').status_code, 404)
+
+    def test_section_cached(self):
+        """Tests."""
+        content = self.get_section(1).content
+
+        # The number of sections from MAX(id), no scan of the section
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_section(1).content, content)
+
+    def test_section_invalidated(self):
+        """Tests."""
+        sections = {number: self.get_section(number).content for number in (1, 2, 3)}
+        post = Post.objects.get(pk=self.posts[4].pk)
+        changed = (post.pk - 1) // 3 + 1
+
+        post.title = "Changed"
+        post.save()
+
+        for number, content in sections.items():
+            with self.assertNumQueries(1 if number != changed else 2):
+                self.get_section(number)
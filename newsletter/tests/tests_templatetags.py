@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+# coding=utf-8
+
+"""Tests the template tags of the newsletter."""
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings, tag
+
+# Current django project
+from newsletter.models import Comment, Post
+
+
+@tag('templatetags', 'cache')
+class TestVersionTags(TestCase):
+    """Tests the versions of the cached fragments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the data of the tests."""
+        cls.user = get_user_model().objects.create_user(username='author', password='password')
+
+    def setUp(self):
+        """Create a post in every test, the tests modify it."""
+        self.post = Post.objects.create(author=self.user, title="Title", text="Text")
+
+    def version(self, name):
+        """Render the version tag on the post reloaded from the database."""
+        post = Post.objects.get(pk=self.post.pk)
+        return Template('{% load newsletter_tags %}{% ' + name + ' post %}').render(Context({'post': post}))
+
+    def test_post_card_version(self):
+        """Tests."""
+        version = self.version('post_card_version')
+
+        self.assertEqual(self.version('post_card_version'), version)
+        Comment.objects.create(author=self.user, post=self.post, text="A comment")
+        self.assertNotEqual(self.version('post_card_version'), version)
+
+        version = self.version('post_card_version')
+        self.post.save()
+        self.assertNotEqual(self.version('post_card_version'), version)
+
+    def test_comment_list_version(self):
+        """Tests."""
+        version = self.version('comment_list_version')
+        comment = Comment.objects.create(author=self.user, post=self.post, text="A comment")
+        self.assertNotEqual(self.version('comment_list_version'), version)
+
+        version = self.version('comment_list_version')
+        comment.text = "Edited"
+        comment.save()
+        self.assertNotEqual(self.version('comment_list_version'), version)
+
+        version = self.version('comment_list_version')
+        Comment.objects.create(author=self.user, post=self.post, text="Another comment").delete()
+        self.assertEqual(self.version('comment_list_version'), version)
+        comment.delete()
+        self.assertNotEqual(self.version('comment_list_version'), version)
+
+    @override_settings(NEWSLETTER_FRAGMENT_CACHE_TIMEOUT=60)
+    def test_cached_fragment(self):
+        """Tests."""
+        cache.clear()
+        template = Template(
+            '{% load cache newsletter_tags %}'
+            '{% fragment_cache_timeout as timeout %}{% post_card_version post as version %}'
+            '{% cache timeout card version %}{{ post.title }}{% endcache %}'
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(template.render(Context({'post': post})), "Title")
+
+        # Same version, the stale title comes from the cache
+        post.title = "Changed"
+        self.assertEqual(template.render(Context({'post': post})), "Title")
+
+        post.save()
+        self.assertEqual(template.render(Context({'post': post})), "Changed")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the signed tokens and the views of the links of the mails."""
+
+# Standard library
+from email import message_from_bytes, policy
+from urllib.parse import urlsplit
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core import mail, signing
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+from django.utils import timezone
+
+# Current django project
+from newsletter.mailing import send_post
+from newsletter.models import Delivery, Post, PostStats, Subscriber
+from newsletter.tokens import TRACKING, UNSUBSCRIBE, check_url, make_token, read_token, sign_url
+from newsletter.tracking import flush
+
+
+@tag('mailing')
+class TestTokens(TestCase):
+    """Tests the signed tokens."""
+
+    def test_read_token(self):
+        """Tests."""
+        token = make_token(UNSUBSCRIBE, 12, 34)
+
+        self.assertEqual(read_token(UNSUBSCRIBE, token), (12, 34))
+
+    def test_other_action(self):
+        """Tests."""
+        with self.assertRaises(signing.BadSignature):
+            read_token(UNSUBSCRIBE, make_token(TRACKING, 12, 34))
+
+    def test_tampered(self):
+        """Tests."""
+        token = make_token(UNSUBSCRIBE, 12, 34)
+
+        for tampered in ('', 'token', token[:-1], 'WzEzLDM0XQ' + token[token.index(':'):]):
+            with self.assertRaises(signing.BadSignature):
+                read_token(UNSUBSCRIBE, tampered)
+
+    def test_expired(self):
+        """Tests."""
+        token = make_token(TRACKING, 12, 34)
+
+        with override_settings(NEWSLETTER_TRACKING_TOKEN_MAX_AGE=-1):
+            with self.assertRaises(signing.SignatureExpired):
+                read_token(TRACKING, token)
+
+    def test_invalid_payload(self):
+        """Tests."""
+        token = signing.dumps({'subscriber': 12}, salt='newsletter.tokens.unsubscribe')
+
+        with self.assertRaises(signing.BadSignature):
+            read_token(UNSUBSCRIBE, token)
+
+    def test_sign_url(self):
+        """Tests."""
+        signature = sign_url('https://example.com/')
+
+        self.assertTrue(check_url('https://example.com/', signature))
+        self.assertFalse(check_url('https://example.org/', signature))
+
+
+@tag('mailing')
+@override_settings(NEWSLETTER_BASE_URL='https://newsletter.example.com')
+class TestTokenViews(TestCase):
+    """Tests the views of the unsubscribe and tracking links."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a post mailed to a subscriber."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.post = Post.objects.create(author=cls.user, title="Title", text="[Link](https://example.com/?a=1&b=2)")
+        cls.subscriber = Subscriber.objects.create(email="jane@example.com", name="Jane")
+        Delivery.objects.create(post=cls.post, subscriber=cls.subscriber, status=Delivery.SENT)
+        PostStats.objects.create(post=cls.post, mailed=timezone.now())
+
+    def setUp(self):
+        """Start every test with empty tracking counters."""
+        cache.clear()
+
+    def test_mail_links(self):
+        """Tests."""
+        Delivery.objects.all().delete()
+        send_post(self.post)
+
+        mime = message_from_bytes(mail.outbox[0].message().as_bytes(), policy=policy.default)
+        html = mime.get_body(('html',)).get_content()
+        unsubscribe_url = mime['List-Unsubscribe'][1:-1]
+        self.assertTrue(unsubscribe_url.startswith('https://newsletter.example.com/unsubscribe/'))
+        self.assertEqual(mime['List-Unsubscribe-Post'], 'List-Unsubscribe=One-Click')
+        self.assertIn('https://newsletter.example.com/track/open/', html)
+        self.assertIn('https://newsletter.example.com/track/click/', html)
+        self.assertNotIn('href="https://example.com/', html)
+
+        token = urlsplit(unsubscribe_url).path.split('/')[-2]
+        self.assertEqual(read_token(UNSUBSCRIBE, token), (self.subscriber.pk, self.post.pk))
+
+    def test_unsubscribe(self):
+        """Tests."""
+        url = reverse('newsletter:unsubscribe', kwargs={'token': make_token(UNSUBSCRIBE, self.subscriber.pk,
+                                                                            self.post.pk)})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('unsubscribed', response.context)
+        self.subscriber.refresh_from_db()
+        self.assertTrue(self.subscriber.is_active)
+
+        # One-click unsubscription of RFC 8058, without CSRF token
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'List-Unsubscribe': 'One-Click'})
+        self.assertTrue(response.context['unsubscribed'])
+        self.subscriber.refresh_from_db()
+        self.assertFalse(self.subscriber.is_active)
+
+    def test_unsubscribe_invalid_token(self):
+        """Tests."""
+        token = make_token(TRACKING, self.subscriber.pk, self.post.pk)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('newsletter:unsubscribe', kwargs={'token': token}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_open(self):
+        """Tests."""
+        url = reverse('newsletter:track-open', kwargs={'token': make_token(TRACKING, self.subscriber.pk,
+                                                                           self.post.pk)})
+
+        # The hits are counted in the cache
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.client.get(url)
+
+        flush()
+        stats = PostStats.objects.get()
+        self.assertEqual((stats.opens, stats.unique_opens), (2, 1))
+
+    def test_open_invalid_token(self):
+        """Tests."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('newsletter:track-open', kwargs={'token': 'invalid'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(flush(), (0, 0))
+
+    def test_click(self):
+        """Tests."""
+        target = 'https://example.com/?a=1&b=2'
+        url = reverse('newsletter:track-click', kwargs={'token': make_token(TRACKING, self.subscriber.pk,
+                                                                            self.post.pk)})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'url': target, 'sig': sign_url(target)})
+        self.assertRedirects(response, target, fetch_redirect_response=False)
+        flush()
+        self.assertEqual(PostStats.objects.get().clicks, 1)
+
+    def test_click_from_mail(self):
+        """Tests."""
+        Delivery.objects.all().delete()
+        send_post(self.post)
+        html = message_from_bytes(mail.outbox[0].message().as_bytes(), policy=policy.default).get_body(
+            ('html',)).get_content()
+        link = html[html.index('https://newsletter.example.com/track/click/'):]
+        link = link[:link.index('"')].replace('&amp;', '&')
+
+        response = self.client.get(link[len('https://newsletter.example.com'):])
+
+        self.assertRedirects(response, 'https://example.com/?a=1&b=2', fetch_redirect_response=False)
+        flush()
+        self.assertEqual(PostStats.objects.get().unique_clicks, 1)
+
+    def test_click_invalid_signature(self):
+        """Tests."""
+        url = reverse('newsletter:track-click', kwargs={'token': make_token(TRACKING, self.subscriber.pk,
+                                                                            self.post.pk)})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'url': 'https://evil.example.com/', 'sig': sign_url('https://a.b/')})
+        self.assertEqual(response.status_code, 404)
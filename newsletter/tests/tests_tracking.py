@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""Tests for the write-behind tracking of the mails."""
+
+# Standard library
+import datetime
+from io import StringIO
+
+# Django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.utils import timezone
+
+# Current django project
+from newsletter.models import Post, PostStats, Subscriber
+from newsletter.tracking import flush, get_counter_key, mark_mailed, record_click, record_open
+
+
+@tag('mailing')
+class TestTracking(TestCase):
+    """Tests the counters of the openings and clicks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create mailed posts."""
+        cls.user = get_user_model().objects.create_user(username="username", password="password")
+        cls.posts = [Post.objects.create(author=cls.user, title="Title {}".format(i), text="Text") for i in range(3)]
+        for post in cls.posts:
+            PostStats.objects.create(post=post, mailed=timezone.now())
+
+    def setUp(self):
+        """Start every test with empty counters."""
+        cache.clear()
+
+    def test_record_without_query(self):
+        """Tests."""
+        with self.assertNumQueries(0):
+            for i in range(0, 100):
+                record_open(self.posts[0].pk, i % 10)
+                record_click(self.posts[1].pk, 1)
+
+        self.assertEqual(cache.get(get_counter_key('opens', self.posts[0].pk)), 100)
+        self.assertEqual(cache.get(get_counter_key('unique_opens', self.posts[0].pk)), 10)
+
+    def test_flush(self):
+        """Tests."""
+        for i in range(0, 5):
+            record_open(self.posts[0].pk, i)
+            record_open(self.posts[0].pk, i)
+            record_click(self.posts[1].pk, 1)
+
+        # The list of the mailed posts, then one UPDATE per post with hits, in a transaction
+        with self.assertNumQueries(5):
+            self.assertEqual(flush(), (2, 15))
+
+        first, second, third = [PostStats.objects.get(post=post) for post in self.posts]
+        self.assertEqual((first.opens, first.unique_opens, first.clicks, first.unique_clicks), (10, 5, 0, 0))
+        self.assertEqual((second.opens, second.unique_opens, second.clicks, second.unique_clicks), (0, 0, 5, 1))
+        self.assertEqual(third.opens, 0)
+
+        # The counters are folded once
+        self.assertEqual(flush(), (0, 0))
+        record_open(self.posts[0].pk, 0)
+        flush()
+        first.refresh_from_db()
+        self.assertEqual((first.opens, first.unique_opens), (11, 5))
+
+    def test_hits_during_flush(self):
+        """Tests."""
+        record_open(self.posts[0].pk, 1)
+        original = cache.decr
+
+        def decr(key, delta=1, version=None):
+            # A hit between the read and the write of the counter
+            record_open(self.posts[0].pk, 2)
+            return original(key, delta, version)
+
+        cache.decr = decr
+        try:
+            flush()
+        finally:
+            del cache.decr
+        flush()
+
+        stats = PostStats.objects.get(post=self.posts[0])
+        self.assertEqual((stats.opens, stats.unique_opens), (3, 2))
+
+    def test_old_mailing(self):
+        """Tests."""
+        PostStats.objects.filter(post=self.posts[0]).update(mailed=timezone.now() - datetime.timedelta(days=365))
+        record_open(self.posts[0].pk, 1)
+
+        self.assertEqual(flush(), (0, 0))
+
+    def test_mark_mailed(self):
+        """Tests."""
+        post = Post.objects.create(author=self.user, title="Title", text="Text")
+
+        mark_mailed(post)
+        mark_mailed(post)
+
+        self.assertIsNotNone(PostStats.objects.get(post=post).mailed)
+
+    def test_send_marks_mailed(self):
+        """Tests."""
+        post = Post.objects.create(author=self.user, title="Title", text="Text")
+        Subscriber.objects.create(email="jane@example.com")
+
+        call_command('newsletter_send', post.pk, stdout=StringIO())
+
+        self.assertTrue(PostStats.objects.filter(post=post, mailed__isnull=False).exists())
+
+    def test_command(self):
+        """Tests."""
+        record_click(self.posts[2].pk, 1)
+        out = StringIO()
+
+        call_command('newsletter_flush_tracking', stdout=out)
+
+        self.assertIn("Flushed 1 hit(s) of 1 post(s)", out.getvalue())
+        self.assertEqual(PostStats.objects.get(post=self.posts[2]).clicks, 1)
@@ -53,3 +53,25 @@ class TestUrlsComment(TestCase):
         """Test the URL of the listing of posts."""
         url = reverse('newsletter:post-comment-delete', kwargs={'pk': 1})
         self.assertEqual(url, "/comments/1/delete/")
+
+    def test_export_url(self):
+        """Test the URL of the export of the posts and comments."""
+        url = reverse('newsletter:export')
+        self.assertEqual(url, "/export/")
+
+    def test_sitemap_urls(self):
+        """Test the URLs of the sitemap index and of its sections."""
+        self.assertEqual(reverse('newsletter:sitemap'), "/sitemap.xml")
+        self.assertEqual(reverse('newsletter:sitemap-section', kwargs={'section': 'posts'}), "/sitemap-posts.xml")
+
+    def test_api_urls(self):
+        """Test the URLs of the JSON API."""
+        self.assertEqual(reverse('newsletter:api-post-list'), "/api/posts/")
+        self.assertEqual(reverse('newsletter:api-post-detail', kwargs={'pk': 1}), "/api/posts/1/")
+        self.assertEqual(reverse('newsletter:api-comment-list', kwargs={'pk': 1}), "/api/posts/1/comments/")
+
+    def test_mail_link_urls(self):
+        """Test the URLs of the unsubscribe and tracking links of the mails."""
+        self.assertEqual(reverse('newsletter:unsubscribe', kwargs={'token': 'a:b:c'}), "/unsubscribe/a:b:c/")
+        self.assertEqual(reverse('newsletter:track-open', kwargs={'token': 'a:b:c'}), "/track/open/a:b:c/")
+        self.assertEqual(reverse('newsletter:track-click', kwargs={'token': 'a:b:c'}), "/track/click/a:b:c/")
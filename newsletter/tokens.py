@@ -0,0 +1,62 @@
+# coding=utf-8
+
+"""Signed tokens of the links of the mails.
+
+A token holds the ids of a subscriber and of a post, signed with ``SECRET_KEY`` and timestamped by
+`django.core.signing`: the views check them without any query, and nothing is stored per recipient. The tokens of
+each action are signed with their own salt, so that a tracking token cannot unsubscribe anyone. The targets of the
+tracked links are signed once per post instead, see `sign_url`. The following settings can be used:
+
+* ``NEWSLETTER_UNSUBSCRIBE_TOKEN_MAX_AGE``: validity in seconds of the unsubscribe links (default: one year).
+* ``NEWSLETTER_TRACKING_TOKEN_MAX_AGE``: validity in seconds of the tracking links (default: 90 days).
+"""
+
+# Django
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+
+UNSUBSCRIBE = 'unsubscribe'
+TRACKING = 'tracking'
+
+MAX_AGES = {
+    UNSUBSCRIBE: ('NEWSLETTER_UNSUBSCRIBE_TOKEN_MAX_AGE', 365 * 24 * 60 * 60),
+    TRACKING: ('NEWSLETTER_TRACKING_TOKEN_MAX_AGE', 90 * 24 * 60 * 60),
+}
+
+
+def get_salt(action):
+    """Return the salt of the tokens of an action."""
+    return 'newsletter.tokens.{}'.format(action)
+
+
+def make_token(action, subscriber_id, post_id):
+    """Return the token of an action for a subscriber and a post."""
+    return signing.dumps([subscriber_id, post_id], salt=get_salt(action))
+
+
+def read_token(action, token):
+    """Return the ids of the subscriber and of the post of a token.
+
+    Raise `django.core.signing.BadSignature`, or its subclass `SignatureExpired`, if the token is not valid.
+    """
+    setting, default = MAX_AGES[action]
+    max_age = getattr(settings, setting, default)
+    try:
+        subscriber_id, post_id = signing.loads(token, salt=get_salt(action), max_age=max_age)
+    except (TypeError, ValueError):
+        # The signature is valid but not the payload, or the payload is not JSON
+        raise signing.BadSignature("Invalid token payload.")
+    if not isinstance(subscriber_id, int) or not isinstance(post_id, int):
+        raise signing.BadSignature("Invalid token payload.")
+    return subscriber_id, post_id
+
+
+def sign_url(url):
+    """Return the signature of the target of a tracked link."""
+    return signing.Signer(salt=get_salt('url')).signature(url)
+
+
+def check_url(url, signature):
+    """Return True if the signature of the target of a tracked link is valid."""
+    return constant_time_compare(sign_url(url), signature)
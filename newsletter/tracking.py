@@ -0,0 +1,106 @@
+# coding=utf-8
+
+"""Write-behind tracking of the mails.
+
+A hit of the tracking pixel or of a tracked link only increments counters in the cache, so that the bursts which
+follow a mailing never write to the database. The first hit of each recipient is told apart with ``cache.add`` to
+count the unique openings and clicks. `flush` then folds the counters of the posts mailed during the validity of
+the tracking tokens into their `newsletter.models.PostStats`, with one ``UPDATE ... F()`` per post.
+
+The counters are decremented by what was read before being written, so the hits received in the meantime are kept
+for the next flush; there must be a single flusher at a time (see the ``newsletter_flush_tracking`` command). The
+counters evicted from the cache or read by a flusher which crashes before writing them are lost: use a persistent
+cache such as Redis or Memcached, not the per-process local memory cache, to share the counters between the
+processes of the site.
+"""
+
+# Standard library
+import datetime
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Current django project
+from newsletter.models import PostStats
+from newsletter.tokens import MAX_AGES, TRACKING
+
+OPEN = 'opens'
+CLICK = 'clicks'
+COUNTERS = ('opens', 'unique_opens', 'clicks', 'unique_clicks')
+
+# Number of posts whose counters are read with one round-trip to the cache
+FLUSH_CHUNK_SIZE = 500
+
+
+def get_max_age():
+    """Return the validity in seconds of the tracking tokens, after which a post gets no more hits."""
+    setting, default = MAX_AGES[TRACKING]
+    return getattr(settings, setting, default)
+
+
+def get_counter_key(counter, post_id):
+    """Return the cache key of a counter of a post."""
+    return 'newsletter:tracking:{}:{}'.format(counter, post_id)
+
+
+def increment(key):
+    """Increment a counter of the cache, creating it if needed."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            # Created in the meantime
+            cache.incr(key)
+
+
+def record_hit(kind, post_id, subscriber_id):
+    """Count a hit, ``OPEN`` or ``CLICK``, of a subscriber on the mail of a post, in the cache only."""
+    increment(get_counter_key(kind, post_id))
+    if cache.add('newsletter:tracking:seen:{}:{}:{}'.format(kind, post_id, subscriber_id), True, get_max_age()):
+        increment(get_counter_key('unique_{}'.format(kind), post_id))
+
+
+def record_open(post_id, subscriber_id):
+    """Count an opening of the mail of a post by a subscriber."""
+    record_hit(OPEN, post_id, subscriber_id)
+
+
+def record_click(post_id, subscriber_id):
+    """Count a click on a link of the mail of a post by a subscriber."""
+    record_hit(CLICK, post_id, subscriber_id)
+
+
+def mark_mailed(post):
+    """Create the statistics of a post if needed and record the date of its mailing, from which it gets hits."""
+    if not PostStats.objects.filter(post=post).update(mailed=timezone.now()):
+        PostStats.objects.get_or_create(post=post, defaults={'mailed': timezone.now()})
+
+
+def flush():
+    """Fold the counters of the cache into the statistics of the posts, return the numbers of posts and hits."""
+    since = timezone.now() - datetime.timedelta(seconds=get_max_age())
+    post_ids = list(PostStats.objects.filter(mailed__gte=since).values_list('post_id', flat=True))
+
+    posts = hits = 0
+    for start in range(0, len(post_ids), FLUSH_CHUNK_SIZE):
+        chunk = post_ids[start:start + FLUSH_CHUNK_SIZE]
+        values = cache.get_many([get_counter_key(counter, post_id) for post_id in chunk for counter in COUNTERS])
+        for key, value in values.items():
+            if value:
+                # The hits received since the read stay in the cache
+                cache.decr(key, value)
+
+        with transaction.atomic():
+            for post_id in chunk:
+                counts = {counter: values.get(get_counter_key(counter, post_id)) or 0 for counter in COUNTERS}
+                if any(counts.values()):
+                    PostStats.objects.filter(post_id=post_id).update(
+                        **{counter: F(counter) + count for counter, count in counts.items() if count}
+                    )
+                    posts += 1
+                    hits += counts[OPEN] + counts[CLICK]
+    return posts, hits
@@ -4,10 +4,12 @@
 
 
 # Django
+from django.contrib.sitemaps import views as sitemaps_views
 from django.urls import path
 
 # Current django project
-from newsletter import views
+from newsletter import api, feeds, views
+from newsletter.sitemaps import sitemaps
 
 app_name = 'newsletter'
 urlpatterns = [
@@ -38,5 +40,59 @@ urlpatterns = [
     path("comments/<int:pk>/delete/",
          view=views.CommentDeleteView.as_view(),
          name='post-comment-delete',
-         )
+         ),
+    path("feed/",
+         view=feeds.LatestPostsFeed(),
+         name='post-feed',
+         ),
+    path("feed/atom/",
+         view=feeds.AtomLatestPostsFeed(),
+         name='post-feed-atom',
+         ),
+    path("<int:pk>/comments/feed/",
+         view=feeds.PostCommentsFeed(),
+         name='post-comments-feed',
+         ),
+    path("<int:pk>/comments/feed/atom/",
+         view=feeds.AtomPostCommentsFeed(),
+         name='post-comments-feed-atom',
+         ),
+    path("sitemap.xml",
+         view=sitemaps_views.index,
+         kwargs={'sitemaps': sitemaps, 'sitemap_url_name': 'newsletter:sitemap-section'},
+         name='sitemap',
+         ),
+    path("sitemap-<section>.xml",
+         view=sitemaps_views.sitemap,
+         kwargs={'sitemaps': sitemaps},
+         name='sitemap-section',
+         ),
+    path("api/posts/",
+         view=api.PostListJsonView.as_view(),
+         name='api-post-list',
+         ),
+    path("api/posts/<int:pk>/",
+         view=api.PostDetailJsonView.as_view(),
+         name='api-post-detail',
+         ),
+    path("api/posts/<int:pk>/comments/",
+         view=api.CommentListJsonView.as_view(),
+         name='api-comment-list',
+         ),
+    path("unsubscribe/<str:token>/",
+         view=views.UnsubscribeView.as_view(),
+         name='unsubscribe',
+         ),
+    path("track/open/<str:token>/",
+         view=views.OpenTrackingView.as_view(),
+         name='track-open',
+         ),
+    path("track/click/<str:token>/",
+         view=views.ClickTrackingView.as_view(),
+         name='track-click',
+         ),
+    path("export/",
+         view=views.ExportView.as_view(),
+         name='export',
+         ),
 ]
@@ -0,0 +1,54 @@
+# coding=utf-8
+
+"""Helpers shared by the newsletter modules."""
+
+# Standard library
+from contextlib import contextmanager
+
+# Django
+from django.db.models import Case, Value, When
+
+
+def bulk_update(model, objs, fields, batch_size=None):
+    """Update the given fields of the objects with one query per batch.
+
+    Use ``QuerySet.bulk_update`` when Django provides it (2.2+), and an equivalent ``UPDATE ... CASE WHEN`` query
+    otherwise.
+    """
+    objs = list(objs)
+    if not objs:
+        return
+
+    manager = model._base_manager
+    if hasattr(manager, 'bulk_update'):
+        manager.bulk_update(objs, fields, batch_size=batch_size)
+        return
+
+    batch_size = batch_size or len(objs)
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        updates = {}
+        for name in fields:
+            field = model._meta.get_field(name)
+            whens = [When(pk=obj.pk, then=Value(getattr(obj, field.attname), output_field=field)) for obj in batch]
+            updates[field.attname] = Case(*whens, output_field=field)
+        manager.filter(pk__in=[obj.pk for obj in batch]).update(**updates)
+
+
+@contextmanager
+def disabled_auto_now(model):
+    """Let the ``auto_now`` and ``auto_now_add`` date fields of the model keep the values given to them.
+
+    Used to import rows with their original dates. The fields are shared by the whole process, so nothing else should
+    save objects of the model in the meantime.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
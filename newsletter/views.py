@@ -2,36 +2,144 @@
 
 """Views."""
 
+# Standard library
+import base64
+import re
+
 # Django
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.core import signing
 from django.core.exceptions import PermissionDenied
+from django.db.models import Max
+from django.http import Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
+from django.utils.cache import add_never_cache_headers, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.utils.translation import ugettext as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView, View
 from django.views.generic.dates import DateDetailView
 from django.views.generic.edit import FormMixin
 
 from mult_mixins.mixins import StaffMixin
 
 # Current django project
+from newsletter.cache import LIST_HEAD_VERSION, LIST_VERSION, get_post_version_name, get_versions
+from newsletter.export import iter_buffered, iter_gzip, iter_lines
 from newsletter.forms import PostCommentForm
-from newsletter.models import Comment, Post
+from newsletter.mixins import AnonymousPageCacheMixin, ConditionalGetMixin, QueryBudgetMixin
+from newsletter.models import Comment, Post, Subscriber
+from newsletter.pagination import CachedCountPaginator, CursorPaginator, InvalidCursorError
+from newsletter.tokens import TRACKING, UNSUBSCRIBE, check_url, read_token
+from newsletter.tracking import record_click, record_open
+
+# Transparent 1x1 GIF of the tracking pixel
+TRACKING_PIXEL = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
 
 
-class PostListView(ListView):
+class PostListView(ConditionalGetMixin, AnonymousPageCacheMixin, ListView):
     """View that returns the list of posts."""
 
     model = Post
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+    # Paginate with ?cursor= tokens instead of page numbers (default: NEWSLETTER_CURSOR_PAGINATION setting)
+    cursor_pagination = None
+    cursor_ordering = ('-created', '-id')
+
+    def get_queryset(self):
+        """Do not load the full text of the posts, the list only shows their excerpt."""
+        return super().get_queryset().defer('text', 'text_html')
+
+    def get_page_cache_versions(self):
+        """Return the versions of the list, the first page also depends on the latest comments."""
+        if self.request.GET.get('cursor') or self.request.GET.get(self.page_kwarg, '1') != '1':
+            return [LIST_VERSION]
+        return [LIST_VERSION, LIST_HEAD_VERSION]
+
+    def get_last_modified(self):
+        """Return the date of the last modified post."""
+        return Post.objects.aggregate(last_modified=Max('modified'))['last_modified']
+
+    def get_etag(self):
+        """Return the versions of the list, which also change when a post is deleted or commented."""
+        return ':'.join(get_versions(*self.get_page_cache_versions()))
+
+    def get_cursor_pagination(self):
+        """Return True if the list is paginated with cursors."""
+        if self.cursor_pagination is None:
+            return getattr(settings, 'NEWSLETTER_CURSOR_PAGINATION', False)
+        return self.cursor_pagination
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the queryset with cursors if enabled, so that a deep page costs as much as the first one."""
+        if not self.get_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, ordering=self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursorError:
+            raise Http404(_("Invalid cursor."))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_page_url(self, **params):
+        """Return the URL of another page of the list, keeping the other parameters of the query."""
+        query = self.request.GET.copy()
+        for name in ('cursor', self.page_kwarg):
+            query.pop(name, None)
+        query.update(params)
+        return '?{}'.format(query.urlencode())
+
+    def get_context_data(self, **kwargs):
+        """Add the URLs of the next and previous pages, with cursors or page numbers."""
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj']
+        context['next_page_url'] = context['previous_page_url'] = None
+        if page is None:
+            return context
+        if self.get_cursor_pagination():
+            if page.has_next():
+                context['next_page_url'] = self.get_page_url(cursor=page.next_cursor)
+            if page.has_previous():
+                context['previous_page_url'] = self.get_page_url(cursor=page.previous_cursor)
+        else:
+            if page.has_next():
+                context['next_page_url'] = self.get_page_url(**{self.page_kwarg: page.next_page_number()})
+            if page.has_previous():
+                context['previous_page_url'] = self.get_page_url(**{self.page_kwarg: page.previous_page_number()})
+        return context
 
 
-class PostDateDetailView(FormMixin, DateDetailView):
-    """Show the details of a post."""
+class PostDateDetailView(ConditionalGetMixin, AnonymousPageCacheMixin, QueryBudgetMixin, FormMixin, DateDetailView):
+    """Show the details of a post and a page of its comments."""
 
     model = Post
     form_class = PostCommentForm
     date_field = 'created'
     month_format = '%m'         # Override month format which is '%b' by default (%b: Jan, Feb, ...)
+    # The comments are paginated with ?comments= cursor tokens, whatever their number
+    comments_paginate_by = 50
+    comments_ordering = ('-created', '-id')
+    query_budget = 10
+
+    def get_queryset(self):
+        """Load the author of the post along with it."""
+        return super().get_queryset().select_related('author')
+
+    def get_page_cache_versions(self):
+        """Return the version of the post and of its comments."""
+        return [get_post_version_name(self.kwargs['pk'])]
+
+    def get_last_modified(self):
+        """Return the date of the last modification of the post or of its comments."""
+        return Post.get_last_modified(self.kwargs['pk'])
+
+    def get_etag(self):
+        """Return the version of the post, which also changes when one of its comments is deleted."""
+        return ':'.join(get_versions(*self.get_page_cache_versions()))
 
     def get_success_url(self):
         """."""
@@ -44,10 +152,26 @@ class PostDateDetailView(FormMixin, DateDetailView):
                           'pk': self.object.pk
                        })
 
+    def get_comments_queryset(self):
+        """Return the comments of the post with their author, the post itself is already known by the queryset."""
+        return self.object.comment_set.select_related('author')
+
+    def paginate_comments(self):
+        """Return the page of comments designated by the ``comments`` cursor."""
+        paginator = CursorPaginator(self.get_comments_queryset(), self.comments_paginate_by,
+                                    ordering=self.comments_ordering)
+        try:
+            return paginator.page(self.request.GET.get('comments'))
+        except InvalidCursorError:
+            raise Http404(_("Invalid cursor."))
+
     def get_context_data(self, **kwargs):
-        """Add post_id in request.session."""
+        """Add the comment form and the page of comments."""
         context = super().get_context_data(**kwargs)
         context['form'] = self.get_form()
+        comment_page = self.paginate_comments()
+        context['comment_page'] = comment_page
+        context['comment_list'] = comment_page.object_list
         return context
 
     def post(self, request, *args, **kwargs):
@@ -65,7 +189,7 @@ class PostDateDetailView(FormMixin, DateDetailView):
 
     def form_valid(self, form):
         """Validate the form."""
-        form.instance.post = Post.objects.get(id=self.kwargs['pk'])
+        form.instance.post = self.object
         form.instance.author = self.request.user
         form.save()
         return super().form_valid(form)
@@ -157,3 +281,82 @@ class CommentDeleteView(LoginRequiredMixin, SuperuserRequiredMixin, DeleteView):
                           'day': self.object.created.day,
                           'pk': self.object.post.id
                        })
+
+
+class ExportView(StaffMixin, View):
+    """Stream the posts and comments as newline-delimited JSON (see `newsletter.export`).
+
+    The response is gzipped on the fly if the client accepts it.
+    """
+
+    accepts_gzip = re.compile(r'\bgzip\b')
+
+    def get(self, request, *args, **kwargs):
+        """Return the streaming response."""
+        chunks = iter_buffered(iter_lines())
+        response = StreamingHttpResponse(content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="newsletter.ndjson"'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if self.accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            chunks = iter_gzip(chunks)
+            response['Content-Encoding'] = 'gzip'
+        response.streaming_content = chunks
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UnsubscribeView(TemplateView):
+    """Unsubscribe the subscriber of the signed token of a mail (see `newsletter.tokens`).
+
+    The GET shows a confirmation form, so that the link checkers of the mail providers do not unsubscribe anyone. The
+    POST, which is also the one-click unsubscription of RFC 8058 and needs no CSRF token, unsubscribes. The token is
+    checked without any query.
+    """
+
+    template_name = 'newsletter/unsubscribe.html'
+
+    def dispatch(self, request, *args, **kwargs):
+        """Check the token."""
+        try:
+            self.subscriber_id, self.post_id = read_token(UNSUBSCRIBE, kwargs['token'])
+        except signing.BadSignature:
+            raise Http404(_("Invalid or expired link."))
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        """Deactivate the subscriber with a single UPDATE."""
+        Subscriber.objects.filter(pk=self.subscriber_id).update(is_active=False)
+        return self.render_to_response(self.get_context_data(unsubscribed=True))
+
+
+class OpenTrackingView(View):
+    """Record the opening of a mail and return the tracking pixel."""
+
+    def get(self, request, *args, **kwargs):
+        """Return the pixel whatever the token, which is only recorded if valid."""
+        try:
+            subscriber_id, post_id = read_token(TRACKING, kwargs['token'])
+        except signing.BadSignature:
+            pass
+        else:
+            record_open(post_id, subscriber_id)
+        response = HttpResponse(TRACKING_PIXEL, content_type='image/gif')
+        add_never_cache_headers(response)
+        return response
+
+
+class ClickTrackingView(View):
+    """Record a click on a link of a mail and redirect to its target, whose signature is checked."""
+
+    def get(self, request, *args, **kwargs):
+        """Redirect whatever the token, which is only recorded if valid."""
+        url = request.GET.get('url', '')
+        if not url or not check_url(url, request.GET.get('sig', '')):
+            raise Http404(_("Invalid link."))
+        try:
+            subscriber_id, post_id = read_token(TRACKING, kwargs['token'])
+        except signing.BadSignature:
+            pass
+        else:
+            record_click(post_id, subscriber_id)
+        return HttpResponseRedirect(url)
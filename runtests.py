@@ -15,17 +15,20 @@ def runtests(*test_args):
     parent = os.path.dirname(os.path.abspath(__file__))
     sys.path.insert(0, parent)
 
+    options = {}
     try:
         from django.test.runner import DiscoverRunner
         runner_class = DiscoverRunner
         if not test_args:
             test_args = ["newsletter.tests"]
+            # The benchmarks are slow and only report timings, they run when their module is given
+            options["exclude_tags"] = ["benchmark"]
     except ImportError:
         from django.test.simple import DjangoTestSuiteRunner
         runner_class = DjangoTestSuiteRunner
         test_args = ["tests"]
 
-    failures = runner_class(verbosity=1, interactive=True, failfast=False).run_tests(test_args)
+    failures = runner_class(verbosity=1, interactive=True, failfast=False, **options).run_tests(test_args)
     sys.exit(failures)
 
 
@@ -41,6 +41,7 @@ DEPENDENCY_LINKS = [
 # What packages are optional?
 EXTRAS = {
     'dev': [
+        'aiosmtpd',
         'flake8',
         'flake8-docstrings>=0.2.7',
         'flake8-rst-docstrings',